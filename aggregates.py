@@ -0,0 +1,175 @@
+from collections import Counter
+from decimal import Decimal, ROUND_HALF_UP
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Optional
+import math
+
+
+def to_cents(amount: Any) -> int:
+    """Convert an amount to whole cents, rounding half up
+
+    Raises ValueError for NaN and infinite amounts, which have no cents
+    """
+    if type(amount) is float:
+        if not math.isfinite(amount):
+            raise ValueError(f"{amount} is not an amount of money")
+        cents = round(amount * 100)
+        # Away from a half cent the binary error of the float can't change which
+        # cent is nearest, so only amounts close to a half go through Decimal
+        if abs(amount * 100 - cents) < 1e-6:
+            return cents
+    amount = Decimal(str(amount))
+    if not amount.is_finite():
+        raise ValueError(f"{amount} is not an amount of money")
+    return int((amount * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents: int) -> Decimal:
+    """Convert whole cents back into an exact two place Decimal amount"""
+    return Decimal(cents).scaleb(-2)
+
+
+class RunningTotals:
+    """Sum, count, minimum and maximum of a changing set of amounts
+
+    Amounts are kept as integer cents so adding and removing the same amount
+    always returns the total to exactly where it was. The minimum and maximum
+    are kept with how many amounts equal them, so adding never stores anything
+    per amount. Only removing the last amount equal to one of them leaves it
+    to be worked out again on the next read, from the amounts callable, which
+    gives every amount still included. Without one a count of every distinct
+    amount is kept instead.
+    """
+
+    def __init__(self, amounts: Optional[Callable[[], Iterable[Any]]] = None):
+        self.cents = 0
+        self.count = 0
+        self._amounts = amounts
+        self._counts = Counter() if amounts is None else None
+        self._minimum = self._maximum = None
+        self._minimum_count = self._maximum_count = 0
+        self._stale = False
+
+    def add(self, cents: int, count: int = 1):
+        """Include an amount of cents, count times over"""
+        self.cents += cents * count
+        self.count += count
+        if self._counts is not None:
+            self._counts[cents] += count
+        if self._stale:
+            return
+        if self._minimum is None or cents < self._minimum:
+            self._minimum, self._minimum_count = cents, count
+        elif cents == self._minimum:
+            self._minimum_count += count
+        if self._maximum is None or cents > self._maximum:
+            self._maximum, self._maximum_count = cents, count
+        elif cents == self._maximum:
+            self._maximum_count += count
+
+    def remove(self, cents: int):
+        """Take out an amount of cents that was previously added"""
+        if self._counts is not None:
+            if not self._counts[cents]:
+                del self._counts[cents]
+                raise ValueError(f"{from_cents(cents)} was never added")
+            self._counts[cents] -= 1
+            if not self._counts[cents]:
+                del self._counts[cents]
+        elif not self.count or (not self._stale and not self._minimum <= cents <= self._maximum):
+            raise ValueError(f"{from_cents(cents)} was never added")
+        self.cents -= cents
+        self.count -= 1
+        if self._stale:
+            return
+        if cents == self._minimum:
+            self._minimum_count -= 1
+            self._stale = not self._minimum_count
+        if cents == self._maximum:
+            self._maximum_count -= 1
+            self._stale = self._stale or not self._maximum_count
+
+    def _refresh(self):
+        if not self._stale:
+            return
+        self._stale = False
+        self._minimum = self._maximum = None
+        self._minimum_count = self._maximum_count = 0
+        if not self.count:
+            return
+        if self._counts is not None:
+            for cents, count in self._counts.items():
+                self._include_extreme(cents, count)
+        else:
+            # to_cents never reorders amounts, so the extremes of the amounts give the extremes in cents
+            amounts = list(self._amounts())
+            for cents in {to_cents(min(amounts)), to_cents(max(amounts))}:
+                self._include_extreme(cents, sum(1 for amount in amounts if to_cents(amount) == cents))
+
+    def _include_extreme(self, cents: int, count: int):
+        if self._minimum is None or cents < self._minimum:
+            self._minimum, self._minimum_count = cents, count
+        if self._maximum is None or cents > self._maximum:
+            self._maximum, self._maximum_count = cents, count
+
+    @property
+    def total(self) -> Decimal:
+        return from_cents(self.cents)
+
+    @property
+    def minimum(self) -> Optional[Decimal]:
+        self._refresh()
+        return from_cents(self._minimum) if self._minimum is not None else None
+
+    @property
+    def maximum(self) -> Optional[Decimal]:
+        self._refresh()
+        return from_cents(self._maximum) if self._maximum is not None else None
+
+
+class ExpenseAggregates:
+    """Running totals over all expenses and per category, updated as expenses change
+
+    amounts(*categories) gives the amounts of every expense in the categories,
+    or of every expense with none, for the totals to work out a new minimum or
+    maximum from after a removal (see RunningTotals).
+    """
+
+    def __init__(self, amounts: Optional[Callable[..., Iterable[Any]]] = None):
+        self.amounts = amounts
+        self.overall = RunningTotals(amounts)
+        self.categories: Dict[Any, RunningTotals] = {}
+
+    def add(self, category: Any, amount: Any, count: int = 1):
+        """Record a new expense amount in a category, count expenses of it at once"""
+        self.add_cents(category, to_cents(amount), count)
+
+    def add_cents(self, category: Any, cents: int, count: int = 1):
+        """Record a new expense amount already in cents, see to_cents"""
+        self.overall.add(cents, count)
+        totals = self.categories.get(category)
+        if totals is None:
+            totals = self.categories[category] = RunningTotals(self.amounts and partial(self.amounts, category))
+        totals.add(cents, count)
+
+    def remove(self, category: Any, amount: Any):
+        """Forget an expense amount that was previously added to a category"""
+        cents = to_cents(amount)
+        self.categories[category].remove(cents)
+        self.overall.remove(cents)
+        if self.categories[category].count == 0:
+            del self.categories[category]
+
+    def update(self, category: Any, old_amount: Any, new_amount: Any):
+        """Replace an expense amount in a category with a new one"""
+        cents = to_cents(new_amount)
+        self.remove(category, old_amount)
+        self.add_cents(category, cents)
+
+    def for_category(self, category: Any) -> RunningTotals:
+        """Get the running totals of one category, empty if nothing is in it"""
+        return self.categories.get(category) or RunningTotals()
+
+    def category_totals(self) -> Dict[Any, Decimal]:
+        """Get the total of every category that has expenses"""
+        return {category: totals.total for category, totals in self.categories.items()}
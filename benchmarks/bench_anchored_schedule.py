@@ -0,0 +1,54 @@
+"""Compares the month-stepping AnchoredExpenseSchedule against the old day-by-day scan
+
+Run from the repository root:
+
+    python benchmarks/bench_anchored_schedule.py
+"""
+import datetime
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from period import Period
+from schedules import AnchoredExpenseSchedule
+
+START = datetime.date(2024, 1, 15)
+YEARS = [1, 10, 50]
+ANCHORS = [1, 15, 28, 31]
+REPEAT = 5
+
+
+def scan_occurences(schedule: AnchoredExpenseSchedule, period: Period) -> list[datetime.date]:
+    """the original implementation: visit every day in the period"""
+    occurences = []
+    for i in range(period.days_in_period()):
+        dtc = period.start + datetime.timedelta(days=i + 1)
+        if dtc.day == schedule.anchor:
+            occurences.append(dtc)
+    return occurences
+
+
+def best_of(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=REPEAT)) / number
+
+
+def main():
+    print(f"{'years':>5} {'anchor':>6} {'scan (ms)':>12} {'stepping (ms)':>14} {'speedup':>8}")
+    for years in YEARS:
+        period = Period(START, end=START.replace(year=START.year + years))
+        for anchor in ANCHORS:
+            schedule = AnchoredExpenseSchedule(anchor)
+            if schedule.get_occurences_in_period(period) != scan_occurences(schedule, period):
+                raise AssertionError(f"results differ for anchor {anchor} over {years} years")
+            number = max(1, 200 // years)
+            scan = best_of(lambda: scan_occurences(schedule, period), number)
+            stepping = best_of(lambda: schedule.get_occurences_in_period(period), number)
+            print(
+                f"{years:>5} {anchor:>6} {scan * 1000:>12.3f} {stepping * 1000:>14.3f} {scan / stepping:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""First/last working day lookups from the calendar bitmap against walking day by day
+
+Run from the repository root:
+
+    python benchmarks/bench_business_calendar.py
+"""
+import datetime
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from business_calendar import BusinessCalendar
+from period import days_in_month, is_weekday
+
+YEARS = range(2000, 2100)
+HOLIDAYS = [datetime.date(year, month, day) for year in YEARS for month, day in [(1, 1), (12, 25), (12, 26)]]
+REPEAT = 5
+
+
+def walk_first_last(year: int, month: int, holidays: set) -> tuple[datetime.date, datetime.date]:
+    """the old approach, stepping from either end of the month until a working day"""
+    first = datetime.date(year, month, 1)
+    while not is_weekday(first) or first in holidays:
+        first = first + datetime.timedelta(days=1)
+    last = datetime.date(year, month, days_in_month(year, month))
+    while not is_weekday(last) or last in holidays:
+        last = last - datetime.timedelta(days=1)
+    return first, last
+
+
+def main():
+    months = [(year, month) for year in YEARS for month in range(1, 13)]
+    holidays = set(HOLIDAYS)
+    calendar = BusinessCalendar(holidays=HOLIDAYS)
+    for year, month in months:
+        if walk_first_last(year, month, holidays) != (
+            calendar.first_working_day(year, month),
+            calendar.last_working_day(year, month),
+        ):
+            raise AssertionError(f"{year}-{month:02}: results differ")
+
+    walk = min(timeit.repeat(lambda: [walk_first_last(y, m, holidays) for y, m in months], number=10, repeat=REPEAT))
+    lookup = min(timeit.repeat(
+        lambda: [(calendar.first_working_day(y, m), calendar.last_working_day(y, m)) for y, m in months],
+        number=10, repeat=REPEAT,
+    ))
+    build = min(timeit.repeat(lambda: BusinessCalendar(holidays=HOLIDAYS).working_days(2050, 1), number=100,
+                              repeat=REPEAT)) / 100
+    per_lookup = 10 * len(months)
+    print(f"{len(months)} months, {len(HOLIDAYS)} holidays")
+    print(f"walk   {walk / per_lookup * 1e9:>8.0f} ns per month")
+    print(f"lookup {lookup / per_lookup * 1e9:>8.0f} ns per month")
+    print(f"building one year: {build * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Times forecast() for 100k recurring expenses over 10 years and checks it against a naive loop
+
+Run from the repository root:
+
+    python benchmarks/bench_forecast.py
+"""
+import contextlib
+import datetime
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from categories import ExpenseCategory
+from expenses import Expense
+from forecast import forecast
+from period import Period
+from schedules import (
+    AnchoredExpenseSchedule,
+    FirstLastWorkingDayMonthlyExpenseSchedule,
+    WeeklyExpenseSchedule,
+)
+
+EXPENSES = 100_000
+START = datetime.date(2025, 1, 1)
+
+
+def make_expenses(n: int) -> list[Expense]:
+    rng = random.Random(n)
+    categories = list(ExpenseCategory)
+    expenses = []
+    for _ in range(n):
+        kind = rng.random()
+        if kind < 0.6:
+            schedule = AnchoredExpenseSchedule(rng.randint(1, 28))
+        elif kind < 0.9:
+            schedule = FirstLastWorkingDayMonthlyExpenseSchedule(rng.choice("fl"))
+        else:
+            schedule = WeeklyExpenseSchedule(rng.randint(0, 6))
+        expenses.append(Expense(rng.randint(100, 50000) / 100, "expense", schedule, rng.choice(categories)))
+    return expenses
+
+
+def naive_forecast(expenses: list[Expense], period: Period) -> dict:
+    """every occurrence of every expense, bucketed by scanning the bucket list"""
+    buckets = period.make_period_list()
+    window = Period(period.start - datetime.timedelta(days=1), end=period.end - datetime.timedelta(days=1))
+    totals = {}
+    for expense in expenses:
+        for dtc in expense.schedule.get_occurences_in_period(window):
+            for i, (start, end) in enumerate(buckets):
+                if start <= dtc <= end:
+                    key = (i, expense.category)
+                    totals[key] = totals.get(key, 0) + round(expense.amount * 100)
+    return totals
+
+
+def main():
+    expenses = make_expenses(EXPENSES)
+    period = Period(START, end=START.replace(year=START.year + 10), interval="M")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        began = time.perf_counter()
+        result = forecast(expenses, period)
+        elapsed = time.perf_counter() - began
+
+        sample = expenses[:500]
+        expected = naive_forecast(sample, period)
+        sampled = forecast(sample, period)
+
+    for (bucket, category), cents in expected.items():
+        if sampled.cents[category][bucket] != cents:
+            raise AssertionError(f"bucket {bucket} {category} differs from the naive forecast")
+    if round(sampled.total() * 100) != sum(expected.values()):
+        raise AssertionError("forecast total differs from the naive forecast")
+
+    print(f"{EXPENSES} expenses, {len(result.buckets)} monthly buckets: {elapsed:.3f}s")
+    print(f"forecast total {result.total():,.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Per-call cost of increment_date_by_months against the old month_cycle version
+
+Run from the repository root:
+
+    python benchmarks/bench_month_increment.py
+"""
+import contextlib
+import datetime
+import io
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from period import increment_date_by_months
+
+NUMBER = 200_000
+CASES = [
+    ("mid month", datetime.date(2024, 5, 15), 1),
+    ("year rollover", datetime.date(2024, 11, 15), 3),
+    ("short month", datetime.date(2024, 1, 31), 1),
+]
+
+
+def month_cycle(start, n):
+    months = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]
+    new_index = ((start - 1) + n) % 12
+    return months[new_index]
+
+
+def legacy_increment(date, increment):
+    """the old implementation, print included"""
+    new_month = month_cycle(date.month, increment)
+    if (date.month + increment) >= 13:
+        yrs = (date.month + increment - 1) // 12
+    else:
+        yrs = 0
+    try:
+        new_date = date.replace(month=new_month, year=yrs + date.year)
+        last_day_error = False
+    except ValueError:
+        new_date = (
+            datetime.datetime(year=date.year + yrs, month=new_month + 1, day=1)
+            - datetime.timedelta(days=1)
+        ).date()
+        last_day_error = True
+    print(
+        f"Start Date: {date}, New Date: {new_date}, Increment: {increment}. {'last day error' if last_day_error else ''}"
+    )
+    return new_date
+
+
+def per_call(func, date, increment) -> float:
+    return min(timeit.repeat(lambda: func(date, increment), number=NUMBER, repeat=3)) / NUMBER
+
+
+def main():
+    print(f"{'case':<14} {'old (ns)':>10} {'new (ns)':>10}")
+    for name, date, increment in CASES:
+        # stdout goes to a buffer, the old version's real cost in batch jobs is higher still
+        with contextlib.redirect_stdout(io.StringIO()):
+            if legacy_increment(date, increment) != increment_date_by_months(date, increment):
+                raise AssertionError(f"{name}: results differ")
+            old = per_call(legacy_increment, date, increment)
+        new = per_call(increment_date_by_months, date, increment)
+        print(f"{name:<14} {old * 1e9:>10.0f} {new * 1e9:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Period.make_period_list and months_in_period against the old list versions and the numpy arrays
+
+Run from the repository root:
+
+    python benchmarks/bench_period_lists.py
+"""
+import datetime
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from period import Period, increment_date_by_months, increment_date_by_weeks
+from vectorized import interval_bounds, month_starts
+
+START = datetime.date(2024, 1, 31)
+YEARS = [1, 30, 300]
+REPEAT = 5
+
+
+def legacy_period_list(period: Period, interval: str) -> list:
+    """the original make_period_list"""
+    incrementor = increment_date_by_months if interval == "M" else increment_date_by_weeks
+    plist = []
+    start = period.start
+    end = None
+    while True:
+        end = incrementor(start, 1)
+        if end <= period.end:
+            plist.append((start, end - datetime.timedelta(days=1)))
+            start = end
+            end = None
+        else:
+            if start >= period.end:
+                break
+            plist.append((start, period.end - datetime.timedelta(days=1)))
+            break
+    return plist
+
+
+def legacy_months_in_period(period: Period) -> list:
+    """the original months_in_period, with its membership test on a growing list"""
+    mip = []
+    month = period.start.replace(day=1)
+    while True:
+        if month in mip:
+            continue
+        mip.append(month)
+        nm = increment_date_by_months(month, 1)
+        if nm > period.end:
+            break
+        month = nm
+    return mip
+
+
+def best_of(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=REPEAT)) / number
+
+
+def main():
+    print(f"{'years':>5} {'list':>14} {'old (ms)':>10} {'new (ms)':>10} {'numpy (ms)':>11}")
+    for years in YEARS:
+        period = Period(START, end=START.replace(year=START.year + years))
+        number = max(1, 300 // years)
+        cases = [
+            ("months", legacy_months_in_period, period.months_in_period, lambda: month_starts(period)),
+            ("monthly", lambda p: legacy_period_list(p, "M"), lambda: period.make_period_list("M"),
+             lambda: interval_bounds(period, "M")),
+            ("weekly", lambda p: legacy_period_list(p, "W"), lambda: period.make_period_list("W"),
+             lambda: interval_bounds(period, "W")),
+        ]
+        for name, legacy, new, array in cases:
+            if legacy(period) != new():
+                raise AssertionError(f"{name} over {years} years: results differ")
+            old = best_of(lambda: legacy(period), number)
+            fast = best_of(new, number)
+            bulk = best_of(array, number)
+            print(f"{years:>5} {name:>14} {old * 1000:>10.3f} {fast * 1000:>10.3f} {bulk * 1000:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Memory held by 1M expenses, each with its own schedule, with and without __slots__
+
+Run from the repository root:
+
+    python benchmarks/bench_slots_memory.py
+"""
+import datetime
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from categories import ExpenseCategory
+from expenses import Expense
+from schedules import AnchoredExpenseSchedule, FirstLastWorkingDayMonthlyExpenseSchedule, WeeklyExpenseSchedule
+
+COUNT = 1_000_000
+
+
+class DictExpense:
+    """Expense as it was, with a per-instance __dict__"""
+
+    def __init__(self, amount, name, schedule, category):
+        self.amount = amount
+        self.name = name
+        self.schedule = schedule
+        self.category = category
+
+    def __add__(self, other):
+        return self.amount + other.amount
+
+    def __radd__(self, other):
+        return self.amount + other
+
+
+class DictSchedule:
+    def __init__(self, anchor):
+        self.anchor = anchor
+
+
+def measure(build) -> tuple[int, list]:
+    tracemalloc.start()
+    objects = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, objects
+
+
+def main():
+    categories = list(ExpenseCategory)
+    names = [f"expense {i}" for i in range(1000)]
+    amounts = [i / 100 for i in range(1000)]
+
+    def build(expense_class, make_schedule):
+        return [
+            expense_class(amounts[i % 1000], names[i % 1000], make_schedule(i), categories[i % len(categories)])
+            for i in range(COUNT)
+        ]
+
+    print(f"{COUNT:,} expenses")
+    dict_size, dict_expenses = measure(lambda: build(DictExpense, lambda i: DictSchedule(i % 28 + 1)))
+    expected = sum(dict_expenses)
+    del dict_expenses
+    print(f"{'__dict__':<32} {dict_size / 2**20:>8.1f} MiB")
+
+    makers = [
+        ("anchored", lambda i: AnchoredExpenseSchedule(i % 28 + 1)),
+        ("first/last working day", lambda i: FirstLastWorkingDayMonthlyExpenseSchedule("fl"[i % 2])),
+        ("weekly", lambda i: WeeklyExpenseSchedule(i % 7)),
+    ]
+    for name, make_schedule in makers:
+        size, expenses = measure(lambda: build(Expense, make_schedule))
+        if sum(expenses) != expected:
+            raise AssertionError("summing the slotted expenses gave a different total")
+        del expenses
+        print(f"{'__slots__, ' + name:<32} {size / 2**20:>8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
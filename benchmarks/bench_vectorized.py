@@ -0,0 +1,63 @@
+"""Compares expanding schedules one at a time against vectorized.expand_schedules
+
+Needs numpy. Run from the repository root:
+
+    python benchmarks/bench_vectorized.py
+"""
+import contextlib
+import datetime
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from period import Period
+from schedules import (
+    AnchoredExpenseSchedule,
+    FirstLastWorkingDayMonthlyExpenseSchedule,
+    WeeklyExpenseSchedule,
+)
+from vectorized import expand_schedules
+
+SIZES = [1_000, 10_000, 200_000]
+PERIOD = Period(datetime.date(2025, 1, 1), end=datetime.date(2026, 1, 1))
+
+
+def make_schedules(n: int) -> list:
+    rng = random.Random(n)
+    schedules = []
+    for _ in range(n):
+        kind = rng.random()
+        if kind < 0.6:
+            schedules.append(AnchoredExpenseSchedule(rng.randint(1, 28)))
+        elif kind < 0.9:
+            schedules.append(FirstLastWorkingDayMonthlyExpenseSchedule(rng.choice("fl")))
+        else:
+            schedules.append(WeeklyExpenseSchedule(rng.randint(0, 6)))
+    return schedules
+
+
+def main():
+    print(f"{'schedules':>10} {'occurrences':>12} {'per object (s)':>15} {'vectorized (s)':>15}")
+    for n in SIZES:
+        schedules = make_schedules(n)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            began = time.perf_counter()
+            expanded = [s.get_occurences_in_period(PERIOD) for s in schedules]
+            per_object = time.perf_counter() - began
+
+        began = time.perf_counter()
+        batch = expand_schedules(schedules, PERIOD)
+        vectorized = time.perf_counter() - began
+
+        if len(batch) != sum(len(dates) for dates in expanded):
+            raise AssertionError("vectorized expansion returned a different number of occurrences")
+        print(f"{n:>10} {len(batch):>12} {per_object:>15.3f} {vectorized:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
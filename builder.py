@@ -1,6 +1,7 @@
 from menus import AnchoredExpenseMenu, SelectionMenu, FLDayExpenseMenu
 
 from schedules import AnchoredExpenseSchedule, FirstLastWorkingDayMonthlyExpenseSchedule
+from schedule_registry import intern_schedule
 
 class AnchoredScheduleBuilder:
 
@@ -12,7 +13,7 @@ class AnchoredScheduleBuilder:
 
     def run(self):
         config = self.menu.run()
-        return self.sched_class(config['anchor'])
+        return intern_schedule(self.sched_class(config['anchor']))
 
 class FLScheduleBuilder:
 
@@ -22,7 +23,7 @@ class FLScheduleBuilder:
 
     def run(self):
         config = self.menu.run()
-        return self.sched_class(config['anchor'])
+        return intern_schedule(self.sched_class(config['anchor']))
 
 menu_selections = {'a':AnchoredScheduleBuilder,
                    'f':FLScheduleBuilder}
@@ -0,0 +1,52 @@
+"""Lets the root tests and the paul tests run in one pytest process
+
+Both trees import their modules by flat name and a few names, such as
+schedules, expenses and categories, exist in both. Whichever tree is imported
+first would otherwise hand its modules to the other. Each test module is
+collected and run with its own tree's directory first on sys.path and its own
+tree's copies of the shared names in sys.modules.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PAUL = os.path.join(ROOT, "paul")
+
+
+def _module_names(directory: str) -> set:
+    return {name[:-3] for name in os.listdir(directory) if name.endswith(".py")}
+
+
+SHARED = sorted(_module_names(ROOT) & _module_names(PAUL) - {"__init__", "conftest"})
+
+_modules = {ROOT: {}, PAUL: {}}
+_active = []
+
+
+def _use_tree(path):
+    tree = PAUL if str(path).startswith(PAUL + os.sep) else ROOT
+    if _active and _active[0] == tree:
+        return
+    if _active:
+        _modules[_active[0]] = {name: sys.modules.pop(name) for name in SHARED if name in sys.modules}
+    else:
+        for name in SHARED:
+            sys.modules.pop(name, None)
+    sys.modules.update(_modules[tree])
+    while tree in sys.path:
+        sys.path.remove(tree)
+    sys.path.insert(0, tree)
+    _active[:] = [tree]
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collectstart(collector):
+    if isinstance(collector, pytest.Module):
+        _use_tree(collector.path)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    _use_tree(item.path)
@@ -3,6 +3,9 @@ from categories import ExpenseCategory
 
 
 class Expense:
+    # no per-instance __dict__, which adds up with millions of expenses in memory
+    __slots__ = ("amount", "name", "schedule", "category")
+
     def __init__(
         self,
         amount: float,
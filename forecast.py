@@ -0,0 +1,91 @@
+"""Cash-flow forecasts: what the expenses add up to in each month or week of a period
+
+Expenses sharing a schedule always hit on the same dates, so each distinct
+schedule is expanded once and its occurrences counted per bucket. Those
+counts are then multiplied by the summed amounts of every category on that
+schedule, instead of looping over every occurrence of every expense.
+"""
+from array import array
+from bisect import bisect_right
+from collections import Counter, defaultdict
+import datetime
+
+from aggregates import to_cents
+from expenses import Expense
+from period import Period
+from schedule_registry import registry
+
+
+class Forecast:
+    """totals per bucket and category, held as integer cents in one array per category"""
+
+    def __init__(self, buckets: list[tuple[datetime.date, datetime.date]], cents: dict):
+        self.buckets = buckets
+        self.cents = cents
+
+    @property
+    def categories(self) -> list:
+        return list(self.cents)
+
+    def category_series(self, category) -> list[float]:
+        """returns the total of a category in every bucket"""
+        series = self.cents.get(category)
+        if series is None:
+            return [0.0] * len(self.buckets)
+        return [c / 100 for c in series]
+
+    def bucket_totals(self) -> list[float]:
+        """returns the total of all categories in every bucket"""
+        totals = [0] * len(self.buckets)
+        for series in self.cents.values():
+            for i, c in enumerate(series):
+                totals[i] += c
+        return [c / 100 for c in totals]
+
+    def total(self) -> float:
+        return sum(sum(series) for series in self.cents.values()) / 100
+
+    def rows(self):
+        """yields (bucket start, bucket end, {category: amount}) for every bucket"""
+        for i, (start, end) in enumerate(self.buckets):
+            yield start, end, {category: series[i] / 100 for category, series in self.cents.items()}
+
+
+def forecast(expenses: list[Expense], period: Period, interval: str = None) -> Forecast:
+    """totals up every expense occurrence in [period.start, period.end) by interval ("M" or "W") and category
+
+    expenses without a schedule never fall due and are left out
+    """
+    buckets = period.make_period_list(interval)
+
+    # amounts of every category, summed per distinct schedule, equal schedules share a key
+    amounts = defaultdict(Counter)
+    for expense in expenses:
+        if expense.schedule is None:
+            continue
+        amounts[expense.schedule][expense.category] += to_cents(expense.amount)
+
+    return Forecast(buckets, bucket_cents(amounts, period, buckets))
+
+
+def bucket_cents(amounts: dict, period: Period, buckets: list[tuple[datetime.date, datetime.date]]) -> dict:
+    """spreads {schedule: {category: cents}} over the buckets, returning {category: cents per bucket}"""
+    bucket_starts = [start for start, _ in buckets]
+
+    # schedules count occurrences in (start, end], shift back a day to line up with the buckets
+    day = datetime.timedelta(days=1)
+    window = Period(period.start - day, end=period.end - day)
+
+    cents = {}
+    for schedule, category_amounts in amounts.items():
+        if schedule is None:
+            continue
+        hits = Counter(bisect_right(bucket_starts, dtc) - 1 for dtc in registry.get_occurences(schedule, window))
+        for category, amount in category_amounts.items():
+            series = cents.get(category)
+            if series is None:
+                series = cents[category] = array("q", bytes(8 * len(buckets)))
+            for bucket, count in hits.items():
+                series[bucket] += count * amount
+
+    return cents
@@ -0,0 +1,93 @@
+"""Counters and timers for batch runs, in place of printing from hot paths
+
+Modules log through the standard logging module (lazily formatted, so
+nothing is built unless a handler wants it) and record what they did on the
+process wide `metrics` object, which can be dumped as JSON at the end of a run.
+"""
+import atexit
+from collections import Counter
+from contextlib import contextmanager
+import json
+import time
+from typing import Callable
+
+
+class Timer:
+    """number of timed calls with their total and longest duration"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.longest = 0.0
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.longest:
+            self.longest = seconds
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_seconds": self.total,
+            "mean_seconds": self.total / self.count if self.count else 0.0,
+            "max_seconds": self.longest,
+        }
+
+
+class Metrics:
+    """named counters and timers, plus sources that are read when a snapshot is taken"""
+
+    def __init__(self):
+        self.enabled = True
+        self.counters = Counter()
+        self.timers: dict[str, Timer] = {}
+        self.sources: dict[str, Callable[[], dict]] = {}
+
+    def increment(self, name: str, amount: int = 1):
+        if self.enabled:
+            self.counters[name] += amount
+
+    def record_time(self, name: str, seconds: float):
+        if self.enabled:
+            timer = self.timers.get(name)
+            if timer is None:
+                timer = self.timers[name] = Timer()
+            timer.record(seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_time(name, time.perf_counter() - started)
+
+    def add_source(self, name: str, source: Callable[[], dict]):
+        """registers a callable whose result is included in every snapshot, e.g. cache statistics"""
+        self.sources[name] = source
+
+    def reset(self):
+        self.counters.clear()
+        self.timers.clear()
+
+    def snapshot(self) -> dict:
+        return {
+            "counters": dict(self.counters),
+            "timers": {name: timer.as_dict() for name, timer in self.timers.items()},
+            **{name: source() for name, source in self.sources.items()},
+        }
+
+    def to_json(self, indent: int = 2) -> str:
+        return json.dumps(self.snapshot(), indent=indent, sort_keys=True)
+
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            f.write(self.to_json())
+
+    def dump_at_exit(self, path: str):
+        """writes the metrics to path when the process exits"""
+        atexit.register(self.dump, path)
+
+
+metrics = Metrics()
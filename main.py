@@ -1,63 +1,61 @@
 import datetime
+import os
+import sys
 
 from expenses import Expense
 from menus import CategoryMenu
 from period import Period
 from builder import BuilderMenu
+from business_calendar import BusinessCalendar, set_default_calendar
+from aggregates import ExpenseAggregates
+from report_renderer import Column, ReportRenderer
 
 
 
 class Outgoings:
     def __init__(self):
         self.outs = []
+        # kept up to date as outgoings come and go so total() never re-sums
+        self.aggregates = ExpenseAggregates()
 
     def add_outgoing(self, outgoing: Expense):
         self.outs.append(outgoing)
+        self.aggregates.add(outgoing.category, outgoing.amount)
 
     def add_list_of_expenses(self, lst: list[Expense]):
-        self.outs.extend(lst)
+        for outgoing in lst:
+            self.add_outgoing(outgoing)
+
+    def remove_outgoing(self, outgoing: Expense):
+        self.outs.remove(outgoing)
+        self.aggregates.remove(outgoing.category, outgoing.amount)
 
     def total(self) -> float:
-        return sum(self.outs)
+        return float(self.aggregates.overall.total)
 
 
 class Report:
     """
     Takes a list of set of outgoings and prints a nice report
 
-    Constructs a report as a list of lines to be printed
+    Streams the report line by line, sized to the longest entry in each column
 
     """
 
+    columns = [
+        Column("name", lambda outgoing: outgoing.name, min_width=15),
+        Column("amount", lambda outgoing: outgoing.amount, ">"),
+    ]
+
     def __init__(self, expenses: Outgoings):
         self.expenses = expenses
+        self.renderer = ReportRenderer(self.columns, total_label="total")
 
-    # TODO: get longest line and make a single separator
-
-    def header(self):
-        title = f"{'name':<15}{'amount':<5}"
-        separator = f"{'-' * len(title)}"
-        return [title, separator]
+    def lines(self):
+        return self.renderer.lines(self.expenses.outs, self.expenses.total())
 
-    def table(self):
-        lines = []
-        for e in self.expenses.outs:
-            line = f"{e.name:<15}{e.amount:<5}"
-            lines.append(line)
-        return lines
-
-    def summary_row(self):
-        summary = f"{'total':<15}{self.expenses.total()}"
-        separator = f"{'-' * len(summary)}"
-        return [separator, summary]
-
-    def print_report(self):
-        for row in self.header():
-            print(row)
-        for row in self.table():
-            print(row)
-        for row in self.summary_row():
-            print(row)
+    def print_report(self, stream=None):
+        return self.renderer.write(self.expenses.outs, stream or sys.stdout, self.expenses.total())
 
 
 
@@ -84,6 +82,11 @@ def create_expense():
     return e
 
 
+# public holidays, one ISO date per line, are not working days for first/last working day schedules
+HOLIDAYS_FILE = "holidays.txt"
+if os.path.exists(HOLIDAYS_FILE):
+    set_default_calendar(BusinessCalendar.from_file(HOLIDAYS_FILE))
+
 outgoings = Outgoings()
 def add_expenses():
     while True:
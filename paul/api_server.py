@@ -0,0 +1,207 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+import datetime
+import json
+import sys
+import threading
+import traceback
+
+from expense_manager import ExpenseManager
+from expense_store import ColumnarExpenseStore
+from form_system import create_expense_form
+from importer import FormImporter
+import repo_root  # noqa: F401
+from forecast import forecast
+from period import Period
+from sqlite_store import SQLiteExpenseStore
+
+MAX_BODY = 16 * 1024 * 1024
+
+
+class APIError(Exception):
+    """An error to send back as a JSON body with the given HTTP status"""
+
+    def __init__(self, status: int, body: Any):
+        super().__init__(status, body)
+        self.status = status
+        self.body = body
+
+
+def month_start(date: datetime.date, months: int = 0) -> datetime.date:
+    """The first day of the month a number of months after the one date is in"""
+    year, month = divmod(date.year * 12 + date.month - 1 + months, 12)
+    return datetime.date(year, month + 1, 1)
+
+
+class ExpenseAPI:
+    """The JSON endpoints over an ExpenseManager, separate from HTTP so they can be called directly
+
+    Records are parsed and validated by a FormImporter over the expense form, so
+    they accept what an import file would. One lock serialises access to the
+    manager; batches take it once for the whole batch.
+    """
+
+    def __init__(self, manager: ExpenseManager, importer: FormImporter = None):
+        self.manager = manager
+        self.importer = importer or FormImporter(create_expense_form())
+        self.lock = threading.Lock()
+        self.routes: Dict[Tuple[str, str], Callable[[Dict[str, List[str]], Any], Tuple[int, Any]]] = {
+            ("POST", "/expenses"): self.add,
+            ("POST", "/expenses/batch"): self.add_batch,
+            ("GET", "/totals"): self.totals,
+            ("GET", "/categories"): self.categories,
+            ("GET", "/forecast"): self.forecast,
+        }
+
+    def _submit(self, record: Any) -> Any:
+        if not isinstance(record, dict):
+            raise ValueError({"record": ["Expected a JSON object"]})
+        return self.importer.submit(record)
+
+    def add(self, query: Dict[str, List[str]], body: Any) -> Tuple[int, Any]:
+        try:
+            expense = self._submit(body)
+        except ValueError as e:
+            raise APIError(400, {"errors": e.args[0]})
+        with self.lock:
+            self.manager.add_expense(expense)
+            position = len(self.manager.expenses) - 1
+        return 201, {"index": position}
+
+    def add_batch(self, query: Dict[str, List[str]], body: Any) -> Tuple[int, Any]:
+        """Add every valid record of a JSON list, reporting the invalid ones by position"""
+        if not isinstance(body, list):
+            raise APIError(400, {"errors": {"body": ["Expected a JSON list of expenses"]}})
+        expenses = []
+        errors = {}
+        for position, record in enumerate(body):
+            try:
+                expenses.append(self._submit(record))
+            except ValueError as e:
+                errors[position] = e.args[0]
+        with self.lock:
+            self.manager.add_expenses(expenses)
+        return 201 if expenses else 400, {"added": len(expenses), "errors": errors}
+
+    def totals(self, query: Dict[str, List[str]], body: Any) -> Tuple[int, Any]:
+        with self.lock:
+            return 200, {"total": self.manager.total(), "count": len(self.manager.expenses)}
+
+    def categories(self, query: Dict[str, List[str]], body: Any) -> Tuple[int, Any]:
+        with self.lock:
+            return 200, {str(category): total for category, total in self.manager.get_category_totals().items()}
+
+    def forecast(self, query: Dict[str, List[str]], body: Any) -> Tuple[int, Any]:
+        """Totals per month and category for ?months= calendar months from ?start= (this month by default)"""
+        try:
+            start = datetime.date.fromisoformat(query["start"][0]) if "start" in query else datetime.date.today()
+            months = int(query.get("months", ["12"])[0])
+        except ValueError as e:
+            raise APIError(400, {"errors": {"query": [str(e)]}})
+        if not 1 <= months <= 1200:
+            raise APIError(400, {"errors": {"months": ["months must be between 1 and 1200"]}})
+
+        first = month_start(start)
+        with self.lock:
+            expenses = list(self.manager.expenses)
+
+        # the shared forecast expands each distinct schedule once and sums integer cents. It runs
+        # outside the lock, the occurrence cache and business calendars it shares have locks of their own
+        result = forecast(expenses, Period(first, month_start(first, months)), "M")
+        return 200, [
+            {"month": bucket_start.strftime("%Y-%m"),
+             "total": sum(series[i] for series in result.cents.values()) / 100,
+             "categories": {str(category): series[i] / 100 for category, series in result.cents.items() if series[i]}}
+            for i, (bucket_start, _) in enumerate(result.buckets)
+        ]
+
+    def handle(self, method: str, target: str, body: bytes) -> Tuple[int, Any]:
+        """Route a request, returning the status and the object to send back as JSON"""
+        url = urlsplit(target)
+        route = self.routes.get((method, url.path.rstrip("/") or "/"))
+        if route is None:
+            if any(path == url.path for _, path in self.routes):
+                return 405, {"error": f"{method} is not allowed on {url.path}"}
+            return 404, {"error": f"No endpoint at {url.path}"}
+        try:
+            payload = json.loads(body) if body else None
+        except ValueError as e:
+            return 400, {"errors": {"body": [f"Invalid JSON: {e}"]}}
+        try:
+            return route(parse_qs(url.query), payload)
+        except APIError as e:
+            return e.status, e.body
+        except Exception:
+            # the client still gets a JSON reply rather than a dropped connection, the details go to stderr
+            traceback.print_exc()
+            return 500, {"error": "Internal server error"}
+
+
+class APIRequestHandler(BaseHTTPRequestHandler):
+    """Hands requests to an ExpenseAPI, keeping connections open between them (HTTP/1.1)"""
+
+    protocol_version = "HTTP/1.1"
+    # headers and body go out in separate writes, with Nagle on each response waits for a delayed ACK
+    disable_nagle_algorithm = True
+    api: ExpenseAPI = None
+
+    def _dispatch(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # without a usable length the rest of the stream can't be framed, so the connection goes too
+            self._reply(400, {"error": "Content-Length must be a non-negative integer"})
+            self.close_connection = True
+            return
+        if length > MAX_BODY:
+            self._reply(413, {"error": f"Request bodies are limited to {MAX_BODY} bytes"})
+            self.close_connection = True
+            return
+        body = self.rfile.read(length) if length else b""
+        status, payload = self.api.handle(self.command, self.path, body)
+        self._reply(status, payload)
+
+    def _reply(self, status: int, payload: Any):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = _dispatch
+    do_POST = _dispatch
+
+    def log_message(self, format: str, *args):
+        # one line per request on stderr slows the server down under load
+        pass
+
+
+def make_server(api: ExpenseAPI, host: str = "127.0.0.1", port: int = 8080) -> ThreadingHTTPServer:
+    """Bind a threaded HTTP server for the API, port 0 picks a free port"""
+    handler = type("BoundAPIRequestHandler", (APIRequestHandler,), {"api": api})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(port: int = 8080, db_path: str = None):
+    # request threads only reach the store through the API's lock
+    store = SQLiteExpenseStore(db_path, check_same_thread=False) if db_path else ColumnarExpenseStore()
+    manager = ExpenseManager(store)
+    server = make_server(ExpenseAPI(manager), port=port)
+    host, port = server.server_address[:2]
+    print(f"Serving the expense API on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 8080, sys.argv[2] if len(sys.argv) > 2 else None)
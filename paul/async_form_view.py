@@ -0,0 +1,163 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+
+from form_system import CompiledForm, Form, FormField, FormView
+
+
+class AsyncFormView(FormView):
+    """Form view for one client on an asyncio stream pair
+
+    Prompts and retries work like TerminalFormView, but every answer waits on the
+    reader instead of blocking on input(), so one event loop can serve thousands
+    of sessions at once. Answers are kept in this view's own record rather than in
+    field.value, which lets every session share the same Form and CompiledForm.
+    """
+
+    def __init__(self, form: Form, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 compiled: Optional[CompiledForm] = None):
+        super().__init__(form)
+        self.reader = reader
+        self.writer = writer
+        self.compiled = compiled or form.compile()
+        self.record: Dict[str, Any] = {}
+
+    def _write(self, text: str):
+        self.writer.write(text.encode())
+
+    async def _ask(self, prompt: str) -> str:
+        """Send a prompt and wait for the answer line, raising EOFError if the client has gone
+
+        A line that isn't UTF-8 is asked for again. One longer than the reader's
+        limit counts as the client leaving, since the rest of it is still to come.
+        """
+        while True:
+            self._write(prompt)
+            await self.writer.drain()
+            try:
+                line = await self.reader.readline()
+            except (ValueError, asyncio.LimitOverrunError):
+                raise EOFError("client sent a line longer than the limit")
+            if not line:
+                raise EOFError("client closed the connection")
+            try:
+                return line.decode().strip()
+            except UnicodeDecodeError:
+                self._write("Error: Please answer in UTF-8 text.\n")
+
+    async def render(self) -> None:
+        """Ask for every field in turn"""
+        self._write(f"\n--- {self.form.name} ---\n\n")
+
+        for field in self.form.fields:
+            # Fields the earlier answers leave unused are not asked for
+            if field.is_used(self.record):
+                await self._render_field(field)
+
+    async def _render_field(self, field: FormField) -> None:
+        """Ask for a single field until the answer passes its validators"""
+        prompt = f"{field.label}"
+        if field.required:
+            prompt += " *"
+
+        if field.field_type == 'select' and field.options:
+            self._write(f"\n{prompt}:\n")
+            for option in field.options:
+                self._write(f"  {option}: {field.options_dict.get(option, option)}\n")
+            question = "> "
+        else:
+            default_display = f" [{field.default}]" if field.default is not None else ""
+            question = f"{prompt}{default_display}: "
+
+        while True:
+            value = await self._ask(question)
+            if not value and field.default is not None:
+                value = field.default
+
+            if field.field_type == 'numeric' and value != '':
+                try:
+                    value = float(value)
+                    if value.is_integer():
+                        value = int(value)
+                except ValueError:
+                    self._write("Error: Please enter a numeric value.\n")
+                    continue
+
+            errors = field.validate(value)
+            if not errors:
+                # An optional field left empty has no value, like a missing record entry
+                self.record[field.name] = None if value == '' else value
+                return
+
+            for error in errors:
+                self._write(f"Error: {error}\n")
+
+    async def process(self) -> Any:
+        """Ask for the whole form and return the submitted output, None if the client left or it was invalid"""
+        try:
+            await self.render()
+        except (EOFError, ConnectionError):
+            return None
+
+        try:
+            result = self.compiled.submit(self.record)
+        except ValueError as e:
+            self._write(f"Error: {e}\n")
+            result = None
+        else:
+            self._write("Saved.\n")
+
+        try:
+            await self.writer.drain()
+        except ConnectionError:
+            pass
+        return result
+
+
+def form_session_handler(form: Form, on_submit: Callable[[Any], Any]
+                         ) -> Callable[[asyncio.StreamReader, asyncio.StreamWriter], Awaitable[None]]:
+    """Build a client_connected_cb for asyncio.start_server that runs one form session per connection
+
+    The form is compiled once and shared by every session. on_submit is called
+    with each submitted output.
+    """
+    compiled = form.compile()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            result = await AsyncFormView(form, reader, writer, compiled).process()
+            if result is not None:
+                on_submit(result)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    return handle
+
+
+async def serve_forms(form: Form, on_submit: Callable[[Any], Any], host: str = "127.0.0.1",
+                      port: int = 8765) -> asyncio.AbstractServer:
+    """Start a TCP server that hands every connection its own session of the form"""
+    return await asyncio.start_server(form_session_handler(form, on_submit), host, port)
+
+
+def main():
+    from form_system import create_expense_form
+
+    async def run():
+        server = await serve_forms(create_expense_form(), lambda expense: print(f"Added {expense.name}"))
+        host, port = server.sockets[0].getsockname()[:2]
+        print(f"Serving the expense form on {host}:{port}, connect with e.g. `nc {host} {port}`")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
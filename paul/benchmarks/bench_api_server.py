@@ -0,0 +1,109 @@
+"""Load generator for the expense API: keep-alive clients against a server on localhost
+
+Without a URL a server is started in this process on a free port. Every client
+thread keeps one HTTP/1.1 connection open and sends a mix of single adds,
+batches, totals and per-category requests, and the latency of every request is
+recorded.
+
+Run from the repository root:
+
+    python paul/benchmarks/bench_api_server.py [requests] [clients] [url]
+"""
+from http.client import HTTPConnection
+from urllib.parse import urlsplit
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api_server import ExpenseAPI, make_server
+from expense_manager import ExpenseManager
+from expense_store import ColumnarExpenseStore
+
+REQUESTS = 20_000
+CLIENTS = 16
+BATCH_SIZE = 100
+
+
+def make_record(rng: random.Random, i: int) -> dict:
+    record = {"name": f"Payee {i % 5000}", "amount": rng.randint(1, 50000) / 100, "category": rng.choice("rgenu")}
+    if rng.random() < 0.5:
+        record.update(schedule_type="a", anchor_day=rng.randint(1, 28))
+    else:
+        record.update(schedule_type="f", fl_anchor=rng.choice("fl"))
+    return record
+
+
+def make_request(rng: random.Random, i: int) -> tuple:
+    kind = rng.random()
+    if kind < 0.7:
+        return "POST", "/expenses", make_record(rng, i)
+    if kind < 0.8:
+        return "POST", "/expenses/batch", [make_record(rng, i + n) for n in range(BATCH_SIZE)]
+    if kind < 0.9:
+        return "GET", "/totals", None
+    return "GET", "/categories", None
+
+
+def run_client(host: str, port: int, requests: list, latencies: list, failures: list):
+    connection = HTTPConnection(host, port)
+    headers = {"Content-Type": "application/json"}
+    for method, path, payload in requests:
+        body = json.dumps(payload).encode() if payload is not None else None
+        began = time.perf_counter()
+        connection.request(method, path, body, headers)
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - began)
+        if response.status >= 400:
+            failures.append((method, path, response.status))
+    connection.close()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else REQUESTS
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else CLIENTS
+    server = None
+    if len(sys.argv) > 3:
+        url = urlsplit(sys.argv[3])
+        host, port = url.hostname, url.port
+    else:
+        server = make_server(ExpenseAPI(ExpenseManager(ColumnarExpenseStore())), port=0)
+        host, port = server.server_address[:2]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    rng = random.Random(count)
+    requests = [make_request(rng, i) for i in range(count)]
+    latencies = []
+    failures = []
+    threads = [
+        threading.Thread(target=run_client, args=(host, port, requests[c::clients], latencies, failures))
+        for c in range(clients)
+    ]
+
+    began = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+    if failures:
+        raise AssertionError(f"{len(failures)} requests failed, the first was {failures[0]}")
+
+    latencies.sort()
+    print(f"{count:,} requests from {clients} keep-alive clients against {host}:{port}")
+    print(f"{count / elapsed:,.0f} requests/s over {elapsed:.2f}s")
+    print(f"latency p50 {latencies[len(latencies) // 2] * 1000:.2f}ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Load test of AsyncFormView: many expense form sessions in flight in one event loop
+
+Every session is a local socket pair. The server end is handed to the same
+connection handler serve_forms uses, and the client end answers each prompt as
+it arrives, getting the amount wrong once in a while to go through a retry.
+
+Run from the repository root:
+
+    python paul/benchmarks/bench_async_forms.py [sessions] [concurrent]
+"""
+import asyncio
+import os
+import random
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from async_form_view import form_session_handler
+from form_system import create_expense_form
+
+SESSIONS = 5_000
+CONCURRENT = 1_000
+
+
+def make_answers(rng: random.Random, i: int) -> list:
+    answers = [f"Payee {i}"]
+    if rng.random() < 0.1:
+        answers.append("lots")
+    answers += [str(rng.randint(1, 50000) / 100), rng.choice("rgenu")]
+    if rng.random() < 0.5:
+        answers += ["a", str(rng.randint(1, 28)), ""]
+    else:
+        answers += ["f", "", rng.choice("fl")]
+    return answers
+
+
+async def client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, answers: list) -> str:
+    """Answer every prompt in turn, then read what is left until the server hangs up"""
+    received = ""
+    answers = iter(answers)
+    while True:
+        data = await reader.read(4096)
+        if not data:
+            writer.close()
+            return received
+        received += data.decode()
+        if received.endswith(": ") or received.endswith("> "):
+            writer.write(f"{next(answers)}\n".encode())
+            await writer.drain()
+
+
+async def run(sessions: int, concurrent: int) -> tuple:
+    submitted = []
+    handler = form_session_handler(create_expense_form(), submitted.append)
+    rng = random.Random(sessions)
+    limit = asyncio.Semaphore(concurrent)
+    latencies = []
+    retries = 0
+
+    async def session(i: int):
+        nonlocal retries
+        answers = make_answers(rng, i)
+        async with limit:
+            began = time.perf_counter()
+            server_sock, client_sock = socket.socketpair()
+            server_streams = await asyncio.open_connection(sock=server_sock)
+            client_streams = await asyncio.open_connection(sock=client_sock)
+            _, transcript = await asyncio.gather(handler(*server_streams), client(*client_streams, answers))
+            latencies.append(time.perf_counter() - began)
+            retries += transcript.count("Error: ")
+
+    began = time.perf_counter()
+    await asyncio.gather(*(session(i) for i in range(sessions)))
+    return time.perf_counter() - began, submitted, sorted(latencies), retries
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else SESSIONS
+    concurrent = int(sys.argv[2]) if len(sys.argv) > 2 else CONCURRENT
+
+    elapsed, submitted, latencies, retries = asyncio.run(run(sessions, concurrent))
+    if len(submitted) != sessions:
+        raise AssertionError(f"{len(submitted)} of {sessions} sessions submitted an expense")
+
+    print(f"{sessions:,} sessions, up to {concurrent:,} at once, {retries:,} answers retried")
+    print(f"{elapsed:.2f}s, {sessions / elapsed:,.0f} sessions/s")
+    print(f"session latency p50 {latencies[len(latencies) // 2] * 1000:.1f}ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Measures category queries through the category index against scanning every expense
+
+The index is built once from the category column of a columnar store, then
+filtered totals, unions of categories and top-N per category only touch the
+rows of the categories asked about. Keeping it up to date costs an append per
+added expense and a tombstone per removal, with the positions rewritten
+once a quarter of the rows are tombstones.
+
+Run from the repository root:
+
+    python paul/benchmarks/bench_category_index.py [rows]
+"""
+from array import array
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from categories import ExpenseCategory
+from category_index import CategoryIndex
+from expense_manager import ExpenseManager
+from expense_store import ColumnarExpenseStore
+from expenses import Expense
+
+ROWS = 5_000_000
+NAMES = 5000
+REMOVALS = 1000
+
+
+def make_store(n: int) -> ColumnarExpenseStore:
+    rng = random.Random(n)
+    categories = list(ExpenseCategory)
+    # a skewed mix, most expenses are groceries and eating out
+    weights = [1, 40, 30, 20, 9]
+    return ColumnarExpenseStore.from_columns(
+        array('d', (rng.randint(100, 50000) / 100 for _ in range(n))),
+        array('B', rng.choices(range(len(categories)), weights, k=n)),
+        array('I', (rng.randrange(NAMES) for _ in range(n))),
+        [None] * n,
+        categories,
+        [f"Payee {i}" for i in range(NAMES)],
+    )
+
+
+def timed(action):
+    began = time.perf_counter()
+    result = action()
+    return result, time.perf_counter() - began
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    store = make_store(rows)
+    wanted = (ExpenseCategory.RENT, ExpenseCategory.UTILITIES)
+
+    manager, startup = timed(lambda: ExpenseManager(store))
+    _, build = timed(manager.get_category_index)
+    union, union_time = timed(lambda: manager.get_expenses_in(*wanted))
+    total, total_time = timed(lambda: manager.total_in(*wanted))
+    _, top_time = timed(lambda: manager.top_expenses_by_category(10))
+    _, add_time = timed(lambda: [manager.add_expense(Expense("Payee 1", 9.99, ExpenseCategory.RENT, None))
+                                 for _ in range(1000)])
+    # the same removals on a separate index first, the store is left alone so row rows // 2 + k is removed k-th
+    index = CategoryIndex.for_store(store)
+    middle = [store[rows // 2 + k].category for k in range(REMOVALS)]
+    _, index_remove_time = timed(lambda: [index.remove(rows // 2, category) for category in middle])
+    _, remove_time = timed(lambda: [manager.remove_expense(rows // 2) for _ in range(REMOVALS)])
+
+    scanned, scan_time = timed(lambda: [expense for expense in store if expense.category in wanted])
+    assert len(scanned) == len(manager.get_expenses_in(*wanted))
+
+    print(f"{rows:,} rows, {len(union):,} in {' or '.join(wanted)} totalling {total:,.2f}")
+    print(f"ExpenseManager startup {startup:.2f}s, category index built in {build:.2f}s")
+    print(f"union of two categories {union_time:.3f}s, against {scan_time:.2f}s scanning every expense")
+    print(f"filtered total {total_time * 1e6:.0f}us, top 10 of every category {top_time:.2f}s")
+    print(f"per add {add_time / 1000 * 1e6:.1f}us, per removal from the middle {remove_time / REMOVALS * 1e3:.2f}ms "
+          f"of which {index_remove_time / REMOVALS * 1e6:.1f}us in the category index")
+
+
+if __name__ == "__main__":
+    main()
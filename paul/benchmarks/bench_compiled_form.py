@@ -0,0 +1,66 @@
+"""Compares submitting records through a Form field by field against CompiledForm.submit_many
+
+Run from the repository root:
+
+    python paul/benchmarks/bench_compiled_form.py [records]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from form_system import create_expense_form
+
+RECORDS = 1_000_000
+
+
+def make_records(n: int) -> list:
+    rng = random.Random(n)
+    records = []
+    for i in range(n):
+        record = {"name": f"Payee {i % 5000}", "amount": rng.randint(1, 50000) / 100,
+                  "category": rng.choice("rgenu")}
+        if rng.random() < 0.5:
+            record.update(schedule_type="a", anchor_day=rng.randint(1, 28))
+        else:
+            record.update(schedule_type="f", fl_anchor=rng.choice("fl"))
+        records.append(record)
+    return records
+
+
+def submit_with_form(form, records: list) -> list:
+    """The existing path: set every field, check is_valid(), then submit() validates again"""
+    results = []
+    for record in records:
+        for field in form.fields:
+            field.value = record.get(field.name)
+        if form.is_valid():
+            results.append(form.submit())
+    return results
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else RECORDS
+    records = make_records(n)
+    form = create_expense_form()
+
+    began = time.perf_counter()
+    submitted = len(submit_with_form(form, records))
+    form_elapsed = time.perf_counter() - began
+
+    began = time.perf_counter()
+    results, failures = form.compile().submit_many(records)
+    compiled_elapsed = time.perf_counter() - began
+
+    if submitted != len(results):
+        raise AssertionError("the compiled form accepted a different number of records")
+
+    print(f"{'path':<10} {'seconds':>8} {'records/s':>12}")
+    print(f"{'form':<10} {form_elapsed:>8.2f} {n / form_elapsed:>12,.0f}")
+    print(f"{'compiled':<10} {compiled_elapsed:>8.2f} {n / compiled_elapsed:>12,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Measures memory per expense row for the list and columnar expense stores
+
+Each store is measured bare and behind an ExpenseManager, which adds the
+running totals it keeps for every change.
+
+Run from the repository root:
+
+    python paul/benchmarks/bench_expense_store.py
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from categories import ExpenseCategory
+from expense_manager import ExpenseManager
+from expense_store import ListExpenseStore, ColumnarExpenseStore
+from expenses import Expense
+from schedules import AnchoredExpenseSchedule
+
+ROWS = 1_000_000
+NAMES = [f"Payee {i}" for i in range(5_000)]
+
+
+def make_rows(n: int):
+    """Yield expense field values without keeping them alive between rows"""
+    rng = random.Random(n)
+    categories = list(ExpenseCategory)
+    schedule = AnchoredExpenseSchedule(1)
+    for _ in range(n):
+        yield rng.choice(NAMES), round(rng.uniform(1, 500), 2), rng.choice(categories), schedule
+
+
+def measure(store_class, n: int, managed: bool = False):
+    """Return (bytes per row, seconds) for filling a store with n rows, through an ExpenseManager when managed"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    began = time.perf_counter()
+
+    store = store_class()
+    add = ExpenseManager(store).add_expense if managed else store.add
+    for name, amount, category, schedule in make_rows(n):
+        add(Expense(name, amount, category, schedule))
+
+    elapsed = time.perf_counter() - began
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    total_began = time.perf_counter()
+    store.total()
+    total_elapsed = time.perf_counter() - total_began
+    return used / n, elapsed, total_elapsed
+
+
+def main():
+    print(f"{'store':<38} {'bytes/row':>10} {'fill (s)':>10} {'total() (ms)':>13}")
+    for store_class in (ListExpenseStore, ColumnarExpenseStore):
+        for managed in (False, True):
+            per_row, fill, total = measure(store_class, ROWS, managed)
+            label = f"ExpenseManager({store_class.__name__})" if managed else store_class.__name__
+            print(f"{label:<38} {per_row:>10.1f} {fill:>10.2f} {total * 1000:>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Measures durable insert throughput of the journaled store at different group commit sizes
+
+Each run adds expenses one at a time through ExpenseManager. With a batch size
+of 1 every insert waits for its own fsync; larger groups share one. Then a
+long journal is replayed the way a restart would, and compacted into a
+snapshot. Last, several threads append straight to a journal and wait for
+each of their records to be on disk, sharing fsyncs through group commit.
+
+Run from the repository root:
+
+    python paul/benchmarks/bench_journal.py [inserts]
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from categories import ExpenseCategory
+from expense_manager import ExpenseManager
+from expenses import Expense
+from journal import Journal, JournaledExpenseStore, encode_add
+import repo_root  # noqa: F401
+from schedule_registry import intern_schedule
+from schedules import AnchoredExpenseSchedule, FirstLastWorkingDayMonthlyExpenseSchedule
+
+INSERTS = 100_000
+BATCH_SIZES = [1, 16, 256, 4096]
+UNBATCHED_INSERTS = 2_000
+REPLAY = 1_000_000
+WRITER_THREADS = [1, 4, 16]
+
+
+def make_expenses(n: int) -> list:
+    rng = random.Random(n)
+    categories = list(ExpenseCategory)
+    schedules = [intern_schedule(AnchoredExpenseSchedule(day)) for day in range(1, 29)]
+    schedules += [intern_schedule(FirstLastWorkingDayMonthlyExpenseSchedule(anchor)) for anchor in "fl"]
+    return [
+        Expense(f"Payee {rng.randint(1, 5000)}", rng.randint(100, 50000) / 100, rng.choice(categories), rng.choice(schedules))
+        for _ in range(n)
+    ]
+
+
+def main():
+    inserts = int(sys.argv[1]) if len(sys.argv) > 1 else INSERTS
+    expenses = make_expenses(max(inserts, REPLAY))
+
+    for batch_size in BATCH_SIZES:
+        count = min(inserts, UNBATCHED_INSERTS) if batch_size == 1 else inserts
+        with tempfile.TemporaryDirectory() as directory:
+            store = JournaledExpenseStore(directory, batch_size=batch_size, compact_after=0)
+            manager = ExpenseManager(store)
+            began = time.perf_counter()
+            for expense in expenses[:count]:
+                manager.add_expense(expense)
+            store.commit()
+            elapsed = time.perf_counter() - began
+            syncs = store.journal.syncs
+            store.close()
+        print(f"batch {batch_size:>5}: {count / elapsed:>9,.0f} durable inserts/s, {syncs:,} syncs for {count:,}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        with JournaledExpenseStore(directory, batch_size=4096, compact_after=0) as store:
+            store.extend(expenses[:REPLAY])
+
+        began = time.perf_counter()
+        store = JournaledExpenseStore(directory, compact_after=0)
+        replay = time.perf_counter() - began
+        assert len(store) == REPLAY
+
+        began = time.perf_counter()
+        store.compact()
+        compact = time.perf_counter() - began
+        store.close()
+
+        began = time.perf_counter()
+        with JournaledExpenseStore(directory, compact_after=0) as store:
+            reopen = time.perf_counter() - began
+    print(f"replay of {REPLAY:,} journaled inserts {replay:.2f}s, compaction {compact:.2f}s, "
+          f"reopening from the snapshot {reopen:.2f}s")
+
+
+    for threads in WRITER_THREADS:
+        payloads = [encode_add(expense) for expense in expenses[:UNBATCHED_INSERTS]]
+        with tempfile.TemporaryDirectory() as directory:
+            with Journal(os.path.join(directory, "journal")) as journal:
+                def write(part):
+                    for payload in part:
+                        journal.wait(journal.append(payload))
+
+                workers = [threading.Thread(target=write, args=(payloads[i::threads],)) for i in range(threads)]
+                began = time.perf_counter()
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+                elapsed = time.perf_counter() - began
+                syncs = journal.syncs
+        print(f"{threads:>2} waiting writers: {len(payloads) / elapsed:>9,.0f} durable appends/s, "
+              f"{syncs:,} syncs for {len(payloads):,}")
+
+
+if __name__ == "__main__":
+    main()
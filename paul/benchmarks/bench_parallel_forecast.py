@@ -0,0 +1,90 @@
+"""Scaling of parallel_forecast from one worker process up to one per core, against forecast()
+
+forecast() builds an Expense per row of a column store, parallel_forecast
+only ships slices of its columns to the workers. Both are run over a
+ColumnarExpenseStore and over the same rows mapped from a snapshot, and
+every result is checked against forecast().
+
+Run from the repository root, optionally with the number of rows:
+
+    python paul/benchmarks/bench_parallel_forecast.py [rows]
+"""
+from array import array
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from categories import ExpenseCategory
+from expense_store import ColumnarExpenseStore
+from parallel_forecast import parallel_forecast
+import repo_root  # noqa: F401
+from forecast import forecast
+from period import Period
+from schedule_registry import intern_schedule
+from schedules import AnchoredExpenseSchedule, FirstLastWorkingDayMonthlyExpenseSchedule
+from snapshot_store import SnapshotExpenseStore, write_snapshot
+
+ROWS = 2_000_000
+NAMES = 5000
+PERIOD = Period(datetime.date(2025, 1, 1), end=datetime.date(2055, 1, 1))
+
+
+def make_store(n: int) -> ColumnarExpenseStore:
+    rng = random.Random(n)
+    schedules = [intern_schedule(AnchoredExpenseSchedule(day)) for day in range(1, 29)]
+    schedules += [intern_schedule(FirstLastWorkingDayMonthlyExpenseSchedule(anchor)) for anchor in "fl"]
+    categories = list(ExpenseCategory)
+    return ColumnarExpenseStore.from_columns(
+        array('d', (rng.randint(100, 50000) / 100 for _ in range(n))),
+        array('B', (rng.randrange(len(categories)) for _ in range(n))),
+        array('I', (rng.randrange(NAMES) for _ in range(n))),
+        [rng.choice(schedules) for _ in range(n)],
+        categories,
+        [f"Payee {i}" for i in range(NAMES)],
+    )
+
+
+def worker_counts() -> list:
+    """1, 2, 4 and so on up to one worker per core"""
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 < cores:
+        counts.append(counts[-1] * 2)
+    return counts + [cores] if cores > 1 else counts
+
+
+def timed(action):
+    began = time.perf_counter()
+    result = action()
+    return result, time.perf_counter() - began
+
+
+def measure(name: str, store):
+    expected, serial = timed(lambda: forecast(store, PERIOD, "M"))
+    print(f"{name}: forecast() {serial:.2f}s")
+    for workers in worker_counts():
+        result, elapsed = timed(lambda: parallel_forecast(store, PERIOD, "M", workers))
+        assert result.cents == expected.cents
+        print(f"{name}: {workers:3} workers {elapsed:.2f}s, {serial / elapsed:.1f}x forecast()")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    store = make_store(rows)
+    print(f"{rows:,} rows over {len(PERIOD.make_period_list('M'))} months, {os.cpu_count()} cores")
+    measure("columnar", store)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "ledger.snapshot")
+        write_snapshot(path, store)
+        with SnapshotExpenseStore(path) as snapshot:
+            measure("snapshot", snapshot)
+
+
+if __name__ == "__main__":
+    main()
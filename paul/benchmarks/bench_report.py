@@ -0,0 +1,70 @@
+"""Compares building the whole report as a list and printing it against streaming it
+
+Run from the repository root:
+
+    python paul/benchmarks/bench_report.py [rows]
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from categories import ExpenseCategory
+from expense_manager import ExpenseManager
+from expense_store import ColumnarExpenseStore
+from expenses import Expense
+
+ROWS = 1_000_000
+
+
+def make_manager(n: int) -> ExpenseManager:
+    rng = random.Random(n)
+    categories = list(ExpenseCategory)
+    manager = ExpenseManager(ColumnarExpenseStore())
+    manager.add_expenses(
+        Expense(f"Payee {rng.randint(1, 5000)}", rng.randint(1, 50000) / 100, rng.choice(categories), None)
+        for _ in range(n)
+    )
+    return manager
+
+
+def as_list(manager: ExpenseManager, stream) -> int:
+    """The old way: build every line with fixed widths, then print them one by one"""
+    lines = ["Expense Report", "=" * 40, f"{'Name':<20} {'Category':<15} {'Amount':>10}", "-" * 40]
+    for expense in manager.expenses:
+        lines.append(f"{expense.name:<20} {expense.category:<15} {expense.amount:>10.2f}")
+    lines.append("-" * 40)
+    lines.append(f"{'Total':<35} {manager.total():>10.2f}")
+    for line in lines:
+        print(line, file=stream)
+    return len(lines)
+
+
+def streamed(manager: ExpenseManager, stream) -> int:
+    return manager.write_report(stream)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    manager = make_manager(n)
+
+    print(f"{'path':<10} {'lines/s':>12} {'peak MB':>8}")
+    with open(os.devnull, "w") as devnull:
+        for name, render in [("list", as_list), ("streamed", streamed)]:
+            began = time.perf_counter()
+            lines = render(manager, devnull)
+            elapsed = time.perf_counter() - began
+
+            # Memory is measured on a second run, tracemalloc slows everything down
+            tracemalloc.start()
+            render(manager, devnull)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{name:<10} {lines / elapsed:>12,.0f} {peak / 1e6:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
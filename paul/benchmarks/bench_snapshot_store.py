@@ -0,0 +1,82 @@
+"""Measures writing a large ledger to a snapshot and mapping it back in
+
+Opening maps the file without reading the rows, so it should stay in the
+milliseconds however large the ledger is. Totals then run over the mapped
+columns, and starting an ExpenseManager over the snapshot only converts each
+distinct amount per category to cents instead of every expense.
+
+Run from the repository root:
+
+    python paul/benchmarks/bench_snapshot_store.py [rows]
+"""
+from array import array
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from categories import ExpenseCategory
+from expense_manager import ExpenseManager
+from expense_store import ColumnarExpenseStore
+import repo_root  # noqa: F401
+from schedule_registry import intern_schedule
+from schedules import AnchoredExpenseSchedule, FirstLastWorkingDayMonthlyExpenseSchedule
+from snapshot_store import SnapshotExpenseStore, write_snapshot
+
+ROWS = 10_000_000
+NAMES = 5000
+
+
+def make_store(n: int) -> ColumnarExpenseStore:
+    rng = random.Random(n)
+    schedules = [intern_schedule(AnchoredExpenseSchedule(day)) for day in range(1, 29)]
+    schedules += [intern_schedule(FirstLastWorkingDayMonthlyExpenseSchedule(anchor)) for anchor in "fl"]
+    categories = list(ExpenseCategory)
+    return ColumnarExpenseStore.from_columns(
+        array('d', (rng.randint(100, 50000) / 100 for _ in range(n))),
+        array('B', (rng.randrange(len(categories)) for _ in range(n))),
+        array('I', (rng.randrange(NAMES) for _ in range(n))),
+        [rng.choice(schedules) for _ in range(n)],
+        categories,
+        [f"Payee {i}" for i in range(NAMES)],
+    )
+
+
+def timed(action):
+    began = time.perf_counter()
+    result = action()
+    return result, time.perf_counter() - began
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    store = make_store(rows)
+    expected = store.total()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "ledger.snapshot")
+        _, write = timed(lambda: write_snapshot(path, store))
+        size = os.path.getsize(path)
+        del store
+
+        snapshot, opening = timed(lambda: SnapshotExpenseStore(path))
+        with snapshot:
+            total, summing = timed(snapshot.total)
+            assert total == expected
+            _, by_category = timed(snapshot.category_totals)
+            _, first_row = timed(lambda: snapshot[0])
+            _, manager = timed(lambda: ExpenseManager(snapshot))
+
+    print(f"{rows:,} rows, {size / rows:.1f} bytes per row, {size / 2 ** 20:,.0f} MiB")
+    print(f"write {write:.2f}s")
+    print(f"open {opening * 1000:.2f}ms")
+    print(f"first row {first_row * 1000:.3f}ms")
+    print(f"total {summing:.3f}s, per category {by_category:.3f}s")
+    print(f"ExpenseManager over the snapshot {manager:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Measures bulk insert and load throughput of the SQLite expense store
+
+Run from the repository root:
+
+    python paul/benchmarks/bench_sqlite_store.py
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from categories import ExpenseCategory
+from expenses import Expense
+from schedules import AnchoredExpenseSchedule, FirstLastWorkingDayMonthlyExpenseSchedule
+from sqlite_store import SQLiteExpenseStore
+
+ROWS = 100_000
+BATCH = 10_000
+
+
+def make_expenses(n: int) -> list:
+    rng = random.Random(n)
+    categories = list(ExpenseCategory)
+    schedules = [AnchoredExpenseSchedule(day) for day in range(1, 29)]
+    schedules += [FirstLastWorkingDayMonthlyExpenseSchedule("f"), FirstLastWorkingDayMonthlyExpenseSchedule("l")]
+    return [
+        Expense(f"Payee {rng.randint(1, 5000)}", round(rng.uniform(1, 500), 2), rng.choice(categories), rng.choice(schedules))
+        for _ in range(n)
+    ]
+
+
+def main():
+    expenses = make_expenses(ROWS)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+
+        with SQLiteExpenseStore(path) as store:
+            began = time.perf_counter()
+            for start in range(0, ROWS, BATCH):
+                store.extend(expenses[start:start + BATCH])
+            insert = time.perf_counter() - began
+
+        began = time.perf_counter()
+        with SQLiteExpenseStore(path) as store:
+            loaded = sum(1 for _ in store)
+        load = time.perf_counter() - began
+
+    print(f"insert: {ROWS / insert:>12,.0f} rows/s ({BATCH} rows per transaction)")
+    print(f"load:   {loaded / load:>12,.0f} rows/s")
+
+
+if __name__ == '__main__':
+    main()
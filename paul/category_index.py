@@ -0,0 +1,103 @@
+from array import array
+from bisect import bisect_left
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Tuple
+
+from row_ids import RowIds
+
+
+class CategoryIndex:
+    """The positions of the expenses in each category, in increasing order
+
+    Each category keeps the row ids (see RowIds) of its expenses in an array
+    of unsigned ints, so the expenses of a category are found without looking
+    at any other row. New expenses go at the end of the store and so at the
+    end of their array, keeping every array sorted. Removing an expense only
+    marks its id dead; once a quarter of the ids are dead the arrays are
+    rewritten as positions in one pass.
+    """
+
+    def __init__(self):
+        self._ids: Dict[Any, array] = {}
+        self._counts: Dict[Any, int] = {}
+        self.row_ids = RowIds()
+
+    @classmethod
+    def for_store(cls, store: Any) -> 'CategoryIndex':
+        """Index every expense of a store, straight from its category column when it has one"""
+        index = cls()
+        if hasattr(store, "category_positions"):
+            index._ids = store.category_positions()
+            index._counts = {category: len(ids) for category, ids in index._ids.items()}
+            index.row_ids = RowIds(len(store))
+        else:
+            index.extend((position, expense.category) for position, expense in enumerate(store))
+        return index
+
+    def add(self, position: int, category: Any):
+        """Index the expense just added at the end of the store, at position"""
+        if position != len(self.row_ids):
+            raise ValueError(f"Expenses are indexed as they are added at the end, expected position "
+                             f"{len(self.row_ids)}, got {position}")
+        ids = self._ids.get(category)
+        if ids is None:
+            ids = self._ids[category] = array('I')
+        ids.append(self.row_ids.add())
+        self._counts[category] = self._counts.get(category, 0) + 1
+
+    def extend(self, expenses: Iterable[Tuple[int, Any]]):
+        """Index many (position, category) pairs in increasing order of position"""
+        for position, category in expenses:
+            self.add(position, category)
+
+    def remove(self, position: int, category: Any):
+        """Drop the expense at position, the expenses after it move down by one
+
+        Raises ValueError, leaving the index as it was, when that expense isn't in the category
+        """
+        row_id = self.row_ids.id_at(position)
+        ids = self._ids.get(category, ())
+        found = bisect_left(ids, row_id)
+        if found == len(ids) or ids[found] != row_id:
+            raise ValueError(f"The expense at position {position} is not in category {category!r}")
+        self.row_ids.remove(position)
+        self._counts[category] -= 1
+        if not self._counts[category]:
+            del self._counts[category], self._ids[category]
+        if self.row_ids.needs_compaction:
+            self._compact()
+
+    def _compact(self):
+        self._ids = {category: array('I', self.row_ids.live_positions(ids)) for category, ids in self._ids.items()}
+        self.row_ids.reset()
+
+    @property
+    def categories(self) -> List[Any]:
+        """The categories with at least one expense"""
+        return list(self._counts)
+
+    def positions_of(self, category: Any) -> array:
+        """The positions of the expenses in a category, in increasing order"""
+        ids = self._ids.get(category)
+        if ids is None:
+            return array('I')
+        if not self.row_ids.dead:
+            return ids[:]
+        return array('I', self.row_ids.live_positions(ids))
+
+    @property
+    def positions(self) -> Dict[Any, array]:
+        """The positions of every category's expenses"""
+        return {category: self.positions_of(category) for category in self._counts}
+
+    def count(self, category: Any) -> int:
+        """How many expenses are in a category"""
+        return self._counts.get(category, 0)
+
+    def positions_in(self, *categories: Any) -> array:
+        """The positions of the expenses in any of the categories, in increasing order"""
+        arrays = [self.positions_of(category) for category in set(categories) if category in self._counts]
+        if len(arrays) == 1:
+            return arrays[0]
+        # sorted() finds the already sorted runs and merges them
+        return array('I', sorted(chain.from_iterable(arrays)))
@@ -1,57 +1,218 @@
+from operator import attrgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+import heapq
+import sys
+
 from form_system import TerminalFormView, create_expense_form
 from expenses import Expense
 from categories import ExpenseCategory
+from expense_store import ListExpenseStore
+import repo_root  # noqa: F401
+from aggregates import ExpenseAggregates, from_cents, to_cents
+from category_index import CategoryIndex
+from sqlite_store import SQLiteExpenseStore
+from snapshot_store import write_snapshot
+from report_renderer import Column, ReportRenderer
+from occurrence_index import OccurrenceIndex
 from schedules import AnchoredExpenseSchedule, FirstLastWorkingDayMonthlyExpenseSchedule
 
 
+REPORT_COLUMNS = [
+    Column("Name", attrgetter("name"), min_width=20),
+    Column("Category", attrgetter("category"), min_width=15),
+    Column("Amount", attrgetter("amount"), ">", ".2f", min_width=10),
+]
+
+
 class ExpenseManager:
     """Manages the collection of expenses and provides reporting functionality"""
     
-    def __init__(self):
-        self.expenses = []
+    def __init__(self, store=None):
+        # Any store from expense_store works here, a plain list of objects by default
+        self.expenses = store if store is not None else ListExpenseStore()
+        
+        # Totals are kept up to date on every change so reading them never rescans, only a
+        # minimum or maximum whose last amount was removed is worked out again from the store
+        self.aggregates = ExpenseAggregates(self._amounts)
+        # Stores that can count their amounts per category (snapshots) skip building every expense
+        if hasattr(self.expenses, "amount_counts"):
+            for category, amount, count in self.expenses.amount_counts():
+                self.aggregates.add(category, amount, count)
+        else:
+            for expense in self.expenses:
+                self.aggregates.add(expense.category, expense.amount)
+        
+        # Built on demand by index_occurrences, then kept up to date as expenses change
+        self.occurrence_index = None
+        
+        # Built by the first query by category, then kept up to date as expenses change
+        self.category_index = None
+    
+    def _amounts(self, *categories) -> Iterable[float]:
+        """The amounts of the expenses in any of the categories, of every expense with none"""
+        if categories:
+            positions = self.get_category_index().positions_in(*categories)
+            amounts = getattr(self.expenses, "amounts", None)
+            if amounts is not None:
+                return map(amounts.__getitem__, positions)
+            return (self.expenses[position].amount for position in positions)
+        amounts = getattr(self.expenses, "amounts", None)
+        return amounts if amounts is not None else (expense.amount for expense in self.expenses)
     
     def add_expense(self, expense: Expense):
-        """Add an expense to the collection"""
-        self.expenses.append(expense)
+        """Add an expense to the collection
+
+        It is only as durable as the store makes it: a JournaledExpenseStore has
+        it on disk within its max_delay, or before this returns when it was
+        opened with durable=True. Raises ValueError without adding it when the
+        amount is NaN or infinite
+        """
+        cents = to_cents(expense.amount)
+        self.expenses.add(expense)
+        self.aggregates.add_cents(expense.category, cents)
+        if self.occurrence_index is not None:
+            self.occurrence_index.add(len(self.expenses) - 1, expense.schedule)
+        if self.category_index is not None:
+            self.category_index.add(len(self.expenses) - 1, expense.category)
+    
+    def add_expenses(self, expenses: list):
+        """Add many expenses to the collection at once, none of them when an amount is NaN or infinite"""
+        expenses = list(expenses)
+        cents = [to_cents(expense.amount) for expense in expenses]
+        first_position = len(self.expenses)
+        self.expenses.extend(expenses)
+        for expense, expense_cents in zip(expenses, cents):
+            self.aggregates.add_cents(expense.category, expense_cents)
+        if self.occurrence_index is not None:
+            self.occurrence_index.extend(
+                (first_position + offset, expense.schedule) for offset, expense in enumerate(expenses)
+            )
+        if self.category_index is not None:
+            self.category_index.extend(
+                (first_position + offset, expense.category) for offset, expense in enumerate(expenses)
+            )
+    
+    def remove_expense(self, index: int) -> Expense:
+        """Remove the expense at index from the collection and return it"""
+        if index < 0:
+            index += len(self.expenses)
+        expense = self.expenses.pop(index)
+        self.aggregates.remove(expense.category, expense.amount)
+        if self.occurrence_index is not None:
+            self.occurrence_index.remove(index)
+        if self.category_index is not None:
+            self.category_index.remove(index, expense.category)
+        return expense
+    
+    def update_amount(self, index: int, amount: float):
+        """Change the amount of the expense at index"""
+        expense = self.expenses[index]
+        old_amount = expense.amount
+        # raises for NaN and infinite amounts before anything changes
+        to_cents(amount)
+        self.expenses.set_amount(index, amount)
+        self.aggregates.update(expense.category, old_amount, amount)
     
     def total(self) -> float:
         """Calculate the total of all expenses"""
-        return sum(expense.amount for expense in self.expenses)
+        return float(self.aggregates.overall.total)
+    
+    def get_category_totals(self) -> dict:
+        """Total of each category"""
+        return {category: float(total) for category, total in self.aggregates.category_totals().items()}
+    
+    def index_occurrences(self, period) -> OccurrenceIndex:
+        """Index when every expense falls due within a period, for fast due_between queries"""
+        self.occurrence_index = OccurrenceIndex(period)
+        self.occurrence_index.extend(
+            (position, expense.schedule) for position, expense in enumerate(self.expenses)
+        )
+        return self.occurrence_index
+    
+    def due_between(self, start, end) -> list:
+        """Get (date, expense) for every occurrence from start to end, needs index_occurrences first"""
+        if self.occurrence_index is None:
+            raise ValueError("No occurrence index. Call index_occurrences() with the period to cover first.")
+        return [(date, self.expenses[position]) for date, position in self.occurrence_index.between(start, end)]
+    
+    def save_snapshot(self, path: str) -> int:
+        """Write every expense to a snapshot file that SnapshotExpenseStore can map back in"""
+        return write_snapshot(path, self.expenses)
+    
+    def get_category_index(self) -> CategoryIndex:
+        """Get the index of expense positions by category, building it the first time"""
+        if self.category_index is None:
+            self.category_index = CategoryIndex.for_store(self.expenses)
+        return self.category_index
     
     def get_by_category(self) -> dict:
         """Group expenses by category"""
-        result = {}
-        for expense in self.expenses:
-            category = expense.category
-            if category not in result:
-                result[category] = []
-            result[category].append(expense)
-        return result
+        return {
+            category: [self.expenses[position] for position in positions]
+            for category, positions in self.get_category_index().positions.items()
+        }
+    
+    def get_expenses_in(self, *categories) -> List[Expense]:
+        """Get the expenses in any of the categories, in the order they were added"""
+        return [self.expenses[position] for position in self.get_category_index().positions_in(*categories)]
+    
+    def total_in(self, *categories) -> float:
+        """Total of the expenses in any of the categories"""
+        return float(from_cents(sum(self.aggregates.for_category(category).cents for category in set(categories))))
+    
+    def top_expenses(self, category: Any, n: int = 10) -> List[Expense]:
+        """Get the n largest expenses of a category, largest first"""
+        positions = self.get_category_index().positions_of(category)
+        amounts = getattr(self.expenses, "amounts", None)
+        amount_at = amounts.__getitem__ if amounts is not None else (lambda position: self.expenses[position].amount)
+        return [self.expenses[position] for position in heapq.nlargest(n, positions, key=amount_at)]
+    
+    def top_expenses_by_category(self, n: int = 10) -> Dict[Any, List[Expense]]:
+        """Get the n largest expenses of every category"""
+        return {category: self.top_expenses(category, n) for category in self.get_category_index().categories}
+    
+    def report_widths(self) -> Optional[List[int]]:
+        """Get the report column widths from the store's name and category tables and amount column
+
+        None when the store has no such columns or no expenses, the renderer
+        then sizes the columns from the first rows it renders.
+        """
+        names = getattr(self.expenses, "names", None)
+        categories = getattr(self.expenses, "categories", None)
+        amounts = getattr(self.expenses, "amounts", None)
+        if names is None or categories is None or amounts is None or not len(amounts):
+            return None
+        amount_format = REPORT_COLUMNS[2].format_spec
+        widest = [
+            max(map(len, names), default=0),
+            max(len(str(category)) for category in categories),
+            max(len(format(max(amounts), amount_format)), len(format(min(amounts), amount_format))),
+        ]
+        return [max(width, column.min_width) for width, column in zip(widest, REPORT_COLUMNS)]
+
+    def report_renderer(self, page_size: int = None) -> ReportRenderer:
+        """Get the renderer for the expense report"""
+        return ReportRenderer(REPORT_COLUMNS, "Expense Report", page_size=page_size)
+    
+    def iter_report(self, page_size: int = None) -> Iterator[str]:
+        """Generate the report of all expenses one line at a time"""
+        return self.report_renderer(page_size).lines(self.expenses, self.total(), self.report_widths())
     
     def generate_report(self) -> list:
         """Generate a simple report of all expenses"""
-        lines = []
-        
-        # Add header
-        lines.append("Expense Report")
-        lines.append("=" * 40)
-        lines.append(f"{'Name':<20} {'Category':<15} {'Amount':>10}")
-        lines.append("-" * 40)
-        
-        # Add expense lines
-        for expense in self.expenses:
-            lines.append(f"{expense.name:<20} {expense.category:<15} {expense.amount:>10.2f}")
-        
-        # Add summary
-        lines.append("-" * 40)
-        lines.append(f"{'Total':<35} {self.total():>10.2f}")
-        
-        return lines
+        return list(self.iter_report())
+    
+    def write_report(self, stream: TextIO, page_size: int = None) -> int:
+        """Write the report of all expenses to a stream in buffered chunks"""
+        return self.report_renderer(page_size).write(self.expenses, stream, self.total(), self.report_widths())
 
 
-def main():
-    """Main application entry point"""
-    manager = ExpenseManager()
+def main(db_path: str = None):
+    """Main application entry point
+    
+    With a db_path expenses are kept in that SQLite database between sessions
+    """
+    manager = ExpenseManager(SQLiteExpenseStore(db_path) if db_path else None)
     
     try:
         while True:
@@ -78,8 +239,7 @@ def main():
                 if not manager.expenses:
                     print("No expenses to report yet.")
                 else:
-                    for line in manager.generate_report():
-                        print(line)
+                    manager.write_report(sys.stdout)
             elif choice == "3":
                 print("Exiting...")
                 break
@@ -90,4 +250,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main("expenses.db")
\ No newline at end of file
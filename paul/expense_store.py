@@ -0,0 +1,178 @@
+from array import array
+from collections import Counter
+from itertools import compress
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from categories import ExpenseCategory
+from expenses import Expense
+
+# Category codes are single bytes, which category_selectors relies on
+MAX_CATEGORIES = 256
+
+
+def category_selectors(category_codes: bytes, count: int) -> Iterator[Tuple[int, bytes]]:
+    """Give (code, a byte per row that is 1 where the row has that code) for each of count codes in use
+
+    translate marks the rows of a code in one C pass, and the markers work as
+    selectors for itertools.compress, so picking a category's rows out of a
+    column never goes through Python code per row.
+    """
+    for code in range(count):
+        if bytes([code]) in category_codes:
+            table = bytearray(256)
+            table[code] = 1
+            yield code, category_codes.translate(table)
+
+
+class ListExpenseStore(list):
+    """Stores expenses as a plain list of Expense objects"""
+
+    def add(self, expense: Expense):
+        """Add an expense to the store"""
+        self.append(expense)
+
+    def set_amount(self, index: int, amount: float):
+        """Change the amount of the expense at index"""
+        self[index].amount = amount
+
+    def total(self) -> float:
+        """Calculate the total of all expenses"""
+        return sum(expense.amount for expense in self)
+
+    def by_category(self) -> Dict[ExpenseCategory, List[Expense]]:
+        """Group expenses by category"""
+        result = {}
+        for expense in self:
+            category = expense.category
+            if category not in result:
+                result[category] = []
+            result[category].append(expense)
+        return result
+
+
+class ColumnarExpenseStore:
+    """Stores expenses column by column instead of as one object per expense
+
+    Amounts live in a typed array, categories and names are stored as small
+    integer codes into lookup tables, so every distinct name is held once no
+    matter how many rows use it. Expense objects are only built when a row is
+    read back.
+    """
+
+    def __init__(self):
+        self.amounts = array('d')
+        self.category_codes = array('B')
+        self.name_codes = array('I')
+        self.schedules = []
+
+        self.categories: List[ExpenseCategory] = list(ExpenseCategory)
+        self._category_lookup = {category: code for code, category in enumerate(self.categories)}
+        self.names: List[str] = []
+        self._name_lookup: Dict[str, int] = {}
+
+    @classmethod
+    def from_columns(cls, amounts: array, category_codes: array, name_codes: array, schedules: list,
+                     categories: List[ExpenseCategory], names: List[str]) -> 'ColumnarExpenseStore':
+        """Build a store around columns that already hold codes into the given category and name tables"""
+        store = cls()
+        store.amounts = amounts
+        store.category_codes = category_codes
+        store.name_codes = name_codes
+        store.schedules = schedules
+        store.categories = list(categories)
+        store._category_lookup = {category: code for code, category in enumerate(store.categories)}
+        store.names = list(names)
+        store._name_lookup = {name: code for code, name in enumerate(store.names)}
+        return store
+
+    def _category_code(self, category) -> int:
+        """Get the code for a category, registering categories outside ExpenseCategory"""
+        code = self._category_lookup.get(category)
+        if code is None:
+            code = len(self.categories)
+            if code >= MAX_CATEGORIES:
+                raise ValueError(f"A store holds at most {MAX_CATEGORIES} categories, can't add {category!r}")
+            self.categories.append(category)
+            self._category_lookup[category] = code
+        return code
+
+    def _name_code(self, name: str) -> int:
+        """Get the code for a name, adding it to the name table the first time it is seen"""
+        code = self._name_lookup.get(name)
+        if code is None:
+            code = len(self.names)
+            self.names.append(name)
+            self._name_lookup[name] = code
+        return code
+
+    def add(self, expense: Expense):
+        """Add an expense to the store, raising ValueError without adding it when there are too many categories"""
+        # Codes first, so an expense that can't be stored leaves every column as it was
+        category_code = self._category_code(expense.category)
+        name_code = self._name_code(expense.name)
+        self.amounts.append(expense.amount)
+        self.category_codes.append(category_code)
+        self.name_codes.append(name_code)
+        self.schedules.append(expense.schedule)
+
+    def extend(self, expenses: Iterable[Expense]):
+        """Add many expenses to the store"""
+        for expense in expenses:
+            self.add(expense)
+
+    def pop(self, index: int = -1) -> Expense:
+        """Remove the expense at index and return it"""
+        expense = self[index]
+        del self.amounts[index]
+        del self.category_codes[index]
+        del self.name_codes[index]
+        del self.schedules[index]
+        return expense
+
+    def set_amount(self, index: int, amount: float):
+        """Change the amount of the expense at index"""
+        self.amounts[index] = amount
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def __getitem__(self, index: int) -> Expense:
+        return Expense(
+            name=self.names[self.name_codes[index]],
+            amount=self.amounts[index],
+            category=self.categories[self.category_codes[index]],
+            schedule=self.schedules[index],
+        )
+
+    def __iter__(self) -> Iterator[Expense]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def total(self) -> float:
+        """Calculate the total of all expenses"""
+        return sum(self.amounts)
+
+    def category_positions(self) -> Dict[Any, array]:
+        """The positions of the expenses in each category, in increasing order"""
+        codes = self.category_codes.tobytes()
+        return {
+            self.categories[code]: array('I', compress(range(len(self)), selectors))
+            for code, selectors in category_selectors(codes, len(self.categories))
+        }
+
+    def amount_counts(self) -> Iterator[Tuple[Any, float, int]]:
+        """Give (category, amount, how many expenses have it) for every distinct amount in every category"""
+        codes = self.category_codes.tobytes()
+        for code, selectors in category_selectors(codes, len(self.categories)):
+            for amount, count in Counter(compress(self.amounts, selectors)).items():
+                yield self.categories[code], amount, count
+
+    def by_category(self) -> Dict[ExpenseCategory, List[Expense]]:
+        """Group expenses by category"""
+        result = {}
+        for index, code in enumerate(self.category_codes):
+            category = self.categories[code]
+            if category not in result:
+                result[category] = []
+            result[category].append(self[index])
+        return result
@@ -1,6 +1,8 @@
 class Expense:
+    __slots__ = ("name", "amount", "category", "schedule")
+
     def __init__(self, name, amount, category, schedule):
         self.name = name
         self.amount = amount
         self.category = category
-        self.schedule = schedule
\ No newline at end of file
+        self.schedule = schedule
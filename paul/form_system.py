@@ -1,4 +1,4 @@
-from typing import Callable, List, Dict, Any, Type, Optional, Union
+from typing import Callable, List, Dict, Any, Type, Optional, Union, Iterable, Tuple
 from abc import ABC, abstractmethod
 
 
@@ -63,6 +63,8 @@ class FormField:
         self.options = options
         self.validators: List[FormValidator] = []
         self.output_transformer: Optional[Union[OutputTransformer, Callable]] = None
+        self.required_when: Optional[Tuple[str, Any]] = None
+        self.used_when: Optional[Tuple[str, Any]] = None
         self.value = None
         
         # Add default validator for options if provided
@@ -79,10 +81,25 @@ class FormField:
         self.output_transformer = transformer
         return self
     
+    def set_required_when(self, field_name: str, value: Any) -> 'FormField':
+        """Make an optional field required whenever another field of the form has the given value"""
+        self.required_when = (field_name, value)
+        return self
+    
+    def set_used_when(self, field_name: str, value: Any) -> 'FormField':
+        """Only ask for, validate and output this field while another field of the form has the given value"""
+        self.used_when = (field_name, value)
+        return self
+    
+    def is_used(self, values: Dict[str, Any]) -> bool:
+        """Whether the field takes part in a form whose field values are given by name"""
+        return self.used_when is None or values.get(self.used_when[0]) == self.used_when[1]
+    
     def validate(self, value: Any) -> List[str]:
         """Validate the field value against all validators"""
-        if self.required and (value is None or value == ''):
-            return [f"{self.label} is required"]
+        if value is None or value == '':
+            # Optional fields left empty have nothing to validate
+            return [f"{self.label} is required"] if self.required else []
         
         errors = []
         for validator in self.validators:
@@ -92,8 +109,8 @@ class FormField:
         return errors
     
     def get_transformed_value(self) -> Any:
-        """Get the transformed value for output"""
-        if self.value is None:
+        """Get the transformed value for output, the default when the field was left empty"""
+        if self.value is None or self.value == '':
             return self.default
         
         if self.output_transformer:
@@ -133,7 +150,7 @@ class SelectField(FormField):
     
     def get_transformed_value(self) -> Any:
         """Get the transformed value, mapped through the options dictionary"""
-        if self.value is None:
+        if self.value is None or self.value == '':
             return self.default
         
         # First get the value from the options dict
@@ -175,9 +192,16 @@ class Form:
     def validate(self) -> Dict[str, List[str]]:
         """Validate all fields and return any validation errors"""
         errors = {}
+        values = {field.name: field.value for field in self.fields}
         
         for field in self.fields:
+            if not field.is_used(values):
+                continue
             field_errors = field.validate(field.value)
+            if not field_errors and field.value in (None, '') and field.required_when:
+                other, value = field.required_when
+                if values.get(other) == value:
+                    field_errors = [f"{field.label} is required"]
             if field_errors:
                 errors[field.name] = field_errors
         
@@ -188,20 +212,32 @@ class Form:
         return len(self.validate()) == 0
     
     def get_data(self) -> Dict[str, Any]:
-        """Get all field values as a dictionary"""
-        return {field.name: field.get_transformed_value() for field in self.fields}
+        """Get all field values as a dictionary, the default for a field that isn't used"""
+        values = {field.name: field.value for field in self.fields}
+        return {
+            field.name: field.get_transformed_value() if field.is_used(values) else field.default
+            for field in self.fields
+        }
     
     def submit(self) -> Any:
         """Process form data and return as the specified output type or a dictionary"""
         if not self.is_valid():
             raise ValueError("Form has validation errors. Call is_valid() before submitting.")
         
-        data = self.get_data()
-        
+        return self.build_output(self.get_data())
+    
+    def build_output(self, data: Dict[str, Any]) -> Any:
+        """Turn transformed field values into the output type, without validating them"""
         if self.output_type:
             if self.field_map:
-                # Map field names to the constructor parameter names
-                kwargs = {target: data[source] for source, target in self.field_map.items()}
+                # Map field names to the constructor parameter names. A target of None
+                # leaves the field out, and when several fields share a target the
+                # first one with a value wins, so fields sharing one should be used
+                # (see FormField.set_used_when) one at a time
+                kwargs = {}
+                for source, target in self.field_map.items():
+                    if target is not None and kwargs.get(target) is None:
+                        kwargs[target] = data[source]
                 # Add any fields not in the mapping that have matching names
                 for field_name in data:
                     if field_name not in self.field_map:
@@ -213,6 +249,120 @@ class Form:
             return self.output_type(**kwargs)
         
         return data
+    
+    def compile(self) -> 'CompiledForm':
+        """Build a reusable validation plan for submitting many records through this form"""
+        return CompiledForm(self)
+
+
+def _compile_check(validator: FormValidator) -> Callable[[Any], bool]:
+    """Turn a validator into a plain function, specialising the built in validators"""
+    if type(validator) is ChoiceValidator:
+        choices = validator.valid_choices
+        try:
+            choice_set = frozenset(choices)
+        except TypeError:
+            return validator.validate
+        
+        def check_choice(value):
+            try:
+                return value in choice_set
+            except TypeError:
+                return value in choices
+        return check_choice
+    
+    if type(validator) is RangeValidator:
+        min_value = float(validator.min_value)
+        max_value = float(validator.max_value)
+        
+        def check_range(value):
+            if type(value) is int or type(value) is float:
+                return min_value <= value <= max_value
+            try:
+                return min_value <= float(value) <= max_value
+            except (ValueError, TypeError):
+                return False
+        return check_range
+    
+    return validator.validate
+
+
+class CompiledForm:
+    """A form's validation and output steps worked out once, for submitting many records
+    
+    Records are dictionaries of field name to value, the same values a view would
+    put into field.value. Each record is validated in a single pass and turned into
+    output without touching the fields, so one compiled form can be shared. Fields
+    and validators added to the form afterwards are not seen; compile it again.
+    """
+    
+    def __init__(self, form: Form):
+        self.form = form
+        self.validation_plan = []
+        self.output_plan = []
+        for field in form.fields:
+            checks = [(_compile_check(validator), validator.error_message) for validator in field.validators]
+            self.validation_plan.append(
+                (field.name, field.required, field.required_when, field.used_when, f"{field.label} is required", checks)
+            )
+            
+            options = field.options_dict if isinstance(field, SelectField) else None
+            transformer = field.output_transformer
+            if isinstance(transformer, OutputTransformer):
+                transformer = transformer.transform
+            self.output_plan.append((field.name, field.default, field.used_when, options, transformer))
+    
+    def validate(self, record: Dict[str, Any]) -> Dict[str, List[str]]:
+        """Validate a record and return any errors, like Form.validate"""
+        errors = {}
+        for name, required, required_when, used_when, required_error, checks in self.validation_plan:
+            if used_when and record.get(used_when[0]) != used_when[1]:
+                continue
+            value = record.get(name)
+            if value is None or value == '':
+                if required or (required_when and record.get(required_when[0]) == required_when[1]):
+                    errors[name] = [required_error]
+                continue
+            for check, message in checks:
+                if not check(value):
+                    errors.setdefault(name, []).append(message)
+        return errors
+    
+    def get_data(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Get the transformed values of a record, like Form.get_data"""
+        data = {}
+        for name, default, used_when, options, transformer in self.output_plan:
+            value = record.get(name)
+            # An optional field left empty passed validation without a value, like a missing one
+            if value is None or value == '' or (used_when and record.get(used_when[0]) != used_when[1]):
+                data[name] = default
+                continue
+            if options is not None and value in options:
+                value = options[value]
+            data[name] = transformer(value) if transformer else value
+        return data
+    
+    def submit(self, record: Dict[str, Any]) -> Any:
+        """Validate a record once and build its output
+        
+        Raises ValueError with the dictionary of field errors when it is invalid
+        """
+        errors = self.validate(record)
+        if errors:
+            raise ValueError(errors)
+        return self.form.build_output(self.get_data(record))
+    
+    def submit_many(self, records: Iterable[Dict[str, Any]]) -> Tuple[List[Any], Dict[int, Dict[str, List[str]]]]:
+        """Submit every record, returning the outputs and the errors of invalid records by position"""
+        results = []
+        failures = {}
+        for position, record in enumerate(records):
+            errors = self.validate(record)
+            if errors:
+                failures[position] = errors
+            else:
+                results.append(self.form.build_output(self.get_data(record)))
+        return results, failures
 
 
 class FormView(ABC):
@@ -243,7 +393,9 @@ class TerminalFormView(FormView):
         print(f"\n--- {self.form.name} ---\n")
         
         for field in self.form.fields:
-            self._render_field(field)
+            # Fields the earlier answers leave unused are not asked for
+            if field.is_used({other.name: other.value for other in self.form.fields}):
+                self._render_field(field)
     
     def _render_field(self, field: FormField) -> None:
         """Render a single form field"""
@@ -295,12 +447,12 @@ class TerminalFormView(FormView):
     def process(self) -> Any:
         """Process form submission"""
         self.render()
+        if not self.form.is_valid():
+            print("\nThere were validation errors. Please correct them and try again.")
+            return None
         try:
-            if self.form.is_valid():
-                return self.form.submit()
-            else:
-                print("\nThere were validation errors. Please correct them and try again.")
-                return None
+            # Already validated above, so skip submit() validating a second time
+            return self.form.build_output(self.form.get_data())
         except ValueError as e:
             print(f"Error: {e}")
             return None
@@ -325,6 +477,8 @@ def create_expense_form():
     from expenses import Expense
     from categories import ExpenseCategory
     from schedules import AnchoredExpenseSchedule, FirstLastWorkingDayMonthlyExpenseSchedule
+    import repo_root  # noqa: F401
+    from schedule_registry import intern_schedule
     
     form = Form("Create Expense")
     
@@ -364,24 +518,26 @@ def create_expense_form():
         min_value=1, 
         max_value=28
     )
-    # Transform the day number into an actual schedule
+    anchored_field.set_required_when("schedule_type", "a")
+    anchored_field.set_used_when("schedule_type", "a")
+    # Transform the day number into an actual schedule, shared with every expense on the same day
     anchored_field.set_output_transformer(
-        lambda value: AnchoredExpenseSchedule(int(value))
+        lambda value: intern_schedule(AnchoredExpenseSchedule(int(value)))
     )
     form.add_field(anchored_field)
     
-    fl_field = SelectField(
-        "fl_anchor",
-        {
-            "f": "First Working Day",
-            "l": "Last Working Day"
-        },
-        "First or Last", 
-        required=False
-    )
-    # Transform the f/l selection into an actual schedule
+    fl_options = {
+        "f": "First Working Day",
+        "l": "Last Working Day"
+    }
+    fl_field = SelectField("fl_anchor", fl_options, "First or Last", required=False)
+    fl_field.set_required_when("schedule_type", "f")
+    fl_field.set_used_when("schedule_type", "f")
+    # The transformer is handed the option's label, turn it back into the f/l key the schedule takes
+    fl_keys = {label: key for key, label in fl_options.items()}
+    # Transform the f/l selection into an actual schedule, shared like the anchored ones
     fl_field.set_output_transformer(
-        lambda value: FirstLastWorkingDayMonthlyExpenseSchedule(value)
+        lambda value: intern_schedule(FirstLastWorkingDayMonthlyExpenseSchedule(fl_keys.get(value, value)))
     )
     form.add_field(fl_field)
     
@@ -389,7 +545,9 @@ def create_expense_form():
     form.set_output_type(
         Expense,
         {
-            # Map from form field name to Expense constructor param name where they differ
+            # Map from form field name to Expense constructor param name where they differ,
+            # schedule_type decides which of the two schedule fields is used
+            "schedule_type": None,
             "anchor_day": "schedule",
             "fl_anchor": "schedule"
         }
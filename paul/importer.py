@@ -0,0 +1,217 @@
+"""Non-interactive import of expenses from CSV or JSON Lines files
+
+Records go through the same Form, fields and validators that the terminal
+view uses, just without prompting. Files are read a chunk at a time, so
+memory use depends on the chunk size, not the file size.
+"""
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO
+import argparse
+import csv
+import json
+import math
+import os
+import time
+
+from expense_manager import ExpenseManager
+from form_system import Form, FormField, create_expense_form
+from sqlite_store import SQLiteExpenseStore
+
+
+class RowError:
+    """Validation errors of a single input row"""
+
+    def __init__(self, row_number: int, errors: Dict[str, List[str]]):
+        self.row_number = row_number
+        self.errors = errors
+
+    def __str__(self) -> str:
+        details = "; ".join(f"{name}: {', '.join(messages)}" for name, messages in self.errors.items())
+        return f"row {self.row_number}: {details}"
+
+
+class ImportStats:
+    """Counts and timing of an import run"""
+
+    def __init__(self, max_errors: int = 1000):
+        self.rows = 0
+        self.imported = 0
+        self.failed = 0
+        self.elapsed = 0.0
+        self.max_errors = max_errors
+        self.errors: List[RowError] = []
+
+    def record_error(self, error: RowError):
+        """Count a failed row, keeping the details of the first max_errors"""
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(error)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.rows} rows, {self.imported} imported, {self.failed} failed "
+                f"in {self.elapsed:.2f}s ({self.rows_per_second:,.0f} rows/s)")
+
+
+def chunked(records: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Group records into lists of at most chunk_size"""
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def read_csv(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    """Read records from CSV with a header row of field names"""
+    return csv.DictReader(stream)
+
+
+def read_jsonl(stream: TextIO) -> Iterator[str]:
+    """Read the lines of JSON Lines, one object per line
+
+    Lines are left for import_chunks to decode with decode_json_record, so a
+    malformed line fails its own row rather than the whole import
+    """
+    for line in stream:
+        if line.strip():
+            yield line
+
+
+def decode_json_record(line: str) -> Dict[str, Any]:
+    """Decode one JSON Lines record, raising ValueError with the row's errors when it isn't an object"""
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        raise ValueError({"row": [f"Invalid JSON: {e}"]})
+    if not isinstance(record, dict):
+        raise ValueError({"row": ["Expected a JSON object"]})
+    return record
+
+
+READERS = {
+    ".csv": read_csv,
+    ".jsonl": read_jsonl,
+}
+
+
+class FormImporter:
+    """Submits records to a form without prompting, the batch counterpart to TerminalFormView"""
+
+    def __init__(self, form: Form):
+        self.form = form
+        self.compiled = form.compile()
+        # Select fields also accept the label of an option, e.g. "Rent" as well as "r"
+        self.option_lookup = {
+            field.name: {str(value).lower(): key for key, value in field.options_dict.items()}
+            for field in form.fields if field.field_type == 'select'
+        }
+
+    def _parse(self, field: FormField, raw: Any) -> Any:
+        """Turn a raw record value into the value the terminal view would have produced"""
+        if isinstance(raw, str):
+            raw = raw.strip()
+        if raw is None or raw == '':
+            return field.default
+
+        if field.field_type == 'numeric':
+            value = float(raw)
+            # float() takes nan, inf and 1e400, none of which is an amount
+            if not math.isfinite(value):
+                raise ValueError(f"{raw} is not a finite number")
+            return int(value) if value.is_integer() else value
+        if field.field_type == 'select' and raw not in field.options_dict:
+            return self.option_lookup[field.name].get(str(raw).lower(), raw)
+        return raw
+
+    def submit(self, record: Dict[str, Any]) -> Any:
+        """Parse a record into field values and submit it through the compiled form
+
+        Raises ValueError with the field errors attached when the record is invalid
+        """
+        values = {}
+        errors = {}
+        for field in self.form.fields:
+            raw = record.get(field.name)
+            if raw is not None and not isinstance(raw, (str, int, float)):
+                # lists and objects from JSON would otherwise reach the option lookups unhashable
+                errors[field.name] = [f"{field.label} must be a single value"]
+                continue
+            try:
+                values[field.name] = self._parse(field, raw)
+            except (ValueError, OverflowError):
+                errors[field.name] = ["Please enter a numeric value."]
+
+        if errors:
+            errors.update(
+                (name, messages) for name, messages in self.compiled.validate(values).items() if name not in errors
+            )
+            raise ValueError(errors)
+        return self.compiled.submit(values)
+
+    def import_chunks(self, chunks: Iterable[List[Dict[str, Any]]], on_chunk: Callable[[List[Any]], None],
+                      on_error: Optional[Callable[[RowError], None]] = None) -> ImportStats:
+        """Submit every record, handing each chunk of results to on_chunk
+
+        Records read as JSON text are decoded here, one at a time. Invalid rows are
+        passed to on_error, or kept on the returned stats when there is none
+        """
+        stats = ImportStats()
+        started = time.perf_counter()
+
+        for chunk in chunks:
+            results = []
+            for record in chunk:
+                stats.rows += 1
+                try:
+                    if isinstance(record, str):
+                        record = decode_json_record(record)
+                    results.append(self.submit(record))
+                except ValueError as e:
+                    errors = e.args[0] if e.args and isinstance(e.args[0], dict) else {"row": [str(e)]}
+                    error = RowError(stats.rows, errors)
+                    if on_error:
+                        stats.failed += 1
+                        on_error(error)
+                    else:
+                        stats.record_error(error)
+            if results:
+                on_chunk(results)
+                stats.imported += len(results)
+
+        stats.elapsed = time.perf_counter() - started
+        return stats
+
+    def import_file(self, path: str, on_chunk: Callable[[List[Any]], None], chunk_size: int = 1000,
+                    on_error: Optional[Callable[[RowError], None]] = None) -> ImportStats:
+        """Import a .csv or .jsonl file a chunk at a time"""
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in READERS:
+            raise ValueError(f"Don't know how to read {extension or 'files without an extension'}")
+
+        with open(path, newline='') as stream:
+            return self.import_chunks(chunked(READERS[extension](stream), chunk_size), on_chunk, on_error)
+
+
+def main():
+    """Import expense files into an SQLite database"""
+    parser = argparse.ArgumentParser(description="Import expenses from CSV or JSON Lines files")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--db", default="expenses.db")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    manager = ExpenseManager(SQLiteExpenseStore(args.db))
+    importer = FormImporter(create_expense_form())
+    for path in args.files:
+        stats = importer.import_file(path, manager.add_expenses, args.chunk_size, on_error=print)
+        print(f"{path}: {stats.summary()}")
+    manager.expenses.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,442 @@
+from array import array
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+
+from categories import ExpenseCategory
+from expense_store import ColumnarExpenseStore
+from expenses import Expense
+from snapshot_store import SnapshotExpenseStore, decode_schedule, encode_schedule, write_snapshot
+from sqlite_store import deserialize_category
+import repo_root  # noqa: F401
+from business_calendar import get_default_calendar
+
+
+MAGIC = b"EXPJRNL\x00"
+
+# Every record is its payload length and CRC-32, then the payload
+RECORD_HEADER = struct.Struct("<II")
+ADD = struct.Struct("<cdBiII")  # op, amount, schedule kind, schedule parameter, category length, name length
+REMOVE = struct.Struct("<cQ")  # op, index
+SET_AMOUNT = struct.Struct("<cQd")  # op, index, amount
+
+# Journal records after the snapshot of the same generation, see JournaledExpenseStore
+FILE_NAME = re.compile(r"expenses\.(\d{8})\.(snapshot|journal)$")
+
+sync = getattr(os, "fdatasync", os.fsync)
+
+# A journal repeats the same few schedules and categories, decode each once. Schedules
+# are looked up with the default calendar too, see decode, so a new one is picked up
+cached_schedule = lru_cache(maxsize=4096)(decode_schedule)
+cached_category = lru_cache(maxsize=1024)(deserialize_category)
+
+
+def encode_add(expense: Expense) -> bytes:
+    """Build the journal payload for adding an expense"""
+    kind, parameter = encode_schedule(expense.schedule)
+    category = str(expense.category).encode()
+    name = expense.name.encode()
+    return ADD.pack(b"A", expense.amount, kind, parameter, len(category), len(name)) + category + name
+
+
+def encode_remove(index: int) -> bytes:
+    """Build the journal payload for removing the expense at index"""
+    return REMOVE.pack(b"R", index)
+
+
+def encode_set_amount(index: int, amount: float) -> bytes:
+    """Build the journal payload for changing the amount of the expense at index"""
+    return SET_AMOUNT.pack(b"S", index, amount)
+
+
+def decode(payload: bytes) -> tuple:
+    """Turn a journal payload back into ("add", expense), ("remove", index) or ("set_amount", index, amount)"""
+    op = payload[:1]
+    if op == b"A":
+        _, amount, kind, parameter, category_length, name_length = ADD.unpack_from(payload)
+        category = payload[ADD.size:ADD.size + category_length].decode()
+        name = payload[ADD.size + category_length:ADD.size + category_length + name_length].decode()
+        return "add", Expense(name, amount, cached_category(category), cached_schedule(kind, parameter, get_default_calendar()))
+    if op == b"R":
+        return "remove", REMOVE.unpack(payload)[1]
+    if op == b"S":
+        _, index, amount = SET_AMOUNT.unpack(payload)
+        return "set_amount", index, amount
+    raise ValueError(f"Unknown journal operation {op!r}")
+
+
+def read_journal(path: str) -> Tuple[List[tuple], int]:
+    """Read the operations of a journal file and the length of its intact part
+
+    Reading stops at the first record that is cut short or fails its checksum,
+    which is where a crash during a write leaves the end of the file.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        if len(data) < len(MAGIC) and MAGIC.startswith(data):
+            return [], 0
+        raise ValueError(f"{path} is not an expense journal")
+
+    operations = []
+    position = len(MAGIC)
+    while position + RECORD_HEADER.size <= len(data):
+        length, checksum = RECORD_HEADER.unpack_from(data, position)
+        start = position + RECORD_HEADER.size
+        payload = data[start:start + length]
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            break
+        operations.append(decode(payload))
+        position = start + length
+    return operations, position
+
+
+def apply_operations(store: Any, operations: Iterable[tuple]) -> int:
+    """Apply journal operations to a store in order, returning how many there were"""
+    count = 0
+    added = []
+    for operation in operations:
+        count += 1
+        if operation[0] == "add":
+            added.append(operation[1])
+            continue
+        # runs of adds go in with one extend
+        if added:
+            store.extend(added)
+            added = []
+        if operation[0] == "remove":
+            store.pop(operation[1])
+        else:
+            store.set_amount(operation[1], operation[2])
+    if added:
+        store.extend(added)
+    return count
+
+
+class Journal:
+    """An append-only file of checksummed records, synced to disk in groups
+
+    Appended records are buffered and written with one fsync per group: when
+    batch_size records are waiting, on commit() and on close(), and otherwise
+    by a flusher thread once the oldest waiting record is max_delay seconds
+    old, so a crash loses at most the last max_delay seconds of records. With
+    a max_delay of 0 every append is synced before it returns. The cut short
+    record a crash may leave at the end is dropped when the journal is opened
+    again.
+
+    wait() blocks until a record is on disk. The first waiter writes and syncs
+    the whole group while later waiters block on it and go out together in the
+    next group, so concurrent writers share fsyncs.
+    """
+
+    def __init__(self, path: str, batch_size: int = 256, max_delay: float = 0.01):
+        self.path = path
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.syncs = 0
+
+        # What was in the file, for the owner to replay
+        self.recovered: List[tuple] = []
+        exists = os.path.exists(path)
+        end = 0
+        if exists:
+            self.recovered, end = read_journal(path)
+        self.records = len(self.recovered)
+        self._file = open(path, "r+b" if exists else "w+b")
+        if end == 0:
+            self._file.write(MAGIC)
+            end = len(MAGIC)
+        # drop whatever a crash left after the last intact record
+        self._file.truncate(end)
+        self._file.seek(end)
+        self._sync()
+
+        self.durable_records = self.records
+        self._pending = bytearray()
+        self._pending_records = 0
+        self._oldest_pending = 0.0
+        self._syncing = False
+        self._closed = False
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._flusher = None
+        if max_delay > 0:
+            self._flusher = threading.Thread(target=self._flush_after_delay, name=f"journal flusher {path}",
+                                             daemon=True)
+            self._flusher.start()
+
+    def append(self, payload: bytes) -> int:
+        """Add a record and return its sequence number for wait(), committing the group when it is full"""
+        with self._lock:
+            if not self._pending_records:
+                self._oldest_pending = time.monotonic()
+                self._changed.notify_all()
+            self._pending += RECORD_HEADER.pack(len(payload), zlib.crc32(payload))
+            self._pending += payload
+            self._pending_records += 1
+            self.records += 1
+            sequence = self.records
+            if self._pending_records >= self.batch_size or self.max_delay <= 0:
+                self._wait(sequence)
+            return sequence
+
+    def wait(self, sequence: int = None):
+        """Block until the record with the given sequence number, every record by default, is on disk"""
+        with self._lock:
+            self._wait(self.records if sequence is None else sequence)
+
+    def commit(self):
+        """Write the waiting records and sync them to disk"""
+        self.wait()
+
+    def _wait(self, sequence: int):
+        while self.durable_records < sequence:
+            if self._syncing:
+                self._changed.wait()
+            else:
+                self._write_group()
+
+    def _write_group(self):
+        # Called with the lock held, which is let go during the write so appends carry on
+        data, count, last = self._pending, self._pending_records, self.records
+        self._pending = bytearray()
+        self._pending_records = 0
+        self._syncing = True
+        self._lock.release()
+        written = False
+        try:
+            self._file.write(data)
+            self._sync()
+            written = True
+        finally:
+            self._lock.acquire()
+            self._syncing = False
+            if written:
+                self.durable_records = last
+            else:
+                # put the group back in front of anything appended since, for the next try
+                self._pending[:0] = data
+                self._pending_records += count
+            self._changed.notify_all()
+
+    def _flush_after_delay(self):
+        with self._lock:
+            while not self._closed:
+                if not self._pending_records or self._syncing:
+                    self._changed.wait()
+                    continue
+                delay = self._oldest_pending + self.max_delay - time.monotonic()
+                if delay > 0:
+                    self._changed.wait(delay)
+                else:
+                    self._write_group()
+
+    def _sync(self):
+        self._file.flush()
+        sync(self._file.fileno())
+        self.syncs += 1
+
+    @property
+    def pending(self) -> int:
+        """How many records are not on disk yet"""
+        with self._lock:
+            return self.records - self.durable_records
+
+    def close(self):
+        """Commit what is waiting, stop the flusher and close the file"""
+        with self._lock:
+            if self._closed:
+                return
+            self._wait(self.records)
+            self._closed = True
+            self._changed.notify_all()
+        if self._flusher is not None:
+            self._flusher.join()
+        self._file.close()
+
+    def __enter__(self) -> 'Journal':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JournaledExpenseStore:
+    """A ColumnarExpenseStore that survives restarts through a snapshot and a journal in a directory
+
+    Every change is applied to the in-memory store first, so one the store
+    rejects never reaches the journal and can't break a later replay, then
+    journaled. It is on disk within max_delay seconds, see Journal, or before
+    the change returns when the store is opened with durable=True.
+
+    Opening maps the newest snapshot, copies it into memory and replays the
+    journal written since. compact() writes the expenses to a new snapshot
+    and starts an empty journal; it runs by itself once compact_after records
+    have been journaled.
+
+    Snapshot and journal files carry a generation number and a journal holds
+    the changes made after the snapshot of its generation. A new snapshot is
+    renamed into place before its journal is started, so after a crash the
+    newest complete snapshot and its journal, if any, are always right.
+    """
+
+    def __init__(self, directory: str, batch_size: int = 256, max_delay: float = 0.01,
+                 compact_after: int = 1_000_000, durable: bool = False):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.durable = durable
+        self.compact_after = compact_after
+
+        generations = self._generations()
+        self.generation = max(generations.get("snapshot", [0]))
+        if self.generation in generations.get("snapshot", []):
+            with SnapshotExpenseStore(self._path("snapshot")) as snapshot:
+                self.store = snapshot.to_columnar()
+        else:
+            self.store = ColumnarExpenseStore()
+
+        self.journal = Journal(self._path("journal"), batch_size, max_delay)
+        self._sync_directory()
+        self.replayed = apply_operations(self.store, self.journal.recovered)
+        self.journal.recovered = []
+        self._remove_older_generations()
+        self._compact_if_due()
+
+    def _path(self, kind: str, generation: int = None) -> str:
+        generation = self.generation if generation is None else generation
+        return os.path.join(self.directory, f"expenses.{generation:08d}.{kind}")
+
+    def _generations(self) -> Dict[str, List[int]]:
+        found = {}
+        for entry in os.listdir(self.directory):
+            match = FILE_NAME.match(entry)
+            if match:
+                found.setdefault(match.group(2), []).append(int(match.group(1)))
+        return found
+
+    def _sync_directory(self):
+        # new and renamed files only survive a crash once their directory entry is synced
+        if os.name == "posix":
+            descriptor = os.open(self.directory, os.O_RDONLY)
+            try:
+                os.fsync(descriptor)
+            finally:
+                os.close(descriptor)
+
+    def _remove_older_generations(self):
+        for kind, generations in self._generations().items():
+            for generation in generations:
+                if generation < self.generation:
+                    os.remove(self._path(kind, generation))
+
+    def _compact_if_due(self):
+        if self.compact_after and self.journal.records >= self.compact_after:
+            self.compact()
+
+    def _position(self, index: int) -> int:
+        """Turn index into the absolute position the journal records"""
+        position = index + len(self.store) if index < 0 else index
+        if not 0 <= position < len(self.store):
+            raise IndexError("expense index out of range")
+        return position
+
+    def _journal(self, payloads: List[bytes]):
+        sequence = None
+        for payload in payloads:
+            sequence = self.journal.append(payload)
+        if self.durable and sequence is not None:
+            self.journal.wait(sequence)
+        self._compact_if_due()
+
+    def add(self, expense: Expense):
+        """Add an expense to the store"""
+        payload = encode_add(expense)
+        self.store.add(expense)
+        self._journal([payload])
+
+    def extend(self, expenses: Iterable[Expense]):
+        """Add many expenses to the store, none of them when one is rejected"""
+        expenses = list(expenses)
+        payloads = [encode_add(expense) for expense in expenses]
+        before = len(self.store)
+        try:
+            self.store.extend(expenses)
+        except Exception:
+            while len(self.store) > before:
+                self.store.pop()
+            raise
+        self._journal(payloads)
+
+    def pop(self, index: int = -1) -> Expense:
+        """Remove the expense at index and return it"""
+        position = self._position(index)
+        expense = self.store.pop(position)
+        self._journal([encode_remove(position)])
+        return expense
+
+    def set_amount(self, index: int, amount: float):
+        """Change the amount of the expense at index"""
+        position = self._position(index)
+        payload = encode_set_amount(position, amount)
+        self.store.set_amount(position, amount)
+        self._journal([payload])
+
+    def commit(self):
+        """Make every change so far durable"""
+        self.journal.commit()
+
+    def compact(self):
+        """Write all expenses to a new snapshot and start an empty journal after it"""
+        self.journal.commit()
+        write_snapshot(self._path("snapshot", self.generation + 1), self.store)
+        self.journal.close()
+        self.generation += 1
+        self.journal = Journal(self._path("journal"), self.batch_size, self.max_delay)
+        self._sync_directory()
+        self._remove_older_generations()
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __getitem__(self, index: int) -> Expense:
+        return self.store[index]
+
+    def __iter__(self) -> Iterator[Expense]:
+        return iter(self.store)
+
+    def total(self) -> float:
+        """Calculate the total of all expenses"""
+        return self.store.total()
+
+    @property
+    def amounts(self):
+        return self.store.amounts
+
+    def category_positions(self) -> Dict[Any, array]:
+        """The positions of the expenses in each category, in increasing order"""
+        return self.store.category_positions()
+
+    def amount_counts(self) -> Iterator[Tuple[Any, float, int]]:
+        """Give (category, amount, how many expenses have it) for every distinct amount in every category"""
+        return self.store.amount_counts()
+
+    def by_category(self) -> Dict[ExpenseCategory, List[Expense]]:
+        """Group expenses by category"""
+        return self.store.by_category()
+
+    def close(self):
+        """Commit the journal and close it"""
+        self.journal.close()
+
+    def __enter__(self) -> 'JournaledExpenseStore':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,77 @@
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from itertools import repeat
+from typing import Any, Dict, Iterable, List, Tuple
+import datetime
+
+import repo_root  # noqa: F401
+from row_ids import RowIds
+from schedule_registry import registry
+
+
+class OccurrenceIndex:
+    """Every occurrence of every expense within a horizon, bucketed by date
+
+    Occurrences come from each schedule's get_occurences_in_period for the
+    horizon period, so the index covers (period.start, period.end]. They are
+    expanded through the schedule registry, once per distinct schedule.
+    Expenses without a schedule never fall due and have no occurrences.
+
+    Each date keeps an array of the row ids (see RowIds) of the expenses due
+    that day, and only the distinct dates are kept sorted. Adding an expense
+    appends its id to the bucket of each of its dates. Removing one marks its
+    id dead rather than touching the buckets. A range query is two binary
+    searches over the dates.
+    """
+
+    def __init__(self, period: Any):
+        self.period = period
+        self.dates: List[datetime.date] = []
+        self._buckets: Dict[datetime.date, array] = {}
+        self.row_ids = RowIds()
+
+    def __len__(self) -> int:
+        """How many occurrences of live expenses are indexed, counted bucket by bucket"""
+        return sum(sum(1 for _ in self.row_ids.live_positions(bucket)) for bucket in self._buckets.values())
+
+    def add(self, position: int, schedule: Any):
+        """Index the occurrences of the expense just added at the end of the store, at position"""
+        if position != len(self.row_ids):
+            raise ValueError(f"Expenses are indexed as they are added at the end, expected position "
+                             f"{len(self.row_ids)}, got {position}")
+        row_id = self.row_ids.add()
+        if schedule is None:
+            return
+        for date in registry.get_occurences(schedule, self.period):
+            bucket = self._buckets.get(date)
+            if bucket is None:
+                bucket = self._buckets[date] = array('I')
+                insort(self.dates, date)
+            bucket.append(row_id)
+
+    def extend(self, schedules: Iterable[Tuple[int, Any]]):
+        """Index many (position, schedule) pairs in increasing order of position"""
+        for position, schedule in schedules:
+            self.add(position, schedule)
+
+    def remove(self, position: int):
+        """Drop the expense at position, the expenses after it move down by one"""
+        self.row_ids.remove(position)
+        if self.row_ids.needs_compaction:
+            self._compact()
+
+    def _compact(self):
+        for date in self.dates:
+            self._buckets[date] = array('I', self.row_ids.live_positions(self._buckets[date]))
+        self.dates = [date for date in self.dates if self._buckets[date]]
+        self._buckets = {date: self._buckets[date] for date in self.dates}
+        self.row_ids.reset()
+
+    def between(self, start: datetime.date, end: datetime.date) -> List[Tuple[datetime.date, int]]:
+        """Get the (date, position) of every occurrence from start to end inclusive"""
+        low = bisect_left(self.dates, start)
+        high = bisect_right(self.dates, end)
+        found = []
+        for date in self.dates[low:high]:
+            found.extend(zip(repeat(date), self.row_ids.live_positions(self._buckets[date])))
+        return found
@@ -0,0 +1,85 @@
+"""Forecasts of large column stores spread over worker processes
+
+forecast() walks every expense in one process. Here the rows of a column
+store are cut into slices and each worker process sums the cents of its rows
+per (schedule kind, schedule parameter, category code). A slice travels as the
+raw bytes of four columns, never as Expense objects, so the parent does no
+per row work. It adds up the small totals that come back and spreads them
+over the buckets as forecast() does, expanding each distinct schedule once.
+"""
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+import os
+
+from expense_store import ColumnarExpenseStore
+from snapshot_store import SnapshotExpenseStore, decode_schedule, encode_schedules
+import repo_root  # noqa: F401
+from aggregates import to_cents
+from forecast import Forecast, bucket_cents
+from period import Period
+
+# amounts, category codes, schedule kinds and schedule parameters, as in a snapshot
+COLUMN_TYPES = ("d", "B", "B", "i")
+
+# slices handed out per worker, so one slow slice doesn't leave the others idle at the end
+SLICES_PER_WORKER = 4
+
+
+def row_columns(store: Any) -> Tuple[list, List[Any]]:
+    """Get a store's amount, category code, schedule kind and schedule parameter columns and its categories
+
+    Snapshots and journaled stores already hold all four. A ColumnarExpenseStore
+    keeps schedule objects, which are encoded once per distinct object.
+    """
+    store = getattr(store, "store", store)
+    if isinstance(store, SnapshotExpenseStore):
+        return [store.amounts, store.category_codes, store.schedule_kinds, store.schedule_params], store.categories
+    if isinstance(store, ColumnarExpenseStore):
+        kinds, params = encode_schedules(store.schedules)
+        return [store.amounts, store.category_codes, kinds, params], store.categories
+    raise ValueError(f"Don't know the columns of a {type(store).__name__}, forecast() takes any expenses")
+
+
+def sum_rows(*columns: bytes) -> Dict[Tuple[int, int, int], int]:
+    """Sum the cents of a slice of rows per (schedule kind, schedule parameter, category code), in a worker"""
+    amounts, category_codes, kinds, params = (
+        memoryview(column).cast(typecode) for column, typecode in zip(columns, COLUMN_TYPES)
+    )
+    totals = defaultdict(int)
+    for key, amount in zip(zip(kinds, params, category_codes), amounts):
+        totals[key] += to_cents(amount)
+    return totals
+
+
+def parallel_forecast(store: Any, period: Period, interval: str = None, workers: int = None) -> Forecast:
+    """Forecast a column store like forecast() does its expenses, summing slices of rows in worker processes
+
+    workers defaults to one per core. At most two slices per worker are
+    waiting at any time, so the copies sent to the workers stay a small part
+    of the store.
+    """
+    columns, categories = row_columns(store)
+    workers = workers or os.cpu_count() or 1
+    rows = len(columns[0])
+    step = max(1, -(-rows // (workers * SLICES_PER_WORKER)))
+
+    totals = Counter()
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        for start in range(0, rows, step):
+            if len(pending) >= 2 * workers:
+                totals.update(pending.popleft().result())
+            pending.append(pool.submit(sum_rows, *(memoryview(column)[start:start + step].tobytes()
+                                                   for column in columns)))
+        while pending:
+            totals.update(pending.popleft().result())
+
+    amounts = defaultdict(Counter)
+    for (kind, parameter, code), cents in totals.items():
+        # kind 0 is no schedule, those expenses never fall due
+        if kind:
+            amounts[decode_schedule(kind, parameter)][categories[code]] += cents
+
+    buckets = period.make_period_list(interval)
+    return Forecast(buckets, bucket_cents(amounts, period, buckets))
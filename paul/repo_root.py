@@ -0,0 +1,15 @@
+"""Makes the modules at the root of the repository importable from paul
+
+paul's modules import each other by flat name. The parts it shares with the
+root app, such as the schedule registry, live at the repository root, which is
+appended to sys.path rather than put in front of it so that paul's own
+schedules, expenses and categories always win over the root modules of the
+same name. Import this before importing a root module.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
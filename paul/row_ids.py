@@ -0,0 +1,75 @@
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from typing import Iterable, Iterator
+
+
+class RowIds:
+    """Ids for the rows of a store that stay put when an earlier row is removed
+
+    Stores shift every later row down by one on a removal, so an index of
+    positions would have to rewrite all of them. Indexes hold ids instead:
+    rows get increasing ids as they are added, and removing one only records
+    its id as dead. A live id's position is the id less the number of dead ids
+    before it, one binary search away. Once a quarter of the ids are dead the
+    index owning them should compact, turning its ids back into positions with
+    live_positions and calling reset.
+    """
+
+    def __init__(self, count: int = 0):
+        self.next_id = count
+        self.dead = array('I')
+
+    def __len__(self) -> int:
+        return self.next_id - len(self.dead)
+
+    def add(self, count: int = 1) -> int:
+        """Give ids to count rows added at the end, returning the first"""
+        first = self.next_id
+        self.next_id += count
+        return first
+
+    def is_live(self, row_id: int) -> bool:
+        index = bisect_left(self.dead, row_id)
+        return 0 <= row_id < self.next_id and (index == len(self.dead) or self.dead[index] != row_id)
+
+    def position(self, row_id: int) -> int:
+        """The current position of a live id"""
+        return row_id - bisect_left(self.dead, row_id)
+
+    def id_at(self, position: int) -> int:
+        """The id of the row at position"""
+        if not 0 <= position < len(self):
+            raise IndexError("row position out of range")
+        # The smallest id with position + 1 live ids up to it, which is itself live
+        low, high = position, position + len(self.dead)
+        while low < high:
+            middle = (low + high) // 2
+            if middle + 1 - bisect_right(self.dead, middle) > position:
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def remove(self, position: int) -> int:
+        """Mark the row at position dead, returning its id"""
+        row_id = self.id_at(position)
+        insort(self.dead, row_id)
+        return row_id
+
+    def live_positions(self, row_ids: Iterable[int]) -> Iterator[int]:
+        """The positions of the live ids among row_ids, dead ones are left out"""
+        dead = self.dead
+        if not dead:
+            return iter(row_ids)
+        return (row_id - index for row_id in row_ids
+                for index in (bisect_left(dead, row_id),)
+                if index == len(dead) or dead[index] != row_id)
+
+    @property
+    def needs_compaction(self) -> bool:
+        return len(self.dead) > 64 and len(self.dead) * 4 > self.next_id
+
+    def reset(self):
+        """Start over with ids equal to positions, once the owner has renumbered its ids"""
+        self.next_id = len(self)
+        self.dead = array('I')
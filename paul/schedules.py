@@ -1,10 +1,70 @@
+from typing import Iterator, List
+import datetime
+
+import repo_root  # noqa: F401
+from business_calendar import BusinessCalendar, get_default_calendar
+from period import days_in_month, iter_months
+
+
 class ExpenseSchedule:
-    pass
+    __slots__ = ()
+
+    def iter_occurences(self, after: datetime.date) -> Iterator[datetime.date]:
+        """Yield every occurence after the given date in order"""
+        raise NotImplementedError
+
+    def get_occurences_in_period(self, period) -> List[datetime.date]:
+        """List the occurences after period.start up to and including period.end"""
+        occurences = []
+        for date in self.iter_occurences(period.start):
+            if date > period.end:
+                break
+            occurences.append(date)
+        return occurences
+
+    def parameters(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.parameters() == other.parameters()
+
+    def __hash__(self):
+        return hash((type(self), self.parameters()))
 
 class AnchoredExpenseSchedule(ExpenseSchedule):
+    __slots__ = ("anchor",)
+
     def __init__(self, anchor):
         self.anchor = anchor
 
+    def iter_occurences(self, after: datetime.date) -> Iterator[datetime.date]:
+        # Months without the anchor day are skipped, like the root schedule does
+        if not 1 <= self.anchor <= 31:
+            return
+        for year, month in iter_months(after):
+            if self.anchor <= days_in_month(year, month):
+                date = datetime.date(year, month, self.anchor)
+                if date > after:
+                    yield date
+
 class FirstLastWorkingDayMonthlyExpenseSchedule(ExpenseSchedule):
-    def __init__(self, anchor):
-        self.anchor = anchor
\ No newline at end of file
+    __slots__ = ("anchor", "calendar")
+
+    def __init__(self, anchor, calendar: BusinessCalendar = None):
+        self.anchor = anchor
+        # Working days come from the calendar, holidays included, the default one
+        # when the schedule is made unless told otherwise. It is one of the
+        # parameters, so cached occurrences never outlive a change of calendar
+        self.calendar = calendar or get_default_calendar()
+
+    def iter_occurences(self, after: datetime.date) -> Iterator[datetime.date]:
+        if self.anchor not in ("f", "l"):
+            raise ValueError(f"Must choose first or last working day, got {self.anchor!r}")
+        for year, month in iter_months(after):
+            days = self.calendar.working_days(year, month)
+            if days:
+                date = days[0] if self.anchor == "f" else days[-1]
+                if date > after:
+                    yield date
@@ -0,0 +1,333 @@
+from array import array
+from collections import Counter
+from itertools import compress
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+import mmap
+import os
+import struct
+import sys
+
+from categories import ExpenseCategory
+from expense_store import MAX_CATEGORIES, ColumnarExpenseStore, category_selectors
+from expenses import Expense
+import repo_root  # noqa: F401
+from business_calendar import BusinessCalendar
+from schedule_registry import intern_schedule
+from schedules import AnchoredExpenseSchedule, FirstLastWorkingDayMonthlyExpenseSchedule
+from sqlite_store import deserialize_category
+
+
+MAGIC = b"EXPSNAP\x00"
+VERSION = 1
+
+# Every section is a flat array of one type. The first five hold one value per
+# expense, the others are the category and name string tables: an array of
+# count + 1 offsets into a block of UTF-8 text.
+SECTIONS = (
+    ("amounts", "d"),
+    ("name_codes", "I"),
+    ("schedule_params", "i"),
+    ("category_codes", "B"),
+    ("schedule_kinds", "B"),
+    ("category_offsets", "I"),
+    ("category_text", "B"),
+    ("name_offsets", "I"),
+    ("name_text", "B"),
+)
+ROW_SECTIONS = 5
+
+# magic, version, rows, category count, name count, then the byte offset of every section
+HEADER = struct.Struct("<8sIQII" + "Q" * len(SECTIONS))
+ALIGNMENT = 8
+
+# A schedule is stored as a kind and an integer parameter, kind 0 is no schedule
+SCHEDULE_KINDS = {AnchoredExpenseSchedule: 1, FirstLastWorkingDayMonthlyExpenseSchedule: 2}
+
+
+def encode_schedule(schedule: Any) -> Tuple[int, int]:
+    """Turn a schedule into its (kind, parameter) descriptor"""
+    if schedule is None:
+        return 0, 0
+    kind = SCHEDULE_KINDS.get(type(schedule))
+    if kind is None:
+        raise ValueError(f"Don't know how to store a {type(schedule).__name__}")
+    anchor = schedule.anchor
+    if kind == 2:
+        if anchor not in ("f", "l"):
+            raise ValueError(f"First/last working day anchors are 'f' or 'l', got {anchor!r}")
+        return kind, ord(anchor)
+    if isinstance(anchor, float) and anchor.is_integer():
+        anchor = int(anchor)
+    if type(anchor) is not int or not -2 ** 31 <= anchor < 2 ** 31:
+        raise ValueError(f"Day of month anchors are whole numbers, got {anchor!r}")
+    return kind, anchor
+
+
+def decode_schedule(kind: int, parameter: int, calendar: BusinessCalendar = None) -> Any:
+    """Rebuild a schedule from its (kind, parameter) descriptor, shared through the schedule registry
+
+    Working day schedules get the calendar, the default one when there is none
+    """
+    if kind == 0:
+        return None
+    if kind == 1:
+        return intern_schedule(AnchoredExpenseSchedule(parameter))
+    if kind == 2:
+        return intern_schedule(FirstLastWorkingDayMonthlyExpenseSchedule(chr(parameter), calendar))
+    raise ValueError(f"Unknown schedule kind {kind}")
+
+
+def _string_table(strings: List[str]) -> Tuple[array, bytes]:
+    """Pack strings into an array of offsets and one block of UTF-8 text"""
+    encoded = [str(string).encode() for string in strings]
+    offsets = array('I', [0])
+    for text in encoded:
+        offsets.append(offsets[-1] + len(text))
+    return offsets, b"".join(encoded)
+
+
+def encode_schedules(schedules: List[Any]) -> Tuple[array, array]:
+    """Encode a column of schedules into the kind and parameter columns"""
+    # Rows share a handful of interned schedule objects, so each distinct object
+    # is encoded once and the per row work stays in map() and the array constructor
+    ids = list(map(id, schedules))
+    descriptors = {key: encode_schedule(schedule) for key, schedule in dict(zip(ids, schedules)).items()}
+    kinds = {key: descriptor[0] for key, descriptor in descriptors.items()}
+    params = {key: descriptor[1] for key, descriptor in descriptors.items()}
+    return array('B', map(kinds.__getitem__, ids)), array('i', map(params.__getitem__, ids))
+
+
+def _columns(expenses: Iterable[Expense]) -> Tuple[dict, list, list]:
+    """Collect the row columns and the category and name tables in one pass over the expenses"""
+    if isinstance(expenses, ColumnarExpenseStore):
+        # Already in columns, only the schedules need encoding
+        columns = {"amounts": expenses.amounts, "name_codes": expenses.name_codes,
+                   "category_codes": expenses.category_codes}
+        categories, names, schedules = expenses.categories, expenses.names, expenses.schedules
+    else:
+        columns = {"amounts": array('d'), "name_codes": array('I'), "category_codes": array('B')}
+        categories = list(ExpenseCategory)
+        category_lookup = {category: code for code, category in enumerate(categories)}
+        names = []
+        name_lookup = {}
+        schedules = []
+        for expense in expenses:
+            category_code = category_lookup.get(expense.category)
+            if category_code is None:
+                if len(categories) >= MAX_CATEGORIES:
+                    raise ValueError(f"A snapshot holds at most {MAX_CATEGORIES} categories, "
+                                     f"can't add {expense.category!r}")
+                category_code = category_lookup[expense.category] = len(categories)
+                categories.append(expense.category)
+            name_code = name_lookup.get(expense.name)
+            if name_code is None:
+                name_code = name_lookup[expense.name] = len(names)
+                names.append(expense.name)
+            columns["amounts"].append(expense.amount)
+            columns["category_codes"].append(category_code)
+            columns["name_codes"].append(name_code)
+            schedules.append(expense.schedule)
+    columns["schedule_kinds"], columns["schedule_params"] = encode_schedules(schedules)
+    return columns, categories, names
+
+
+def write_snapshot(path: str, expenses: Iterable[Expense]) -> int:
+    """Write expenses to a snapshot file, returning how many were written
+
+    The file is written next to path and renamed over it once complete, so a
+    crash part way through leaves any previous snapshot intact.
+    """
+    columns, categories, names = _columns(expenses)
+    columns["category_offsets"], columns["category_text"] = _string_table(categories)
+    columns["name_offsets"], columns["name_text"] = _string_table(names)
+
+    temporary = f"{path}.tmp"
+    offsets = []
+    with open(temporary, "wb") as f:
+        f.write(bytes(HEADER.size))
+        for name, _ in SECTIONS:
+            data = columns[name]
+            if isinstance(data, array) and sys.byteorder != "little":
+                data = array(data.typecode, data)
+                data.byteswap()
+            f.write(bytes(-f.tell() % ALIGNMENT))
+            offsets.append(f.tell())
+            f.write(data)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, len(columns["amounts"]), len(categories), len(names), *offsets))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+    return len(columns["amounts"])
+
+
+class SnapshotExpenseStore:
+    """A read-only store over a snapshot file, memory mapped instead of read in
+
+    Opening only maps the file and checks its header, every column is a
+    memoryview straight onto the mapped pages, so totals and category queries
+    run over the file without building an Expense per row. Names and schedules
+    are decoded the first time a row using them is read. The store can't be
+    changed, to_columnar() copies it into a ColumnarExpenseStore that can.
+    """
+
+    def __init__(self, path: str):
+        if sys.byteorder != "little":
+            raise ValueError("Snapshots hold little-endian columns and can only be mapped on little-endian machines")
+        self.path = path
+        self._sections: List[memoryview] = []
+        self._file = open(path, "rb")
+        try:
+            self._map()
+        except BaseException:
+            # nothing of a file that can't be read stays open or mapped
+            self.close()
+            raise
+
+    def _map(self):
+        """Map the file and check every section lies inside it before making a view of it"""
+        path = self.path
+        if os.fstat(self._file.fileno()).st_size < HEADER.size:
+            raise ValueError(f"{path} is too short to be an expense snapshot")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        magic, version, rows, category_count, name_count, *offsets = HEADER.unpack_from(self._view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} expense snapshot")
+        self.rows = rows
+
+        lengths = [rows] * ROW_SECTIONS + [category_count + 1, None, name_count + 1, None]
+        sections = {}
+        for (name, typecode), offset, length in zip(SECTIONS, offsets, lengths):
+            if length is None:
+                # text blocks end where the last offset of their table says
+                length = sections[name.replace("_text", "_offsets")][-1]
+            size = struct.calcsize(typecode)
+            if offset < HEADER.size or offset + length * size > len(self._mmap):
+                raise ValueError(f"{path} is damaged, its {name} section lies outside the file")
+            section = self._view[offset:offset + length * size].cast(typecode)
+            self._sections.append(section)
+            sections[name] = section
+
+        self.amounts = sections["amounts"]
+        self.category_codes = sections["category_codes"]
+        self.name_codes = sections["name_codes"]
+        self.schedule_kinds = sections["schedule_kinds"]
+        self.schedule_params = sections["schedule_params"]
+        self.categories: List[Any] = [
+            deserialize_category(text) for text in self._strings(sections["category_offsets"], sections["category_text"])
+        ]
+        self._name_offsets = sections["name_offsets"]
+        self._name_text = sections["name_text"]
+        self._names: Dict[int, str] = {}
+        self._schedules: Dict[Tuple[int, int], Any] = {}
+
+    @staticmethod
+    def _strings(offsets: memoryview, text: memoryview) -> List[str]:
+        return [bytes(text[offsets[i]:offsets[i + 1]]).decode() for i in range(len(offsets) - 1)]
+
+    def _name(self, code: int) -> str:
+        name = self._names.get(code)
+        if name is None:
+            name = self._names[code] = bytes(self._name_text[self._name_offsets[code]:self._name_offsets[code + 1]]).decode()
+        return name
+
+    def _schedule(self, kind: int, parameter: int) -> Any:
+        key = (kind, parameter)
+        if key not in self._schedules:
+            self._schedules[key] = decode_schedule(kind, parameter)
+        return self._schedules[key]
+
+    @property
+    def names(self) -> List[str]:
+        return [self._name(code) for code in range(len(self._name_offsets) - 1)]
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, index: int) -> Expense:
+        return Expense(
+            name=self._name(self.name_codes[index]),
+            amount=self.amounts[index],
+            category=self.categories[self.category_codes[index]],
+            schedule=self._schedule(self.schedule_kinds[index], self.schedule_params[index]),
+        )
+
+    def __iter__(self) -> Iterator[Expense]:
+        columns = zip(self.amounts, self.category_codes, self.name_codes, self.schedule_kinds, self.schedule_params)
+        for amount, category_code, name_code, kind, parameter in columns:
+            yield Expense(self._name(name_code), amount, self.categories[category_code], self._schedule(kind, parameter))
+
+    def _selectors(self) -> Iterator[Tuple[int, bytes]]:
+        # works on a copy of the 1 byte code column, the only column that is copied
+        return category_selectors(self.category_codes.tobytes(), len(self.categories))
+
+    def total(self) -> float:
+        """Calculate the total of all expenses"""
+        return sum(self.amounts)
+
+    def category_totals(self) -> Dict[Any, float]:
+        """Total of each category, summed straight from the mapped amounts"""
+        return {self.categories[code]: sum(compress(self.amounts, selectors)) for code, selectors in self._selectors()}
+
+    def amount_counts(self) -> Iterator[Tuple[Any, float, int]]:
+        """Give (category, amount, how many expenses have it) for every distinct amount in every category"""
+        for code, selectors in self._selectors():
+            category = self.categories[code]
+            for amount, count in Counter(compress(self.amounts, selectors)).items():
+                yield category, amount, count
+
+    def category_positions(self) -> Dict[Any, array]:
+        """The positions of the expenses in each category, in increasing order"""
+        return {
+            self.categories[code]: array('I', compress(range(self.rows), selectors))
+            for code, selectors in self._selectors()
+        }
+
+    def by_category(self) -> Dict[ExpenseCategory, List[Expense]]:
+        """Group expenses by category"""
+        return {
+            self.categories[code]: [self[index] for index in compress(range(self.rows), selectors)]
+            for code, selectors in self._selectors()
+        }
+
+    def to_columnar(self) -> ColumnarExpenseStore:
+        """Copy the snapshot into a ColumnarExpenseStore that can be changed"""
+        schedules = [self._schedule(kind, parameter) for kind, parameter in zip(self.schedule_kinds, self.schedule_params)]
+        return ColumnarExpenseStore.from_columns(
+            _copy('d', self.amounts),
+            _copy('B', self.category_codes),
+            _copy('I', self.name_codes),
+            schedules,
+            self.categories,
+            self.names,
+        )
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Snapshots are read-only, copy one with to_columnar() to change it")
+
+    add = extend = pop = set_amount = _read_only
+
+    def close(self):
+        """Unmap the file, rows read from the store stay valid"""
+        for section in self._sections:
+            section.release()
+        # a snapshot that failed to open may not have got as far as mapping the file
+        if hasattr(self, "_view"):
+            self._view.release()
+        if hasattr(self, "_mmap"):
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> 'SnapshotExpenseStore':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _copy(typecode: str, column: memoryview) -> array:
+    copied = array(typecode)
+    with column.cast('B') as raw:
+        copied.frombytes(raw)
+    return copied
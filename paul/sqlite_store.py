@@ -0,0 +1,156 @@
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import sqlite3
+
+from categories import ExpenseCategory
+from expenses import Expense
+from schedules import AnchoredExpenseSchedule, FirstLastWorkingDayMonthlyExpenseSchedule
+
+
+# Schedule classes and the name they are stored under
+SCHEDULE_TYPES = {
+    "anchored": AnchoredExpenseSchedule,
+    "first_last": FirstLastWorkingDayMonthlyExpenseSchedule,
+}
+SCHEDULE_NAMES = {schedule_class: name for name, schedule_class in SCHEDULE_TYPES.items()}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS expenses (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    amount REAL NOT NULL,
+    category TEXT NOT NULL,
+    schedule_type TEXT,
+    schedule_anchor
+);
+CREATE INDEX IF NOT EXISTS expenses_category ON expenses (category);
+CREATE INDEX IF NOT EXISTS expenses_schedule_type ON expenses (schedule_type);
+"""
+
+# The sqlite3 module keeps prepared statements for these in its statement cache
+INSERT = "INSERT INTO expenses (id, name, amount, category, schedule_type, schedule_anchor) VALUES (?, ?, ?, ?, ?, ?)"
+SELECT = "SELECT id, name, amount, category, schedule_type, schedule_anchor FROM expenses"
+
+
+def serialize_schedule(schedule: Any) -> Tuple[Optional[str], Any]:
+    """Turn a schedule into its (type, anchor) columns"""
+    if schedule is None:
+        return None, None
+    name = SCHEDULE_NAMES.get(type(schedule))
+    if name is None:
+        raise ValueError(f"Don't know how to store a {type(schedule).__name__}")
+    return name, schedule.anchor
+
+
+def deserialize_schedule(schedule_type: Optional[str], anchor: Any) -> Any:
+    """Rebuild a schedule from its (type, anchor) columns"""
+    if schedule_type is None:
+        return None
+    return SCHEDULE_TYPES[schedule_type](anchor)
+
+
+def deserialize_category(value: str) -> Any:
+    """Turn a stored category back into an ExpenseCategory where there is one"""
+    try:
+        return ExpenseCategory(value)
+    except ValueError:
+        return value
+
+
+class SQLiteExpenseStore:
+    """Stores expenses in an SQLite database so they outlive the process
+
+    Only the row ids are held in memory, to find rows by position. Bulk
+    loads go through extend(), which inserts every row in one transaction.
+    """
+
+    def __init__(self, path: str = ":memory:", check_same_thread: bool = True):
+        # Pass check_same_thread=False to share the store between threads that take turns with it
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=check_same_thread)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+        self._ids = array('q', (row[0] for row in self.connection.execute("SELECT id FROM expenses ORDER BY id")))
+        self._next_id = self._ids[-1] + 1 if self._ids else 1
+
+    def _row(self, expense: Expense) -> tuple:
+        """Build the database row for an expense, handing out the next id"""
+        schedule_type, anchor = serialize_schedule(expense.schedule)
+        row = (self._next_id, expense.name, expense.amount, str(expense.category), schedule_type, anchor)
+        self._next_id += 1
+        return row
+
+    def _expense(self, row: tuple) -> Expense:
+        """Build an expense from a database row"""
+        _, name, amount, category, schedule_type, anchor = row
+        return Expense(
+            name=name,
+            amount=amount,
+            category=deserialize_category(category),
+            schedule=deserialize_schedule(schedule_type, anchor),
+        )
+
+    def add(self, expense: Expense):
+        """Add an expense to the store"""
+        row = self._row(expense)
+        with self.connection:
+            self.connection.execute(INSERT, row)
+        self._ids.append(row[0])
+
+    def extend(self, expenses: Iterable[Expense]):
+        """Add many expenses in a single transaction"""
+        rows = [self._row(expense) for expense in expenses]
+        with self.connection:
+            self.connection.executemany(INSERT, rows)
+        self._ids.extend(row[0] for row in rows)
+
+    def pop(self, index: int = -1) -> Expense:
+        """Remove the expense at index and return it"""
+        expense = self[index]
+        with self.connection:
+            self.connection.execute("DELETE FROM expenses WHERE id = ?", (self._ids[index],))
+        del self._ids[index]
+        return expense
+
+    def set_amount(self, index: int, amount: float):
+        """Change the amount of the expense at index"""
+        with self.connection:
+            self.connection.execute("UPDATE expenses SET amount = ? WHERE id = ?", (amount, self._ids[index]))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, index: int) -> Expense:
+        row = self.connection.execute(SELECT + " WHERE id = ?", (self._ids[index],)).fetchone()
+        return self._expense(row)
+
+    def __iter__(self) -> Iterator[Expense]:
+        # One query for everything, rows are turned into expenses as they stream in
+        for row in self.connection.execute(SELECT + " ORDER BY id"):
+            yield self._expense(row)
+
+    def total(self) -> float:
+        """Calculate the total of all expenses"""
+        return self.connection.execute("SELECT COALESCE(SUM(amount), 0) FROM expenses").fetchone()[0]
+
+    def by_category(self) -> Dict[ExpenseCategory, List[Expense]]:
+        """Group expenses by category"""
+        result = {}
+        for row in self.connection.execute(SELECT + " ORDER BY category, id"):
+            expense = self._expense(row)
+            if expense.category not in result:
+                result[expense.category] = []
+            result[expense.category].append(expense)
+        return result
+
+    def close(self):
+        """Close the database connection"""
+        self.connection.close()
+
+    def __enter__(self) -> 'SQLiteExpenseStore':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
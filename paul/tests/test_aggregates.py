@@ -0,0 +1,61 @@
+import unittest
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from expense_manager import ExpenseManager
+from expense_store import ColumnarExpenseStore
+from expenses import Expense
+
+
+class TestExpenseManagerAggregates(unittest.TestCase):
+    """Test that the expense manager keeps its totals in step with its expenses"""
+
+    def check_manager(self, manager):
+        manager.add_expense(Expense("Rent", 1000.0, "Rent", None))
+        manager.add_expense(Expense("Shop", 200.0, "Groceries", None))
+        manager.add_expense(Expense("Shop", 50.0, "Groceries", None))
+
+        manager.update_amount(1, 150.0)
+        self.assertEqual(manager.total(), 1200.0)
+        self.assertEqual(manager.get_category_totals(), {"Rent": 1000.0, "Groceries": 200.0})
+
+        removed = manager.remove_expense(0)
+        self.assertEqual(removed.name, "Rent")
+        self.assertEqual(manager.total(), 200.0)
+        self.assertEqual(manager.get_category_totals(), {"Groceries": 200.0})
+        self.assertEqual(len(manager.expenses), 2)
+
+    def test_extremes_after_removals(self):
+        for manager in [ExpenseManager(), ExpenseManager(ColumnarExpenseStore())]:
+            manager.add_expenses(Expense("Shop", amount, "Groceries", None) for amount in [5.0, 1.0, 9.0])
+            manager.add_expense(Expense("Rent", 900.0, "Rent", None))
+            manager.remove_expense(2)
+            manager.remove_expense(1)
+            self.assertEqual(manager.aggregates.for_category("Groceries").maximum, 5)
+            self.assertEqual(manager.aggregates.overall.minimum, 5)
+            self.assertEqual(manager.aggregates.overall.maximum, 900)
+
+    def test_amounts_without_cents_are_rejected(self):
+        # Nothing is stored, so the totals still cover every row
+        for manager in [ExpenseManager(), ExpenseManager(ColumnarExpenseStore())]:
+            manager.add_expense(Expense("Shop", 10.0, "Groceries", None))
+            for amount in [float("nan"), float("inf")]:
+                with self.assertRaises(ValueError):
+                    manager.add_expense(Expense("Bad", amount, "Groceries", None))
+                with self.assertRaises(ValueError):
+                    manager.add_expenses([Expense("Good", 1.0, "Groceries", None), Expense("Bad", amount, "Rent", None)])
+                with self.assertRaises(ValueError):
+                    manager.update_amount(0, amount)
+            self.assertEqual((len(manager.expenses), manager.total()), (1, 10.0))
+            self.assertEqual(manager.expenses[0].amount, 10.0)
+
+    def test_list_store(self):
+        self.check_manager(ExpenseManager())
+
+    def test_columnar_store(self):
+        self.check_manager(ExpenseManager(ColumnarExpenseStore()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import unittest
+from http.client import HTTPConnection
+import contextlib
+import datetime
+import io
+import json
+import os, sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api_server import ExpenseAPI, make_server
+from categories import ExpenseCategory
+from expense_manager import ExpenseManager
+from expense_store import ColumnarExpenseStore
+from expenses import Expense
+
+
+class MonthlySchedule:
+    """A schedule due on a fixed day of every month"""
+
+    def __init__(self, day):
+        self.day = day
+
+    def get_occurences_in_period(self, period):
+        dates = []
+        year, month = period.start.year, period.start.month
+        while True:
+            date = datetime.date(year, month, self.day)
+            if date > period.end:
+                return dates
+            if date > period.start:
+                dates.append(date)
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+RENT = {"name": "Rent", "amount": "1000", "category": "r", "schedule_type": "a", "anchor_day": 1}
+
+
+class TestExpenseAPI(unittest.TestCase):
+    """Test the endpoints without going through HTTP"""
+
+    def setUp(self):
+        self.manager = ExpenseManager(ColumnarExpenseStore())
+        self.api = ExpenseAPI(self.manager)
+
+    def request(self, method, target, payload=None):
+        return self.api.handle(method, target, json.dumps(payload).encode() if payload is not None else b"")
+
+    def test_add_and_totals(self):
+        self.assertEqual(self.request("POST", "/expenses", RENT), (201, {"index": 0}))
+        self.assertEqual(self.request("POST", "/expenses", dict(RENT, name="Shop", amount=50.5, category="Groceries")),
+                         (201, {"index": 1}))
+        self.assertEqual(self.request("GET", "/totals"), (200, {"total": 1050.5, "count": 2}))
+        self.assertEqual(self.request("GET", "/categories"), (200, {"Rent": 1000.0, "Groceries": 50.5}))
+
+    def test_invalid_expense(self):
+        status, body = self.request("POST", "/expenses", dict(RENT, amount="lots"))
+        self.assertEqual(status, 400)
+        self.assertIn("amount", body["errors"])
+        self.assertEqual(len(self.manager.expenses), 0)
+
+    def test_batch(self):
+        status, body = self.request("POST", "/expenses/batch", [RENT, dict(RENT, name=""), RENT, "rent"])
+        self.assertEqual(status, 201)
+        self.assertEqual(body["added"], 2)
+        self.assertEqual(sorted(body["errors"]), [1, 3])
+        self.assertEqual(self.manager.total(), 2000.0)
+
+    def test_bad_requests(self):
+        self.assertEqual(self.request("GET", "/nowhere")[0], 404)
+        self.assertEqual(self.request("GET", "/expenses")[0], 405)
+        self.assertEqual(self.api.handle("POST", "/expenses", b"{not json")[0], 400)
+        self.assertEqual(self.request("POST", "/expenses/batch", RENT)[0], 400)
+        self.assertEqual(self.request("GET", "/forecast?months=0")[0], 400)
+
+    def test_values_must_be_scalars(self):
+        status, body = self.request("POST", "/expenses", dict(RENT, category=["r"], amount={"value": 5}))
+        self.assertEqual(status, 400)
+        self.assertEqual(body["errors"]["category"], ["Category must be a single value"])
+        self.assertIn("amount", body["errors"])
+        status, body = self.request("POST", "/expenses/batch", [RENT, dict(RENT, schedule_type=["a"])])
+        self.assertEqual((status, body["added"], list(body["errors"])), (201, 1, [1]))
+
+    def test_amounts_without_cents(self):
+        # NaN and 1e400 parse as JSON numbers but are rejected like any other bad amount
+        for amount in ["NaN", "1e400", "Infinity"]:
+            body = json.dumps(RENT).replace('"1000"', amount).encode()
+            status, reply = self.api.handle("POST", "/expenses", body)
+            self.assertEqual((status, list(reply["errors"])), (400, ["amount"]))
+        self.assertEqual(self.request("GET", "/totals"), (200, {"total": 0, "count": 0}))
+
+    def test_unexpected_errors(self):
+        def fail(query, body):
+            raise RuntimeError("store is gone")
+
+        self.api.routes["GET", "/totals"] = fail
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(self.request("GET", "/totals"), (500, {"error": "Internal server error"}))
+        self.assertIn("store is gone", stderr.getvalue())
+
+    def test_forecast(self):
+        self.manager.add_expense(Expense("Rent", 1000.0, ExpenseCategory.RENT, MonthlySchedule(1)))
+        self.manager.add_expense(Expense("Gym", 30.0, ExpenseCategory.ENTERTAINMENT, MonthlySchedule(15)))
+        self.manager.add_expense(Expense("Flat", 500.0, ExpenseCategory.RENT, MonthlySchedule(1)))
+        status, months = self.request("GET", "/forecast?start=2025-01-20&months=3")
+        self.assertEqual(status, 200)
+        self.assertEqual([month["month"] for month in months], ["2025-01", "2025-02", "2025-03"])
+        self.assertEqual(months[0], {"month": "2025-01", "total": 1530.0,
+                                     "categories": {"Rent": 1500.0, "Entertainment": 30.0}})
+
+    def test_forecast_posted_expenses(self):
+        # The expenses the form builds forecast like any other, in whole cents
+        self.request("POST", "/expenses", RENT)
+        self.request("POST", "/expenses/batch", [
+            dict(RENT, name="Snack", amount="0.1", category="g", anchor_day=5),
+            dict(RENT, name="Snack", amount="0.2", category="g", anchor_day=5),
+        ])
+        status, months = self.request("GET", "/forecast?start=2025-02-10&months=2")
+        self.assertEqual(status, 200)
+        self.assertEqual(months, [
+            {"month": "2025-02", "total": 1000.3, "categories": {"Rent": 1000.0, "Groceries": 0.3}},
+            {"month": "2025-03", "total": 1000.3, "categories": {"Rent": 1000.0, "Groceries": 0.3}},
+        ])
+
+
+class TestAPIServer(unittest.TestCase):
+    """Test the HTTP server with a keep-alive connection"""
+
+    def setUp(self):
+        self.manager = ExpenseManager(ColumnarExpenseStore())
+        self.server = make_server(ExpenseAPI(self.manager), port=0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.connection = HTTPConnection(*self.server.server_address[:2])
+
+    def tearDown(self):
+        self.connection.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def request(self, method, path, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else None
+        self.connection.request(method, path, body, {"Content-Type": "application/json"})
+        response = self.connection.getresponse()
+        return response.status, json.loads(response.read())
+
+    def test_requests_share_a_connection(self):
+        self.assertEqual(self.request("POST", "/expenses", RENT), (201, {"index": 0}))
+        socket = self.connection.sock
+        self.assertEqual(self.request("POST", "/expenses/batch", [RENT] * 3)[1]["added"], 3)
+        self.assertEqual(self.request("GET", "/totals"), (200, {"total": 4000.0, "count": 4}))
+        self.assertEqual(self.request("GET", "/nowhere")[0], 404)
+        self.assertIs(self.connection.sock, socket)
+
+    def test_bad_content_length(self):
+        for length in ["lots", "-5"]:
+            self.connection.putrequest("POST", "/expenses")
+            self.connection.putheader("Content-Length", length)
+            self.connection.endheaders()
+            response = self.connection.getresponse()
+            self.assertEqual(response.status, 400)
+            self.assertIn("Content-Length", json.loads(response.read())["error"])
+            self.connection.close()
+        # the server keeps serving
+        self.assertEqual(self.request("GET", "/totals"), (200, {"total": 0.0, "count": 0}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import asyncio
+import socket
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from async_form_view import AsyncFormView, form_session_handler
+from form_system import Form, InputField, NumericField, SelectField, create_expense_form
+
+
+class FakeWriter:
+    """Collects what a view writes"""
+
+    def __init__(self):
+        self.written = b""
+
+    def write(self, data):
+        self.written += data
+
+    async def drain(self):
+        pass
+
+
+def reader_with(*lines):
+    reader = asyncio.StreamReader()
+    reader.feed_data("".join(f"{line}\n" for line in lines).encode())
+    reader.feed_eof()
+    return reader
+
+
+class TestAsyncFormView(unittest.IsolatedAsyncioTestCase):
+    """Test a form session driven from a stream"""
+
+    def setUp(self):
+        self.form = Form("Test Form")
+        self.form.add_field(InputField("name", "Name"))
+        self.form.add_field(NumericField("age", "Age", min_value=0, max_value=120))
+        self.form.add_field(SelectField("colour", {"r": "Red", "b": "Blue"}, "Colour", required=False))
+
+    async def test_process(self):
+        writer = FakeWriter()
+        view = AsyncFormView(self.form, reader_with("Ann", "30", "r"), writer)
+        self.assertEqual(await view.process(), {"name": "Ann", "age": 30, "colour": "Red"})
+        self.assertIn(b"Name *: ", writer.written)
+        self.assertIn(b"  b: Blue\n", writer.written)
+
+    async def test_retries_until_valid(self):
+        writer = FakeWriter()
+        view = AsyncFormView(self.form, reader_with("", "Ann", "old", "200", "30", "x", ""), writer)
+        self.assertEqual(await view.process(), {"name": "Ann", "age": 30, "colour": None})
+        self.assertIn(b"Error: Name is required", writer.written)
+        self.assertIn(b"Error: Please enter a numeric value.", writer.written)
+        self.assertEqual(writer.written.count(b"Error: "), 4)
+
+    async def test_client_leaving(self):
+        self.assertIsNone(await AsyncFormView(self.form, reader_with("Ann"), FakeWriter()).process())
+
+    async def test_answers_that_are_not_utf8_are_asked_again(self):
+        writer = FakeWriter()
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"\xff\xfe\n" + "Zoë\n30\nr\n".encode())
+        reader.feed_eof()
+        self.assertEqual(await AsyncFormView(self.form, reader, writer).process(),
+                         {"name": "Zoë", "age": 30, "colour": "Red"})
+        self.assertEqual(writer.written.count(b"Error: Please answer in UTF-8 text."), 1)
+
+    async def test_overlong_line_ends_the_session(self):
+        reader = asyncio.StreamReader(limit=16)
+        reader.feed_data(b"A" * 100 + b"\n30\nr\n")
+        reader.feed_eof()
+        self.assertIsNone(await AsyncFormView(self.form, reader, FakeWriter()).process())
+
+    async def test_form_fields_untouched(self):
+        await AsyncFormView(self.form, reader_with("Ann", "30", "r"), FakeWriter()).process()
+        self.assertTrue(all(field.value is None for field in self.form.fields))
+
+    async def test_sessions_over_sockets(self):
+        submitted = []
+        handler = form_session_handler(create_expense_form(), submitted.append)
+
+        async def session(name, answers):
+            server_sock, client_sock = socket.socketpair()
+            server = await asyncio.open_connection(sock=server_sock)
+            reader, writer = await asyncio.open_connection(sock=client_sock)
+            writer.write("".join(f"{answer}\n" for answer in [name, *answers]).encode())
+            await asyncio.gather(handler(*server), writer.drain())
+            transcript = await reader.read()
+            writer.close()
+            return transcript
+
+        transcripts = await asyncio.gather(*(
+            session(f"Payee {i}", ["12.50", "g", "a", str(i % 28 + 1), ""]) for i in range(50)
+        ))
+        self.assertEqual(len(submitted), 50)
+        self.assertTrue(all(transcript.endswith(b"Saved.\n") for transcript in transcripts))
+        self.assertEqual(sorted(expense.name for expense in submitted), sorted(f"Payee {i}" for i in range(50)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from category_index import CategoryIndex
+from expense_manager import ExpenseManager
+from expense_store import ColumnarExpenseStore, ListExpenseStore
+from categories import ExpenseCategory
+from expenses import Expense
+
+
+def make_expenses():
+    return [
+        Expense("Rent", 1000.0, ExpenseCategory.RENT, None),
+        Expense("Shop", 80.0, ExpenseCategory.GROCERIES, None),
+        Expense("Cinema", 15.0, ExpenseCategory.ENTERTAINMENT, None),
+        Expense("Market", 120.0, ExpenseCategory.GROCERIES, None),
+        Expense("Corner", 5.5, ExpenseCategory.GROCERIES, None),
+        Expense("Concert", 60.0, ExpenseCategory.ENTERTAINMENT, None),
+    ]
+
+
+class TestCategoryIndex(unittest.TestCase):
+    """Test the positions kept per category"""
+
+    def setUp(self):
+        self.index = CategoryIndex.for_store(ListExpenseStore(make_expenses()))
+
+    def test_positions(self):
+        self.assertEqual(list(self.index.positions[ExpenseCategory.GROCERIES]), [1, 3, 4])
+        self.assertEqual(self.index.count(ExpenseCategory.ENTERTAINMENT), 2)
+        self.assertEqual(self.index.count(ExpenseCategory.UTILITIES), 0)
+
+    def test_union(self):
+        self.assertEqual(list(self.index.positions_in(ExpenseCategory.GROCERIES, ExpenseCategory.ENTERTAINMENT)),
+                         [1, 2, 3, 4, 5])
+        self.assertEqual(list(self.index.positions_in("Rent", ExpenseCategory.RENT)), [0])
+        self.assertEqual(list(self.index.positions_in(ExpenseCategory.UTILITIES)), [])
+
+    def test_remove_shifts_later_positions(self):
+        self.index.remove(2, ExpenseCategory.ENTERTAINMENT)
+        self.assertEqual(list(self.index.positions[ExpenseCategory.GROCERIES]), [1, 2, 3])
+        self.assertEqual(list(self.index.positions[ExpenseCategory.ENTERTAINMENT]), [4])
+        self.index.remove(0, ExpenseCategory.RENT)
+        self.assertNotIn(ExpenseCategory.RENT, self.index.positions)
+
+    def test_remove_checks_the_category(self):
+        with self.assertRaises(ValueError):
+            self.index.remove(1, ExpenseCategory.ENTERTAINMENT)
+        with self.assertRaises(ValueError):
+            self.index.remove(1, ExpenseCategory.UTILITIES)
+        self.assertEqual(list(self.index.positions_of(ExpenseCategory.GROCERIES)), [1, 3, 4])
+        self.assertEqual(list(self.index.positions_of(ExpenseCategory.ENTERTAINMENT)), [2, 5])
+
+    def test_compaction(self):
+        # Removing most of the rows rewrites the arrays as positions, the queries agree throughout
+        expenses = make_expenses() * 100
+        index = CategoryIndex.for_store(ListExpenseStore(expenses))
+        # Every other row goes, from the front
+        for position in range(300):
+            index.remove(position, expenses.pop(position).category)
+        self.assertLess(len(index.row_ids.dead), 300)
+        for category in ExpenseCategory:
+            self.assertEqual(list(index.positions_of(category)),
+                             [position for position, expense in enumerate(expenses) if expense.category == category])
+            self.assertEqual(index.count(category), len(index.positions_of(category)))
+
+    def test_built_from_the_category_column(self):
+        store = ColumnarExpenseStore()
+        store.extend(make_expenses())
+        index = CategoryIndex.for_store(store)
+        self.assertEqual({category: list(positions) for category, positions in index.positions.items()},
+                         {category: list(positions) for category, positions in self.index.positions.items()})
+
+
+class TestManagerCategoryQueries(unittest.TestCase):
+    """Test the expense manager queries that go through the category index"""
+
+    def check(self, manager):
+        self.assertEqual([e.name for e in manager.get_expenses_in(ExpenseCategory.GROCERIES, ExpenseCategory.RENT)],
+                         ["Rent", "Shop", "Market", "Corner"])
+        self.assertEqual(manager.total_in(ExpenseCategory.GROCERIES, ExpenseCategory.ENTERTAINMENT), 280.5)
+        self.assertEqual([e.name for e in manager.top_expenses(ExpenseCategory.GROCERIES, 2)], ["Market", "Shop"])
+        self.assertEqual(manager.top_expenses(ExpenseCategory.UTILITIES), [])
+
+        manager.add_expense(Expense("Deli", 200.0, ExpenseCategory.GROCERIES, None))
+        manager.remove_expense(0)
+        self.assertEqual([e.name for e in manager.top_expenses_by_category(1)[ExpenseCategory.GROCERIES]], ["Deli"])
+        self.assertEqual([e.name for e in manager.get_by_category()[ExpenseCategory.GROCERIES]],
+                         ["Shop", "Market", "Corner", "Deli"])
+        self.assertNotIn(ExpenseCategory.RENT, manager.get_by_category())
+        self.assertEqual(manager.total_in(ExpenseCategory.RENT), 0.0)
+
+    def test_list_store(self):
+        manager = ExpenseManager()
+        manager.add_expenses(make_expenses())
+        self.check(manager)
+
+    def test_columnar_store(self):
+        store = ColumnarExpenseStore()
+        store.extend(make_expenses())
+        self.check(ExpenseManager(store))
+
+    def test_index_is_kept_up_to_date(self):
+        manager = ExpenseManager()
+        manager.add_expenses(make_expenses())
+        index = manager.get_category_index()
+        manager.add_expenses(make_expenses())
+        manager.remove_expense(1)
+        self.assertIs(manager.get_category_index(), index)
+        self.assertEqual(list(index.positions[ExpenseCategory.GROCERIES]), [2, 3, 6, 8, 9])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from unittest.mock import MagicMock
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from expense_store import MAX_CATEGORIES, ListExpenseStore, ColumnarExpenseStore
+from expense_manager import ExpenseManager
+from categories import ExpenseCategory
+from expenses import Expense
+
+
+class TestColumnarExpenseStore(unittest.TestCase):
+    """Test the column based expense store"""
+
+    def setUp(self):
+        self.store = ColumnarExpenseStore()
+        self.schedule = MagicMock()
+        self.store.add(Expense("Rent", 1000.0, ExpenseCategory.RENT, self.schedule))
+        self.store.add(Expense("Lunch", 12.5, ExpenseCategory.EATING_OUT, self.schedule))
+        self.store.add(Expense("Lunch", 7.5, ExpenseCategory.EATING_OUT, self.schedule))
+
+    def test_rows_read_back_as_expenses(self):
+        self.assertEqual(len(self.store), 3)
+
+        expense = self.store[1]
+        self.assertIsInstance(expense, Expense)
+        self.assertEqual(expense.name, "Lunch")
+        self.assertEqual(expense.amount, 12.5)
+        self.assertEqual(expense.category, ExpenseCategory.EATING_OUT)
+        self.assertIs(expense.schedule, self.schedule)
+
+        self.assertEqual([e.name for e in self.store], ["Rent", "Lunch", "Lunch"])
+
+    def test_names_are_stored_once(self):
+        self.assertEqual(self.store.names, ["Rent", "Lunch"])
+        self.assertEqual(list(self.store.name_codes), [0, 1, 1])
+
+    def test_total(self):
+        self.assertEqual(self.store.total(), 1020.0)
+
+    def test_by_category(self):
+        categories = self.store.by_category()
+        self.assertEqual(len(categories[ExpenseCategory.RENT]), 1)
+        self.assertEqual([e.amount for e in categories[ExpenseCategory.EATING_OUT]], [12.5, 7.5])
+
+    def test_string_categories_share_codes_with_the_enum(self):
+        self.store.add(Expense("Shop", 20.0, "Groceries", self.schedule))
+        self.store.add(Expense("Gift", 30.0, "Gifts", self.schedule))
+
+        categories = self.store.by_category()
+        self.assertIn(ExpenseCategory.GROCERIES, categories)
+        self.assertIn("Gifts", categories)
+        self.assertEqual(len(self.store.categories), len(ExpenseCategory) + 1)
+
+    def test_too_many_categories(self):
+        for n in range(MAX_CATEGORIES - len(self.store.categories)):
+            self.store.add(Expense("Misc", 1.0, f"Category {n}", self.schedule))
+        rows = len(self.store)
+        with self.assertRaises(ValueError):
+            self.store.add(Expense("One more", 1.0, "One too many", self.schedule))
+        # The rejected expense left no trace in any column
+        self.assertEqual((len(self.store.amounts), len(self.store.category_codes), len(self.store.name_codes),
+                          len(self.store.schedules), len(self.store.categories)), (rows,) * 4 + (MAX_CATEGORIES,))
+        self.assertNotIn("One more", self.store.names)
+        self.store.add(Expense("Existing", 2.0, "Category 0", self.schedule))
+        self.assertEqual(self.store[-1].category, "Category 0")
+
+
+class TestExpenseManagerStores(unittest.TestCase):
+    """Test that the expense manager works the same with every store"""
+
+    def test_default_store_is_a_list(self):
+        self.assertIsInstance(ExpenseManager().expenses, ListExpenseStore)
+
+    def test_columnar_store(self):
+        manager = ExpenseManager(ColumnarExpenseStore())
+        manager.add_expense(Expense("Rent", 1000.0, ExpenseCategory.RENT, None))
+        manager.add_expense(Expense("Shop", 200.0, ExpenseCategory.GROCERIES, None))
+
+        self.assertEqual(manager.total(), 1200.0)
+        self.assertEqual(len(manager.get_by_category()), 2)
+        self.assertTrue("Rent" in '\n'.join(manager.generate_report()))
+
+
+if __name__ == '__main__':
+    unittest.main()
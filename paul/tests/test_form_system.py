@@ -8,7 +8,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from form_system import (
     Form, FormField, InputField, NumericField, SelectField,
     FormValidator, RangeValidator, ChoiceValidator,
-    OutputTransformer, ScheduleTransformer
+    OutputTransformer, ScheduleTransformer, CompiledForm
 )
 
 
@@ -278,6 +278,130 @@ class TestForm(unittest.TestCase):
         self.assertEqual(result.favorite_color, "Red")
 
 
+    def test_optional_empty_field_is_valid(self):
+        self.form.fields[0].value = "John Doe"
+        self.form.fields[1].value = 25
+        self.form.fields[2].value = None
+        
+        self.assertEqual(self.form.validate(), {})
+    
+    def test_form_submit_with_shared_and_dropped_targets(self):
+        class Contact:
+            def __init__(self, name, detail=None):
+                self.name = name
+                self.detail = detail
+        
+        self.form.add_field(InputField("email", required=False))
+        self.form.fields[0].value = "John Doe"
+        self.form.fields[1].value = 25
+        self.form.fields[2].value = None
+        self.form.fields[3].value = "john@example.com"
+        
+        # Age is left out, color and email both feed detail and the one with a value wins
+        self.form.set_output_type(Contact, {"age": None, "color": "detail", "email": "detail"})
+        result = self.form.submit()
+        
+        self.assertEqual(result.name, "John Doe")
+        self.assertEqual(result.detail, "john@example.com")
+
+
+class TestCompiledForm(unittest.TestCase):
+    """Test the compiled form fast path against the regular form"""
+    
+    def setUp(self):
+        class Person:
+            def __init__(self, name, age, color=None):
+                self.name = name
+                self.age = age
+                self.color = color
+        
+        self.form = Form("Test Form")
+        self.form.add_field(InputField("name", "Full Name", True))
+        self.form.add_field(NumericField("age", "Age", True, None, 18, 100))
+        self.form.add_field(SelectField("color", {"r": "Red", "g": "Green", "b": "Blue"}, "Favorite Color", False))
+        self.form.set_output_type(Person)
+        self.compiled = self.form.compile()
+    
+    def check_same_errors(self, record):
+        for field in self.form.fields:
+            field.value = record.get(field.name)
+        self.assertEqual(self.compiled.validate(record), self.form.validate())
+    
+    def test_compile(self):
+        self.assertIsInstance(self.compiled, CompiledForm)
+    
+    def test_validation_matches_form(self):
+        self.check_same_errors({"name": "John", "age": 25, "color": "r"})
+        self.check_same_errors({"name": "", "age": 101, "color": "x"})
+        self.check_same_errors({"name": "John", "age": "abc"})
+        self.check_same_errors({"name": "John", "age": "50", "color": ["r"]})
+        self.check_same_errors({})
+    
+    def test_submit(self):
+        person = self.compiled.submit({"name": "John", "age": 25, "color": "g"})
+        self.assertEqual((person.name, person.age, person.color), ("John", 25, "Green"))
+        
+        with self.assertRaises(ValueError) as context:
+            self.compiled.submit({"name": "John", "age": 5})
+        self.assertEqual(list(context.exception.args[0]), ["age"])
+    
+    def test_submit_does_not_touch_fields(self):
+        self.compiled.submit({"name": "John", "age": 25})
+        self.assertTrue(all(field.value is None for field in self.form.fields))
+    
+    def test_submit_many(self):
+        records = [
+            {"name": "John", "age": 25},
+            {"name": "Jane", "age": 150},
+            {"name": "Jim", "age": 40, "color": "b"},
+        ]
+        results, failures = self.compiled.submit_many(records)
+        
+        self.assertEqual([person.name for person in results], ["John", "Jim"])
+        self.assertEqual(list(failures), [1])
+        self.assertIn("age", failures[1])
+    
+    def test_empty_optional_field_is_not_transformed(self):
+        # An empty answer has no value to hand the transformer, int('') would raise
+        self.form.fields[2].set_output_transformer(int)
+        compiled = self.form.compile()
+        results, failures = compiled.submit_many([{"name": "John", "age": 25, "color": ""}, {"name": "Jim", "age": 40}])
+        self.assertEqual(([person.color for person in results], failures), ([None, None], {}))
+        
+        for field, value in zip(self.form.fields, ["John", 25, ""]):
+            field.value = value
+        self.assertIsNone(self.form.submit().color)
+    
+    def test_custom_validators_still_run(self):
+        class NotJohn(FormValidator):
+            def validate(self, value):
+                return value != "John"
+        
+        self.form.fields[0].add_validator(NotJohn("No Johns"))
+        compiled = self.form.compile()
+        self.assertEqual(compiled.validate({"name": "John", "age": 25}), {"name": ["No Johns"]})
+    
+    def test_required_when(self):
+        # Color is only required when the age is 65
+        self.form.fields[2].set_required_when("age", 65)
+        self.compiled = self.form.compile()
+        self.check_same_errors({"name": "John", "age": 65})
+        self.check_same_errors({"name": "John", "age": 64})
+        self.assertEqual(list(self.compiled.validate({"name": "John", "age": 65})), ["color"])
+        self.assertEqual(self.compiled.validate({"name": "John", "age": 65, "color": "b"}), {})
+    
+    def test_used_when(self):
+        # Color only counts when the age is 65, otherwise it is neither checked nor output
+        self.form.fields[2].set_used_when("age", 65)
+        self.compiled = self.form.compile()
+        self.check_same_errors({"name": "John", "age": 64, "color": "x"})
+        self.check_same_errors({"name": "John", "age": 65, "color": "x"})
+        self.assertEqual(self.compiled.submit({"name": "John", "age": 64, "color": "b"}).color, None)
+        self.assertEqual(self.compiled.submit({"name": "John", "age": 65, "color": "b"}).color, "Blue")
+        self.form.fields[1].value = 64
+        self.assertEqual(self.form.get_data()["color"], None)
+
+
 class TestScheduleTransformer(unittest.TestCase):
     """Test the schedule transformer"""
     
@@ -0,0 +1,147 @@
+import unittest
+import io
+import json
+import os, sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from importer import FormImporter, chunked, decode_json_record, read_csv, read_jsonl
+from form_system import create_expense_form
+from categories import ExpenseCategory
+from expenses import Expense
+from schedules import AnchoredExpenseSchedule, FirstLastWorkingDayMonthlyExpenseSchedule
+
+
+CSV_DATA = """name,amount,category,schedule_type,anchor_day,fl_anchor
+Rent,1000,r,a,1,
+Salary sacrifice,250.5,Utilities,f,,l
+Broken,abc,r,a,1,
+Bad day,10,g,a,31,
+"""
+
+
+class TestChunked(unittest.TestCase):
+    """Test grouping records into chunks"""
+
+    def test_chunked(self):
+        self.assertEqual(list(chunked(range(5), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(chunked([], 2)), [])
+
+
+class TestFormImporter(unittest.TestCase):
+    """Test submitting records to the expense form without prompting"""
+
+    def setUp(self):
+        self.importer = FormImporter(create_expense_form())
+        self.imported = []
+
+    def test_submit_anchored(self):
+        expense = self.importer.submit({"name": "Rent", "amount": "1000", "category": "r",
+                                        "schedule_type": "a", "anchor_day": "1"})
+        self.assertIsInstance(expense, Expense)
+        self.assertEqual(expense.amount, 1000)
+        self.assertEqual(expense.category, ExpenseCategory.RENT)
+        self.assertIsInstance(expense.schedule, AnchoredExpenseSchedule)
+        self.assertEqual(expense.schedule.anchor, 1)
+
+    def test_submit_reports_field_errors(self):
+        with self.assertRaises(ValueError) as context:
+            self.importer.submit({"name": "", "amount": "-5", "category": "x", "schedule_type": "a"})
+        errors = context.exception.args[0]
+        self.assertEqual(set(errors), {"name", "category", "anchor_day"})
+
+    def test_import_csv(self):
+        chunks = chunked(read_csv(io.StringIO(CSV_DATA)), 2)
+        stats = self.importer.import_chunks(chunks, self.imported.extend)
+
+        self.assertEqual(stats.rows, 4)
+        self.assertEqual(stats.imported, 2)
+        self.assertEqual(stats.failed, 2)
+        self.assertEqual([error.row_number for error in stats.errors], [3, 4])
+        self.assertIn("amount", stats.errors[0].errors)
+        self.assertIn("anchor_day", stats.errors[1].errors)
+
+        # Option labels are accepted as well as option keys
+        self.assertEqual(self.imported[1].category, ExpenseCategory.UTILITIES)
+        self.assertIsInstance(self.imported[1].schedule, FirstLastWorkingDayMonthlyExpenseSchedule)
+
+    def test_on_error_callback(self):
+        errors = []
+        chunks = chunked(read_csv(io.StringIO(CSV_DATA)), 10)
+        stats = self.importer.import_chunks(chunks, self.imported.extend, on_error=errors.append)
+
+        self.assertEqual(stats.failed, 2)
+        self.assertEqual(len(errors), 2)
+        self.assertEqual(stats.errors, [])
+
+    def test_import_jsonl_file(self):
+        records = [
+            {"name": "Rent", "amount": 1000, "category": "r", "schedule_type": "a", "anchor_day": 1},
+            {"name": "Gym", "amount": 30, "category": "n", "schedule_type": "f", "fl_anchor": "f"},
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "expenses.jsonl")
+            with open(path, "w") as stream:
+                stream.write("\n".join(json.dumps(record) for record in records))
+
+            stats = self.importer.import_file(path, self.imported.extend, chunk_size=1)
+
+        self.assertEqual(stats.imported, 2)
+        self.assertEqual([e.name for e in self.imported], ["Rent", "Gym"])
+
+    def test_unknown_file_type(self):
+        with self.assertRaises(ValueError):
+            self.importer.import_file("expenses.xlsx", self.imported.extend)
+
+    def test_read_jsonl_skips_blank_lines(self):
+        lines = read_jsonl(io.StringIO('{"a": 1}\n\n{"a": 2}\n'))
+        self.assertEqual([decode_json_record(line) for line in lines], [{"a": 1}, {"a": 2}])
+
+    def test_bad_jsonl_rows_fail_alone(self):
+        lines = [
+            '{"name": "Rent", "amount": 1000, "category": "r", "schedule_type": "a", "anchor_day": 1}',
+            '{"name": "Gym", "amount": 30,',
+            '[1, 2]',
+            '{"name": "Phone", "amount": 20, "category": "u", "schedule_type": "f", "fl_anchor": "l"}',
+        ]
+        stats = self.importer.import_chunks(chunked(read_jsonl(io.StringIO("\n".join(lines))), 10),
+                                            self.imported.extend)
+        self.assertEqual(stats.imported, 2)
+        self.assertEqual([error.row_number for error in stats.errors], [2, 3])
+        self.assertIn("Invalid JSON", stats.errors[0].errors["row"][0])
+        self.assertEqual(stats.errors[1].errors, {"row": ["Expected a JSON object"]})
+
+    def test_selected_schedule_needs_its_field(self):
+        # An anchored schedule without a day, or a working day one without first or last
+        for record in [{"schedule_type": "a", "fl_anchor": "f"}, {"schedule_type": "f", "anchor_day": "5"}]:
+            record.update(name="Rent", amount="1000", category="r")
+            with self.assertRaises(ValueError) as context:
+                self.importer.submit(record)
+            missing = "anchor_day" if record["schedule_type"] == "a" else "fl_anchor"
+            self.assertEqual(list(context.exception.args[0]), [missing])
+
+    def test_schedule_type_picks_the_schedule(self):
+        # A stray answer to the other schedule's question is ignored rather than winning
+        expense = self.importer.submit({"name": "Phone", "amount": "20", "category": "u",
+                                        "schedule_type": "f", "anchor_day": "31", "fl_anchor": "l"})
+        self.assertIsInstance(expense.schedule, FirstLastWorkingDayMonthlyExpenseSchedule)
+        expense = self.importer.submit({"name": "Rent", "amount": "1000", "category": "r",
+                                        "schedule_type": "a", "anchor_day": "1", "fl_anchor": "l"})
+        self.assertIsInstance(expense.schedule, AnchoredExpenseSchedule)
+
+    def test_numbers_that_are_not_finite_fail_their_row(self):
+        rows = "".join(f"Rent,{amount},r,a,1,\n" for amount in ["nan", "inf", "-Infinity", "1e400", "1000"])
+        chunks = chunked(read_csv(io.StringIO("name,amount,category,schedule_type,anchor_day,fl_anchor\n" + rows)), 2)
+        stats = self.importer.import_chunks(chunks, self.imported.extend)
+        self.assertEqual((stats.imported, stats.failed), (1, 4))
+        self.assertTrue(all(list(error.errors) == ["amount"] for error in stats.errors))
+
+        with self.assertRaises(ValueError) as context:
+            self.importer.submit({"name": "Rent", "amount": 10 ** 400, "category": "r",
+                                  "schedule_type": "a", "anchor_day": 1})
+        self.assertEqual(list(context.exception.args[0]), ["amount"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,204 @@
+import unittest
+import os, sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from journal import Journal, JournaledExpenseStore, decode, encode_add, encode_remove, encode_set_amount, read_journal
+from expense_manager import ExpenseManager
+from expense_store import MAX_CATEGORIES
+from categories import ExpenseCategory
+from expenses import Expense
+from schedules import AnchoredExpenseSchedule, FirstLastWorkingDayMonthlyExpenseSchedule
+
+
+def make_expense(i):
+    return Expense(f"Payee {i}", float(i), ExpenseCategory.GROCERIES, AnchoredExpenseSchedule(i % 28 + 1))
+
+
+class TestRecords(unittest.TestCase):
+    """Test encoding journal records"""
+
+    def test_round_trip(self):
+        expense = Expense("Café", 12.5, "Hobbies", FirstLastWorkingDayMonthlyExpenseSchedule("f"))
+        kind, restored = decode(encode_add(expense))
+        self.assertEqual(kind, "add")
+        self.assertEqual((restored.name, restored.amount, restored.category, restored.schedule),
+                         (expense.name, expense.amount, expense.category, expense.schedule))
+        self.assertEqual(decode(encode_remove(7)), ("remove", 7))
+        self.assertEqual(decode(encode_set_amount(3, 9.5)), ("set_amount", 3, 9.5))
+
+
+class TestJournal(unittest.TestCase):
+    """Test appending to a journal and reading it back"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "journal")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_group_commit(self):
+        with Journal(self.path, batch_size=4, max_delay=60) as journal:
+            syncs = journal.syncs
+            for i in range(10):
+                journal.append(encode_remove(i))
+            self.assertEqual(journal.syncs - syncs, 2)
+            self.assertEqual(journal.pending, 2)
+            self.assertEqual(len(read_journal(self.path)[0]), 8)
+        self.assertEqual(read_journal(self.path)[0], [("remove", i) for i in range(10)])
+
+    def test_commit_after_delay(self):
+        with Journal(self.path, batch_size=100, max_delay=0) as journal:
+            journal.append(encode_remove(1))
+            self.assertEqual(journal.pending, 0)
+
+    def test_flusher_commits_a_lone_record(self):
+        # Nothing else is appended, the flusher still syncs the record once max_delay has passed
+        with Journal(self.path, batch_size=100, max_delay=0.01) as journal:
+            journal.append(encode_remove(1))
+            deadline = time.monotonic() + 5
+            while journal.pending and time.monotonic() < deadline:
+                time.sleep(0.005)
+            self.assertEqual(journal.pending, 0)
+            self.assertEqual(read_journal(self.path)[0], [("remove", 1)])
+
+    def test_wait(self):
+        with Journal(self.path, batch_size=100, max_delay=60) as journal:
+            first = journal.append(encode_remove(1))
+            journal.append(encode_remove(2))
+            journal.wait(first)
+            # The whole group went out with the first record
+            self.assertEqual(journal.pending, 0)
+            self.assertEqual(len(read_journal(self.path)[0]), 2)
+
+    def test_concurrent_waiters(self):
+        with Journal(self.path, batch_size=1000, max_delay=60) as journal:
+            def write(offset):
+                for i in range(50):
+                    journal.wait(journal.append(encode_remove(offset + i)))
+
+            threads = [threading.Thread(target=write, args=(offset,)) for offset in range(0, 400, 100)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(journal.pending, 0)
+            self.assertEqual(sorted(op[1] for op in read_journal(self.path)[0]),
+                             [offset + i for offset in range(0, 400, 100) for i in range(50)])
+
+    def test_torn_and_corrupt_records_are_dropped(self):
+        with Journal(self.path) as journal:
+            for i in range(3):
+                journal.append(encode_remove(i))
+        size = os.path.getsize(self.path)
+        with open(self.path, "ab") as f:
+            f.write(b"\x09\x00\x00\x00\x00\x00\x00\x00R\x01")
+
+        journal = Journal(self.path)
+        self.assertEqual(journal.recovered, [("remove", 0), ("remove", 1), ("remove", 2)])
+        journal.close()
+        self.assertEqual(os.path.getsize(self.path), size)
+
+        with open(self.path, "r+b") as f:
+            f.seek(-1, os.SEEK_END)
+            f.write(b"\xff")
+        self.assertEqual(len(read_journal(self.path)[0]), 2)
+
+    def test_not_a_journal(self):
+        with open(self.path, "wb") as f:
+            f.write(b"name,amount\n")
+        with self.assertRaises(ValueError):
+            Journal(self.path)
+
+
+class TestJournaledExpenseStore(unittest.TestCase):
+    """Test that expenses survive reopening the store"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def reopen(self, store, **options):
+        store.close()
+        return JournaledExpenseStore(self.directory.name, **options)
+
+    def test_changes_are_replayed(self):
+        store = JournaledExpenseStore(self.directory.name)
+        manager = ExpenseManager(store)
+        manager.add_expenses(make_expense(i) for i in range(5))
+        manager.add_expense(Expense("Rent", 1000.0, ExpenseCategory.RENT, None))
+        manager.remove_expense(-2)
+        manager.update_amount(0, 50.0)
+
+        store = self.reopen(store)
+        self.assertEqual(store.replayed, 8)
+        self.assertEqual([(e.name, e.amount) for e in store],
+                         [("Payee 0", 50.0), ("Payee 1", 1.0), ("Payee 2", 2.0), ("Payee 3", 3.0), ("Rent", 1000.0)])
+        self.assertEqual(ExpenseManager(store).total(), 1056.0)
+        store.close()
+
+    def test_compaction(self):
+        store = JournaledExpenseStore(self.directory.name, compact_after=10)
+        store.extend(make_expense(i) for i in range(12))
+        self.assertEqual(store.generation, 1)
+        self.assertEqual(store.journal.records, 0)
+        store.pop(0)
+
+        store = self.reopen(store)
+        self.assertEqual(store.replayed, 1)
+        self.assertEqual(len(store), 11)
+        self.assertEqual(sorted(os.listdir(self.directory.name)),
+                         ["expenses.00000001.journal", "expenses.00000001.snapshot"])
+        store.close()
+
+    def test_crash_between_snapshot_and_journal(self):
+        store = JournaledExpenseStore(self.directory.name)
+        store.extend(make_expense(i) for i in range(3))
+        store.compact()
+        store.add(make_expense(3))
+        store.close()
+        os.remove(os.path.join(self.directory.name, "expenses.00000001.journal"))
+
+        store = JournaledExpenseStore(self.directory.name)
+        self.assertEqual(store.generation, 1)
+        self.assertEqual([e.name for e in store], ["Payee 0", "Payee 1", "Payee 2"])
+        store.close()
+
+    def test_durable_changes_are_on_disk_when_they_return(self):
+        with JournaledExpenseStore(self.directory.name, max_delay=60, durable=True) as store:
+            ExpenseManager(store).add_expense(make_expense(1))
+            self.assertEqual(store.journal.pending, 0)
+            self.assertEqual(len(read_journal(store.journal.path)[0]), 1)
+
+    def test_rejected_changes_are_not_journaled(self):
+        # Categories beyond what the store can code are refused, and must not poison the replay
+        store = JournaledExpenseStore(self.directory.name)
+        room = MAX_CATEGORIES - len(store.store.categories)
+        store.extend(Expense(f"Payee {i}", 1.0, f"Category {i}", None) for i in range(room))
+        with self.assertRaises(ValueError):
+            store.add(Expense("One more", 1.0, "One too many", None))
+        with self.assertRaises(ValueError):
+            store.extend([make_expense(1), Expense("One more", 1.0, "One too many", None)])
+        self.assertEqual(len(store), room)
+        store.add(make_expense(2))
+
+        store = self.reopen(store)
+        self.assertEqual(store.replayed, room + 1)
+        self.assertEqual([e.name for e in store][-2:], [f"Payee {room - 1}", "Payee 2"])
+        store.close()
+
+    def test_bad_index(self):
+        with JournaledExpenseStore(self.directory.name) as store:
+            with self.assertRaises(IndexError):
+                store.pop()
+            self.assertEqual(store.journal.records, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import unittest
+from unittest.mock import MagicMock
+import datetime
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from occurrence_index import OccurrenceIndex
+from expense_manager import ExpenseManager
+from expense_store import ColumnarExpenseStore
+from expenses import Expense
+from row_ids import RowIds
+from schedules import AnchoredExpenseSchedule, FirstLastWorkingDayMonthlyExpenseSchedule
+
+
+def day(n):
+    return datetime.date(2025, 1, n)
+
+
+class FixedSchedule:
+    """A schedule that falls due on a fixed set of days within the period asked about"""
+
+    def __init__(self, *days):
+        self.dates = [day(n) for n in days]
+
+    def get_occurences_in_period(self, period):
+        return [date for date in self.dates if period.start < date <= period.end]
+
+
+class TestOccurrenceIndex(unittest.TestCase):
+    """Test the sorted occurrence index"""
+
+    def setUp(self):
+        self.period = MagicMock(start=day(1), end=day(31))
+        self.index = OccurrenceIndex(self.period)
+        self.index.extend([(0, FixedSchedule(5, 20)), (1, FixedSchedule(1, 10, 20))])
+
+    def test_horizon(self):
+        # The first of the month is the period start, which schedules leave out
+        self.assertEqual(len(self.index), 4)
+
+    def test_between(self):
+        self.assertEqual(self.index.between(day(5), day(10)), [(day(5), 0), (day(10), 1)])
+        self.assertEqual(self.index.between(day(20), day(20)), [(day(20), 0), (day(20), 1)])
+        self.assertEqual(self.index.between(day(21), day(31)), [])
+
+    def test_add_keeps_order(self):
+        self.index.add(2, FixedSchedule(7, 25))
+        self.assertEqual(self.index.dates, sorted(self.index.dates))
+        self.assertEqual(self.index.between(day(6), day(8)), [(day(7), 2)])
+
+    def test_remove_shifts_positions(self):
+        self.index.add(2, FixedSchedule(7))
+        self.index.remove(0)
+        self.assertEqual(self.index.between(day(1), day(31)), [(day(7), 1), (day(10), 0), (day(20), 0)])
+
+
+    def test_positions_must_come_in_order(self):
+        with self.assertRaises(ValueError):
+            self.index.add(5, FixedSchedule(7))
+
+    def test_compaction(self):
+        # Removing most expenses compacts the buckets, the positions left stay right
+        index = OccurrenceIndex(self.period)
+        index.extend((position, FixedSchedule(position % 30 + 2)) for position in range(300))
+        for _ in range(200):
+            index.remove(0)
+        # Compacted after the 76th and 141st removals
+        self.assertEqual(len(index.row_ids.dead), 200 - 141)
+        self.assertEqual(len(index), 100)
+        self.assertEqual(index.between(day(2), day(2)), [(day(2), 10), (day(2), 40), (day(2), 70)])
+        self.assertEqual(index.dates, [day(n) for n in range(2, 32)])
+
+
+class TestOccurrenceIndexSchedules(unittest.TestCase):
+    """Test the index with the schedules expenses really have"""
+
+    def setUp(self):
+        self.period = MagicMock(start=datetime.date(2024, 12, 31), end=datetime.date(2025, 3, 31))
+        self.index = OccurrenceIndex(self.period)
+
+    def test_anchored_and_working_days(self):
+        self.index.extend([(0, AnchoredExpenseSchedule(31)), (1, None),
+                           (2, FirstLastWorkingDayMonthlyExpenseSchedule("f"))])
+        self.assertEqual(self.index.between(datetime.date(2025, 1, 1), datetime.date(2025, 3, 31)), [
+            (datetime.date(2025, 1, 1), 2), (datetime.date(2025, 1, 31), 0),
+            (datetime.date(2025, 2, 3), 2), (datetime.date(2025, 3, 3), 2), (datetime.date(2025, 3, 31), 0),
+        ])
+
+    def test_unscheduled_expenses_keep_their_position(self):
+        self.index.extend([(0, None), (1, AnchoredExpenseSchedule(15))])
+        self.index.remove(0)
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.between(datetime.date(2025, 2, 1), datetime.date(2025, 2, 28)),
+                         [(datetime.date(2025, 2, 15), 0)])
+
+
+class TestRowIds(unittest.TestCase):
+    """Test row ids staying put while positions shift"""
+
+    def setUp(self):
+        self.ids = RowIds()
+        self.ids.add(6)
+        self.ids.remove(1)
+        self.ids.remove(2)
+
+    def test_positions(self):
+        # ids 1 and 3 are dead, leaving 0, 2, 4, 5
+        self.assertEqual(len(self.ids), 4)
+        self.assertEqual([self.ids.id_at(position) for position in range(4)], [0, 2, 4, 5])
+        self.assertEqual([self.ids.position(row_id) for row_id in [0, 2, 4, 5]], [0, 1, 2, 3])
+        self.assertEqual(list(self.ids.live_positions([5, 3, 2, 1, 0])), [3, 1, 0])
+        self.assertFalse(self.ids.is_live(3))
+        self.assertFalse(self.ids.is_live(6))
+
+    def test_out_of_range(self):
+        with self.assertRaises(IndexError):
+            self.ids.id_at(4)
+
+    def test_reset(self):
+        self.ids.reset()
+        self.assertEqual((len(self.ids), self.ids.next_id, len(self.ids.dead)), (4, 4, 0))
+
+
+class TestExpenseManagerDueBetween(unittest.TestCase):
+    """Test due date queries through the expense manager"""
+
+    def setUp(self):
+        self.manager = ExpenseManager(ColumnarExpenseStore())
+        self.manager.add_expense(Expense("Rent", 1000.0, "Rent", FixedSchedule(1, 28)))
+        self.manager.add_expense(Expense("Gym", 30.0, "Entertainment", FixedSchedule(15)))
+        self.manager.index_occurrences(MagicMock(start=datetime.date(2024, 12, 31), end=day(31)))
+
+    def names_due(self, start, end):
+        return [(date.day, expense.name) for date, expense in self.manager.due_between(start, end)]
+
+    def test_due_between(self):
+        self.assertEqual(self.names_due(day(1), day(15)), [(1, "Rent"), (15, "Gym")])
+
+    def test_index_follows_changes(self):
+        self.manager.add_expense(Expense("Phone", 20.0, "Utilities", FixedSchedule(10)))
+        self.manager.add_expenses([Expense("Shop", 50.0, "Groceries", FixedSchedule(2, 16))])
+        self.assertEqual(self.names_due(day(2), day(16)), [(2, "Shop"), (10, "Phone"), (15, "Gym"), (16, "Shop")])
+
+        self.manager.remove_expense(0)
+        self.assertEqual(self.names_due(day(1), day(31)), [(2, "Shop"), (10, "Phone"), (15, "Gym"), (16, "Shop")])
+
+    def test_needs_an_index(self):
+        with self.assertRaises(ValueError):
+            ExpenseManager().due_between(day(1), day(2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import datetime
+import os, sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from parallel_forecast import parallel_forecast, row_columns, sum_rows
+from expense_store import ColumnarExpenseStore, ListExpenseStore
+from journal import JournaledExpenseStore
+from snapshot_store import SnapshotExpenseStore, write_snapshot
+from categories import ExpenseCategory
+from expenses import Expense
+from schedules import AnchoredExpenseSchedule, FirstLastWorkingDayMonthlyExpenseSchedule
+import repo_root  # noqa: F401
+from forecast import forecast
+from period import Period
+
+PERIOD = Period(datetime.date(2025, 1, 1), end=datetime.date(2026, 1, 1))
+
+
+def make_expenses():
+    expenses = [
+        Expense("Rent", 1000.0, ExpenseCategory.RENT, AnchoredExpenseSchedule(1)),
+        Expense("Shop", 200.0, ExpenseCategory.GROCERIES, FirstLastWorkingDayMonthlyExpenseSchedule("l")),
+        Expense("Café", 25.0, "Hobbies", None),
+        Expense("Snack", 0.1, "Hobbies", AnchoredExpenseSchedule(15)),
+    ]
+    return [Expense(f"{expense.name} {i}", expense.amount + i, expense.category, expense.schedule)
+            for i in range(25) for expense in expenses]
+
+
+class TestParallelForecast(unittest.TestCase):
+    """Test forecasting column stores in worker processes against forecast()"""
+
+    def setUp(self):
+        self.store = ColumnarExpenseStore()
+        self.store.extend(make_expenses())
+        self.expected = forecast(list(self.store), PERIOD, "M")
+
+    def test_sum_rows(self):
+        columns, categories = row_columns(self.store)
+        totals = sum_rows(*(memoryview(column)[:4].tobytes() for column in columns))
+        self.assertEqual(totals, {(1, 1, categories.index(ExpenseCategory.RENT)): 100000,
+                                  (2, ord("l"), categories.index(ExpenseCategory.GROCERIES)): 20000,
+                                  (0, 0, categories.index("Hobbies")): 2500,
+                                  (1, 15, categories.index("Hobbies")): 10})
+
+    def test_columnar_store(self):
+        for workers in [1, 3]:
+            result = parallel_forecast(self.store, PERIOD, "M", workers)
+            self.assertEqual(result.buckets, self.expected.buckets)
+            self.assertEqual(result.cents, self.expected.cents)
+
+    def test_snapshot_and_journaled_stores(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "expenses.snapshot")
+            write_snapshot(path, self.store)
+            with SnapshotExpenseStore(path) as snapshot:
+                self.assertEqual(parallel_forecast(snapshot, PERIOD, "M", 2).cents, self.expected.cents)
+
+            with JournaledExpenseStore(os.path.join(directory, "journaled")) as journaled:
+                journaled.extend(make_expenses())
+                self.assertEqual(parallel_forecast(journaled, PERIOD, "M", 2).cents, self.expected.cents)
+
+    def test_empty_store(self):
+        result = parallel_forecast(ColumnarExpenseStore(), PERIOD, "W", 2)
+        self.assertEqual((len(result.buckets), result.cents), (len(PERIOD.make_period_list("W")), {}))
+
+    def test_needs_a_column_store(self):
+        with self.assertRaises(ValueError):
+            parallel_forecast(ListExpenseStore(make_expenses()), PERIOD, "M")
+
+
+if __name__ == '__main__':
+    unittest.main()
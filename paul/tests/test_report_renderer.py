@@ -0,0 +1,40 @@
+import unittest
+import io
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from expense_store import ColumnarExpenseStore
+from expense_manager import ExpenseManager
+from expenses import Expense
+
+
+class TestExpenseManagerReport(unittest.TestCase):
+    """Test the expense manager report goes through the renderer"""
+
+    def test_write_report(self):
+        manager = ExpenseManager()
+        manager.add_expense(Expense("Rent", 1000.0, "Rent", None))
+
+        stream = io.StringIO()
+        written = manager.write_report(stream)
+
+        self.assertEqual(stream.getvalue().splitlines(), manager.generate_report())
+        self.assertEqual(written, 7)
+        self.assertTrue(manager.generate_report()[-1].endswith("1000.00"))
+
+    def test_widths_from_the_store_columns(self):
+        manager = ExpenseManager(ColumnarExpenseStore())
+        manager.add_expense(Expense("A rather long payee name", 5.0, "Rent", None))
+        manager.add_expense(Expense("Shop", -123456.78, "Groceries", None))
+        widths = manager.report_widths()
+        self.assertEqual(widths, manager.report_renderer().measure(manager.expenses))
+        self.assertEqual(len({len(line) for line in manager.generate_report()[1:]}), 1)
+
+    def test_no_widths_without_columns(self):
+        self.assertIsNone(ExpenseManager().report_widths())
+        self.assertIsNone(ExpenseManager(ColumnarExpenseStore()).report_widths())
+
+
+if __name__ == '__main__':
+    unittest.main()
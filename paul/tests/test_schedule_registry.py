@@ -0,0 +1,59 @@
+import unittest
+import datetime
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from schedules import AnchoredExpenseSchedule, FirstLastWorkingDayMonthlyExpenseSchedule
+from form_system import create_expense_form
+import repo_root
+import business_calendar
+import schedule_registry
+from period import Period
+
+
+class TestScheduleEquality(unittest.TestCase):
+    """Test that schedules compare by type and parameters"""
+
+    def test_equal_schedules(self):
+        self.assertEqual(AnchoredExpenseSchedule(1), AnchoredExpenseSchedule(1))
+        self.assertEqual(hash(AnchoredExpenseSchedule(1)), hash(AnchoredExpenseSchedule(1)))
+        self.assertNotEqual(AnchoredExpenseSchedule(1), AnchoredExpenseSchedule(2))
+        self.assertNotEqual(AnchoredExpenseSchedule(1), FirstLastWorkingDayMonthlyExpenseSchedule(1))
+
+    def test_working_day_schedules_keep_their_calendar(self):
+        # A new default calendar gives new schedules a new key, cached dates of the old one aren't reused
+        period = Period(datetime.date(2025, 12, 1), end=datetime.date(2026, 1, 31))
+        before = FirstLastWorkingDayMonthlyExpenseSchedule("f")
+        self.assertEqual(schedule_registry.registry.get_occurences(before, period), (datetime.date(2026, 1, 1),))
+
+        default = business_calendar.get_default_calendar()
+        business_calendar.set_default_calendar(business_calendar.BusinessCalendar(holidays=[datetime.date(2026, 1, 1)]))
+        try:
+            after = FirstLastWorkingDayMonthlyExpenseSchedule("f")
+            self.assertNotEqual(before, after)
+            self.assertEqual(schedule_registry.registry.get_occurences(after, period), (datetime.date(2026, 1, 2),))
+            self.assertEqual(schedule_registry.registry.get_occurences(before, period), (datetime.date(2026, 1, 1),))
+        finally:
+            business_calendar.set_default_calendar(default)
+
+
+class TestExpenseFormInterning(unittest.TestCase):
+    """Test that the expense form shares one schedule between equal expenses"""
+
+    def test_form_interns_schedules(self):
+        form = create_expense_form()
+        compiled = form.compile()
+        record = {"name": "Rent", "amount": "1000", "category": "r", "schedule_type": "a", "anchor_day": "1"}
+        first = compiled.submit(record)
+        second = compiled.submit(dict(record, name="Parking"))
+        self.assertIs(first.schedule, second.schedule)
+        self.assertIs(schedule_registry.registry.intern(AnchoredExpenseSchedule(1)), first.schedule)
+
+    def test_registry_is_the_root_one(self):
+        # one registry module for both trees, so one cache and one set of statistics
+        self.assertEqual(os.path.dirname(os.path.abspath(schedule_registry.__file__)), repo_root.ROOT)
+
+
+if __name__ == '__main__':
+    unittest.main()
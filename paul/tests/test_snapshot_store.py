@@ -0,0 +1,174 @@
+import unittest
+import os, sys
+import tempfile
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from form_system import create_expense_form
+from snapshot_store import HEADER, SnapshotExpenseStore, decode_schedule, encode_schedule, write_snapshot
+from expense_manager import ExpenseManager
+from expense_store import ColumnarExpenseStore
+from categories import ExpenseCategory
+from expenses import Expense
+from schedules import AnchoredExpenseSchedule, FirstLastWorkingDayMonthlyExpenseSchedule
+
+
+def make_expenses():
+    return [
+        Expense("Rent", 1000.0, ExpenseCategory.RENT, AnchoredExpenseSchedule(1)),
+        Expense("Shop", 200.0, ExpenseCategory.GROCERIES, FirstLastWorkingDayMonthlyExpenseSchedule("l")),
+        Expense("Café", 25.0, "Hobbies", None),
+        Expense("Shop", 50.0, ExpenseCategory.GROCERIES, FirstLastWorkingDayMonthlyExpenseSchedule("l")),
+    ]
+
+
+class TestScheduleDescriptors(unittest.TestCase):
+    """Test turning schedules into fixed width descriptors and back"""
+
+    def test_round_trip(self):
+        for schedule in [AnchoredExpenseSchedule(15), FirstLastWorkingDayMonthlyExpenseSchedule("f"), None]:
+            self.assertEqual(decode_schedule(*encode_schedule(schedule)), schedule)
+
+    def test_unknown_schedule(self):
+        with self.assertRaises(ValueError):
+            encode_schedule(object())
+
+    def test_anchors(self):
+        self.assertEqual(encode_schedule(AnchoredExpenseSchedule(5.0)), (1, 5))
+        for schedule in [AnchoredExpenseSchedule(5.5), AnchoredExpenseSchedule("5"),
+                         FirstLastWorkingDayMonthlyExpenseSchedule("Last Working Day")]:
+            with self.assertRaises(ValueError):
+                encode_schedule(schedule)
+
+    def test_form_expenses_round_trip(self):
+        # The form hands its transformers option labels, the schedules still get f/l anchors
+        form = create_expense_form().compile()
+        expenses = [form.submit({"name": "Shop", "amount": 20, "category": "g", "schedule_type": "f",
+                                 "fl_anchor": anchor}) for anchor in "fl"]
+        expenses.append(form.submit({"name": "Rent", "amount": 900, "category": "r", "schedule_type": "a",
+                                     "anchor_day": 3}))
+        self.assertEqual([expense.schedule.anchor for expense in expenses], ["f", "l", 3])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "expenses.snapshot")
+            write_snapshot(path, expenses)
+            store = SnapshotExpenseStore(path)
+            self.assertEqual([expense.schedule for expense in store], [expense.schedule for expense in expenses])
+            store.close()
+
+
+class TestSnapshotExpenseStore(unittest.TestCase):
+    """Test writing snapshots and mapping them back in"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "expenses.snapshot")
+        self.assertEqual(write_snapshot(self.path, make_expenses()), 4)
+        self.store = SnapshotExpenseStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_rows_read_back_as_expenses(self):
+        self.assertEqual(len(self.store), 4)
+        expense = self.store[1]
+        self.assertEqual(expense.name, "Shop")
+        self.assertEqual(expense.amount, 200.0)
+        self.assertIs(expense.category, ExpenseCategory.GROCERIES)
+        self.assertEqual(expense.schedule, FirstLastWorkingDayMonthlyExpenseSchedule("l"))
+        self.assertEqual(self.store[-2].category, "Hobbies")
+        self.assertEqual([e.name for e in self.store], ["Rent", "Shop", "Café", "Shop"])
+        self.assertEqual(self.store.names, ["Rent", "Shop", "Café"])
+
+    def test_totals_over_the_mapped_columns(self):
+        self.assertEqual(self.store.total(), 1275.0)
+        self.assertEqual(self.store.category_totals(),
+                         {ExpenseCategory.RENT: 1000.0, ExpenseCategory.GROCERIES: 250.0, "Hobbies": 25.0})
+        self.assertEqual([e.amount for e in self.store.by_category()[ExpenseCategory.GROCERIES]], [200.0, 50.0])
+
+    def test_read_only(self):
+        with self.assertRaises(TypeError):
+            self.store.add(make_expenses()[0])
+        with self.assertRaises(TypeError):
+            self.store.set_amount(0, 1.0)
+
+    def test_to_columnar(self):
+        store = self.store.to_columnar()
+        self.assertIsInstance(store, ColumnarExpenseStore)
+        self.assertEqual([(e.name, e.amount, e.category) for e in store],
+                         [(e.name, e.amount, e.category) for e in make_expenses()])
+        store.add(Expense("Café", 5.0, "Hobbies", None))
+        self.assertEqual(store.names, ["Rent", "Shop", "Café"])
+        self.assertEqual(store.category_codes[-1], store.category_codes[2])
+
+    def test_columnar_store_round_trip(self):
+        store = ColumnarExpenseStore()
+        store.extend(make_expenses())
+        path = os.path.join(self.directory.name, "columnar.snapshot")
+        write_snapshot(path, store)
+        with SnapshotExpenseStore(path) as copy:
+            self.assertEqual([(e.name, e.amount, e.category, e.schedule) for e in copy],
+                             [(e.name, e.amount, e.category, e.schedule) for e in make_expenses()])
+
+    def test_manager_over_a_snapshot(self):
+        manager = ExpenseManager(self.store)
+        self.assertEqual(manager.total(), 1275.0)
+        self.assertEqual(manager.aggregates.for_category(ExpenseCategory.GROCERIES).count, 2)
+        self.assertEqual(len(manager.get_by_category()), 3)
+
+        path = os.path.join(self.directory.name, "saved.snapshot")
+        manager.save_snapshot(path)
+        with SnapshotExpenseStore(path) as reopened:
+            self.assertEqual(reopened.total(), 1275.0)
+
+    def test_empty_snapshot(self):
+        path = os.path.join(self.directory.name, "empty.snapshot")
+        write_snapshot(path, [])
+        with SnapshotExpenseStore(path) as store:
+            self.assertEqual(len(store), 0)
+            self.assertEqual(store.total(), 0)
+            self.assertEqual(store.by_category(), {})
+
+    def test_too_many_categories(self):
+        # Checked before the file is touched, the snapshot from setUp is still there
+        expenses = [Expense("Misc", 1.0, f"Category {n}", None) for n in range(256)]
+        with self.assertRaises(ValueError):
+            write_snapshot(self.path, expenses)
+        with SnapshotExpenseStore(self.path) as store:
+            self.assertEqual(len(store), 4)
+
+    def test_not_a_snapshot(self):
+        path = os.path.join(self.directory.name, "other")
+        with open(path, "wb") as f:
+            f.write(b"name,amount\n" * 20)
+        with self.assertRaises(ValueError):
+            SnapshotExpenseStore(path)
+
+
+    def test_damaged_snapshots_are_closed(self):
+        with open(self.path, "rb") as f:
+            data = f.read()
+        header = list(HEADER.unpack_from(data))
+        # the name text section moved past the end, the file cut short, and nothing at all
+        header[-1] = len(data)
+        damaged = [HEADER.pack(*header) + data[HEADER.size:], data[:len(data) // 2], b""]
+
+        real_open = open
+        opened = []
+
+        def recording_open(*args, **kwargs):
+            opened.append(real_open(*args, **kwargs))
+            return opened[-1]
+
+        for contents in damaged:
+            path = os.path.join(self.directory.name, "damaged.snapshot")
+            with real_open(path, "wb") as f:
+                f.write(contents)
+            with patch("builtins.open", recording_open), self.assertRaises(ValueError):
+                SnapshotExpenseStore(path)
+            self.assertTrue(opened[-1].closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
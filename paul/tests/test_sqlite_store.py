@@ -0,0 +1,97 @@
+import unittest
+import os, sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlite_store import SQLiteExpenseStore, serialize_schedule, deserialize_schedule
+from expense_manager import ExpenseManager
+from categories import ExpenseCategory
+from expenses import Expense
+from schedules import AnchoredExpenseSchedule, FirstLastWorkingDayMonthlyExpenseSchedule
+
+
+class TestScheduleSerialization(unittest.TestCase):
+    """Test turning schedules into columns and back"""
+
+    def test_round_trip(self):
+        for schedule in [AnchoredExpenseSchedule(15), FirstLastWorkingDayMonthlyExpenseSchedule("l")]:
+            restored = deserialize_schedule(*serialize_schedule(schedule))
+            self.assertIsInstance(restored, type(schedule))
+            self.assertEqual(restored.anchor, schedule.anchor)
+
+    def test_no_schedule(self):
+        self.assertEqual(serialize_schedule(None), (None, None))
+        self.assertIsNone(deserialize_schedule(None, None))
+
+    def test_unknown_schedule(self):
+        with self.assertRaises(ValueError):
+            serialize_schedule(object())
+
+
+class TestSQLiteExpenseStore(unittest.TestCase):
+    """Test the SQLite backed expense store"""
+
+    def setUp(self):
+        self.store = SQLiteExpenseStore()
+        self.store.add(Expense("Rent", 1000.0, ExpenseCategory.RENT, AnchoredExpenseSchedule(1)))
+        self.store.extend([
+            Expense("Shop", 200.0, ExpenseCategory.GROCERIES, FirstLastWorkingDayMonthlyExpenseSchedule("f")),
+            Expense("Cinema", 25.0, ExpenseCategory.ENTERTAINMENT, None),
+        ])
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_rows_read_back_as_expenses(self):
+        self.assertEqual(len(self.store), 3)
+        expense = self.store[1]
+        self.assertEqual(expense.name, "Shop")
+        self.assertEqual(expense.amount, 200.0)
+        self.assertIs(expense.category, ExpenseCategory.GROCERIES)
+        self.assertEqual(expense.schedule.anchor, "f")
+        self.assertEqual([e.name for e in self.store], ["Rent", "Shop", "Cinema"])
+
+    def test_total_and_by_category(self):
+        self.assertEqual(self.store.total(), 1225.0)
+        self.assertEqual(len(self.store.by_category()[ExpenseCategory.RENT]), 1)
+
+    def test_pop_and_set_amount(self):
+        self.store.set_amount(0, 900.0)
+        removed = self.store.pop(1)
+
+        self.assertEqual(removed.name, "Shop")
+        self.assertEqual([e.amount for e in self.store], [900.0, 25.0])
+
+    def test_empty_total(self):
+        with SQLiteExpenseStore() as store:
+            self.assertEqual(store.total(), 0)
+
+
+class TestSQLitePersistence(unittest.TestCase):
+    """Test that expenses survive reopening the database"""
+
+    def test_reopen(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "expenses.db")
+
+            manager = ExpenseManager(SQLiteExpenseStore(path))
+            manager.add_expenses([
+                Expense("Rent", 1000.0, ExpenseCategory.RENT, AnchoredExpenseSchedule(1)),
+                Expense("Shop", 200.0, ExpenseCategory.GROCERIES, None),
+            ])
+            manager.remove_expense(1)
+            manager.expenses.close()
+
+            reopened = ExpenseManager(SQLiteExpenseStore(path))
+            self.assertEqual(reopened.total(), 1000.0)
+            self.assertEqual(reopened.expenses[0].schedule.anchor, 1)
+
+            # New rows carry on after the existing ids
+            reopened.add_expense(Expense("Shop", 50.0, ExpenseCategory.GROCERIES, None))
+            self.assertEqual([e.name for e in reopened.expenses], ["Rent", "Shop"])
+            reopened.expenses.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
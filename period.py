@@ -1,38 +1,30 @@
+import calendar
 import datetime
 
+from business_calendar import get_default_calendar
 
-def month_cycle(start, n):
-    months = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]
-    # fixme: not sure about subtracting 1 from start for new index.
-    new_index = ((start - 1) + n) % 12
-    return months[new_index]
+
+DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def days_in_month(year: int, month: int) -> int:
+    if month == 2 and calendar.isleap(year):
+        return 29
+    return DAYS_IN_MONTH[month - 1]
 
 
 def increment_date_by_months(date: datetime.date, increment: int) -> datetime.date:
-    new_month = month_cycle(date.month, increment)
-
-    # check if we are moving years
-    if (date.month + increment) >= 13:
-        # FIXME: subtracting 1 below seems to fix additions of years, not sure why though
-        yrs = (date.month + increment - 1) // 12
-    else:
-        yrs = 0
-
-    try:
-        new_date = date.replace(month=new_month, year=yrs + date.year)
-        last_day_error = False
-    except ValueError as e:
-        # go to last day of next month and then subtract one day
-        new_date = (
-            datetime.datetime(year=date.year + yrs, month=new_month + 1, day=1)
-            - datetime.timedelta(days=1)
-        ).date()
-        last_day_error = True
-
-    print(
-        f"Start Date: {date}, New Date: {new_date}, Increment: {increment}. {'last day error' if last_day_error else ''}"
-    )
-    return new_date
+    """moves a date by a number of months, forwards or backwards
+
+    the day of the month is kept where the new month has it, otherwise the date is
+    clamped to the last day of the new month: jan 31 + 1 month is feb 28 (29 in a leap year)
+    """
+    year, month = divmod(date.year * 12 + date.month - 1 + increment, 12)
+    month += 1
+    day = date.day
+    if day > 28:
+        day = min(day, days_in_month(year, month))
+    return datetime.date(year, month, day)
 
 
 def is_weekday(date: datetime.date) -> bool:
@@ -43,25 +35,26 @@ def is_weekday(date: datetime.date) -> bool:
 
 def last_working_day(date: datetime.date) -> datetime.date:
     """finds the last working day of the month for the month of the given date"""
-    day_to_check = increment_date_by_months(date, 1).replace(
-        day=1
-    ) - datetime.timedelta(days=1)
+    return get_default_calendar().last_working_day(date.year, date.month)
 
-    while True:
-        if is_weekday(day_to_check):
-            break
-        day_to_check = day_to_check - datetime.timedelta(days=1)
 
-    return day_to_check
+def first_working_day(date: datetime.date) -> datetime.date:
+    """finds the first working day of the month for the month of the given date"""
+    return get_default_calendar().first_working_day(date.year, date.month)
 
 
-def first_working_day(date: datetime.date) -> datetime.date:
-    day_to_check = date.replace(day=1)
+def iter_months(start: datetime.date, end: datetime.date = None):
+    """yields (year, month) for every calendar month touched between start and end
 
-    while True:
-        if is_weekday(day_to_check):
-            break
-        day_to_check = day_to_check + datetime.timedelta(days=1)
+    without an end date the months keep coming up to the last month datetime can hold
+    """
+    year, month = start.year, start.month
+    while (end is None or (year, month) <= (end.year, end.month)) and year <= datetime.MAXYEAR:
+        yield year, month
+        month += 1
+        if month == 13:
+            year += 1
+            month = 1
 
 
 def increment_date_by_weeks(date: datetime.date, weeks: int) -> datetime.date:
@@ -77,11 +70,11 @@ class Period:
         number: int = None,
     ):
         self.start = start
+        self.interval = interval
+        self.number = number
         if end:
             self.end = end
         elif interval and number:
-            self.interval = interval
-            self.number = number
             self.end = self._get_period_end()
         else:
             raise Exception("Either end date OR interval AND number to be provided")
@@ -96,48 +89,56 @@ class Period:
                 raise NotImplementedError("Interval not recognized.")
         return end
 
-    def make_period_list(self):
-        match self.interval:
+    def iter_intervals(self, interval: str = None):
+        """yields the (start, end) pairs of make_period_list one at a time
+
+        each boundary is the previous one moved by a single interval, so a month end clamp
+        carries forward: jan 31, feb 29, mar 29, ...
+        """
+        match interval or self.interval:
             case "M":
-                incrementor = increment_date_by_months
+                monthly = True
             case "W":
-                incrementor = increment_date_by_weeks
+                monthly = False
             case _:
                 raise NotImplementedError("No valid incrementor defined")
 
-        plist = []
+        week = datetime.timedelta(days=7)
+        one_day = datetime.timedelta(days=1)
         start = self.start
-        end = None
+        year, month, day = start.year, start.month, start.day
         while True:
-            end = incrementor(start, 1)
+            if monthly:
+                month += 1
+                if month == 13:
+                    year += 1
+                    month = 1
+                if day > 28:
+                    day = min(day, days_in_month(year, month))
+                end = datetime.date(year, month, day)
+            else:
+                end = start + week
+
             if end <= self.end:
-                plist.append((start, end - datetime.timedelta(days=1)))
+                yield start, end - one_day
                 start = end
-                end = None
             else:
-                if start >= self.end:
-                    break
-                plist.append((start, self.end - datetime.timedelat(days=1)))
-                break
+                if start < self.end:
+                    yield start, self.end - one_day
+                return
 
-        return plist
+    def make_period_list(self, interval: str = None):
+        """splits the period into (start, end) pairs of one interval each, the last one may be shorter"""
+        return list(self.iter_intervals(interval))
 
     def days_in_period(self):
         return (self.end - self.start).days
 
+    def iter_months_in_period(self):
+        """yields the first day of every month the period touches, always including the first one"""
+        for year, month in iter_months(self.start, max(self.start, self.end)):
+            yield datetime.date(year, month, 1)
+
     def months_in_period(self):
         """returns the unique months in a period"""
-        mip = []
-        month = self.start.replace(day=1)
-
-        while True:
-            if month in mip:
-                continue
-            mip.append(month)
-            nm = increment_date_by_months(month, 1)
-
-            if nm > self.end:
-                break
-            month = nm
-
-        return mip
+        return list(self.iter_months_in_period())
@@ -0,0 +1,105 @@
+from itertools import chain, islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional, TextIO
+
+
+class Column:
+    """One column of a report: a header and how to get and format its value from a row"""
+
+    def __init__(self, header: str, value: Callable[[Any], Any], align: str = "<",
+                 format_spec: str = "", min_width: int = 0):
+        self.header = header
+        self.value = value
+        self.align = align
+        self.format_spec = format_spec
+        self.min_width = max(min_width, len(header))
+
+
+class ReportRenderer:
+    """Renders rows into report lines lazily and writes them to a text stream in chunks
+
+    Unless the widths are given, they are measured on the first page of rows
+    (the first sample_rows rows when there are no pages) as it is rendered, so
+    the rows are only gone through once and can come from a generator. A later
+    row wider than that still shows in full but pushes its own line out of
+    line. Nothing but the current chunk of lines and the first page is held
+    in memory.
+    """
+
+    def __init__(self, columns: List[Column], title: Optional[str] = None,
+                 total_label: str = "Total", page_size: Optional[int] = None,
+                 sample_rows: int = 1000):
+        self.columns = columns
+        self.title = title
+        self.total_label = total_label
+        self.page_size = page_size
+        self.sample_rows = sample_rows
+
+    def measure(self, rows: Iterable[Any]) -> List[int]:
+        """Find the width of every column in a single pass over the rows"""
+        widths = [column.min_width for column in self.columns]
+        cells = list(enumerate((column.value, column.format_spec) for column in self.columns))
+        for row in rows:
+            for i, (value, format_spec) in cells:
+                width = len(format(value(row), format_spec))
+                if width > widths[i]:
+                    widths[i] = width
+        return widths
+
+    def lines(self, rows: Iterable[Any], total: Any = None, widths: List[int] = None) -> Iterator[str]:
+        """Yield the report one line at a time"""
+        if widths is None:
+            rows = iter(rows)
+            first = list(islice(rows, self.page_size or self.sample_rows))
+            widths = self.measure(first)
+            rows = chain(first, rows)
+        widths = list(widths)
+        if total is not None:
+            widths[-1] = max(widths[-1], len(format(total, self.columns[-1].format_spec)))
+        header = " ".join(
+            f"{column.header:{column.align}{width}}" for column, width in zip(self.columns, widths)
+        )
+        separator = "-" * len(header)
+        # One format string for a whole row rather than formatting cell by cell
+        template = " ".join(
+            f"{{{i}:{column.align}{width}{column.format_spec}}}"
+            for i, (column, width) in enumerate(zip(self.columns, widths))
+        ).format
+        values = [column.value for column in self.columns]
+
+        if self.title:
+            yield self.title
+            yield "=" * len(header)
+        yield header
+        yield separator
+
+        on_page = 0
+        for row in rows:
+            if self.page_size and on_page == self.page_size:
+                yield ""
+                yield header
+                yield separator
+                on_page = 0
+            yield template(*[value(row) for value in values])
+            on_page += 1
+
+        if total is not None:
+            # The total sits under the last column with its label spanning the rest
+            label_width = max(len(header) - widths[-1] - 1, len(self.total_label))
+            yield separator
+            yield f"{self.total_label:<{label_width}} {format(total, self.columns[-1].format_spec):>{widths[-1]}}"
+
+    def write(self, rows: Iterable[Any], stream: TextIO, total: Any = None,
+              widths: List[int] = None, chunk_lines: int = 1000) -> int:
+        """Write the report to a stream, chunk_lines at a time, and return the number of lines"""
+        written = 0
+        chunk = []
+        for line in self.lines(rows, total, widths):
+            chunk.append(line)
+            if len(chunk) == chunk_lines:
+                stream.write("\n".join(chunk) + "\n")
+                written += len(chunk)
+                chunk = []
+        if chunk:
+            stream.write("\n".join(chunk) + "\n")
+            written += len(chunk)
+        return written
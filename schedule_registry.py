@@ -0,0 +1,151 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Set, Tuple
+import datetime
+import threading
+
+from instrumentation import metrics
+
+DEFAULT_MAX_ENTRIES = 4096
+
+
+def schedule_key(schedule: Any) -> Hashable:
+    """Key a schedule on its value if it has parameters, otherwise on the schedule itself
+
+    The value is read on every call, so a schedule that has been changed gets a
+    new key and can never be handed the expansion of what it used to be.
+    """
+    parameters = getattr(schedule, "parameters", None)
+    if parameters is None:
+        return schedule
+    return type(schedule), parameters()
+
+
+class OccurrenceCache:
+    """Expansions of schedules over periods, least recently used first out
+
+    Entries are keyed on (schedule key, period.start, period.end) and hold the
+    occurrences as a tuple, since they are shared between callers. Schedules
+    keyed by value need no invalidation when they change; their old entries are
+    simply never asked for again and age out. Schedules keyed by identity have to
+    be dropped with invalidate after they change.
+
+    It is safe to share between threads. A lock guards the entries, while
+    expanding a schedule on a miss happens outside it.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, got {max_entries}")
+        # can be changed at any time, the cache shrinks on the next miss
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        # the periods cached for every schedule key, so invalidate needs no scan
+        self._periods: Dict[Hashable, Set[Tuple[datetime.date, datetime.date]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, schedule: Any, period: Any) -> Tuple[datetime.date, ...]:
+        """Get the occurrences of the schedule in the period, expanding it on a miss"""
+        key = schedule_key(schedule)
+        entry = (key, period.start, period.end)
+        with self._lock:
+            occurences = self._entries.get(entry)
+            if occurences is not None:
+                self._entries.move_to_end(entry)
+                self.hits += 1
+                return occurences
+            self.misses += 1
+
+        occurences = tuple(schedule.get_occurences_in_period(period))
+        with self._lock:
+            # another thread may have expanded it meanwhile, either expansion will do
+            self._entries[entry] = occurences
+            self._periods.setdefault(key, set()).add((period.start, period.end))
+            while len(self._entries) > self.max_entries:
+                (old_key, start, end), _ = self._entries.popitem(last=False)
+                self._forget(old_key, start, end)
+                self.evictions += 1
+        return occurences
+
+    def _forget(self, key: Hashable, start: datetime.date, end: datetime.date):
+        periods = self._periods[key]
+        periods.discard((start, end))
+        if not periods:
+            del self._periods[key]
+
+    def invalidate(self, schedule: Any) -> int:
+        """Drop every cached expansion of the schedule, returns how many were dropped"""
+        key = schedule_key(schedule)
+        with self._lock:
+            periods = self._periods.pop(key, ())
+            for start, end in periods:
+                del self._entries[key, start, end]
+        return len(periods)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._periods.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+class ScheduleRegistry:
+    """Interns equal schedules and shares their expansions
+
+    Schedules compare and hash by type and parameters, so every "anchored on
+    the 1st" is equal to every other. intern hands back one canonical instance
+    for each of them, and get_occurences expands a (schedule, period) pair once
+    no matter how many expenses use that schedule, keeping the most recently
+    used expansions in a bounded cache.
+    """
+
+    def __init__(self, max_occurences: int = DEFAULT_MAX_ENTRIES):
+        self._schedules: Dict[Hashable, Any] = {}
+        self.occurences = OccurrenceCache(max_occurences)
+
+    def __len__(self) -> int:
+        return len(self._schedules)
+
+    def __contains__(self, schedule: Any) -> bool:
+        return schedule in self._schedules
+
+    def intern(self, schedule: Any) -> Any:
+        """Get the registered schedule equal to this one, registering it if there is none"""
+        return self._schedules.setdefault(schedule, schedule)
+
+    def get_occurences(self, schedule: Any, period: Any) -> Tuple[datetime.date, ...]:
+        """Get the occurrences of the schedule in the period, expanding it on first use"""
+        return self.occurences.get(schedule, period)
+
+    def invalidate(self, schedule: Any) -> int:
+        """Drop the cached expansions of a schedule that has been changed in place"""
+        return self.occurences.invalidate(schedule)
+
+    def clear(self):
+        self._schedules.clear()
+        self.occurences.clear()
+
+
+registry = ScheduleRegistry()
+
+# every user of the shared registry, root or paul, counts towards the same statistics
+metrics.add_source("occurrence_cache", registry.occurences.stats)
+
+
+def intern_schedule(schedule: Any) -> Any:
+    """Get the canonical instance of a schedule from the shared registry"""
+    return registry.intern(schedule)
@@ -1,12 +1,66 @@
 from abc import ABC, abstractmethod
 import datetime
-from period import Period, last_working_day, first_working_day
+import logging
+import time
+from typing import Iterator
+from business_calendar import BusinessCalendar, get_default_calendar
+from instrumentation import metrics
+from period import Period, days_in_month, iter_months
+
+logger = logging.getLogger(__name__)
 
 
 class ExpenseSchedule(ABC):
+    # subclasses list their parameters in __slots__ so instances carry no __dict__.
+    # schedules with the same type and parameters are equal and hash alike, which
+    # lets one instance stand in for all of them, so treat them as immutable
+    __slots__ = ()
+
     @abstractmethod
+    def iter_occurences(self, after: datetime.date) -> Iterator[datetime.date]:
+        """yields every occurence after the given date in order, up to the last date datetime can hold"""
+
     def get_occurences_in_period(self, period: Period) -> list[datetime.date]:
-        """counts occurences in between dates"""
+        """lists occurences in between dates"""
+        started = time.perf_counter()
+        occurences = []
+        for dtc in self.iter_occurences(period.start):
+            if dtc > period.end:
+                break
+            occurences.append(dtc)
+
+        metrics.record_time("schedule_expansion", time.perf_counter() - started)
+        metrics.increment("schedule_expansions")
+        metrics.increment("occurences_generated", len(occurences))
+        logger.debug("%s occures %d times in %s - %s", type(self).__name__, len(occurences), period.start, period.end)
+        return occurences
+
+    def count_in_period(self, period: Period) -> int:
+        """counts occurences in between dates without listing them"""
+        count = 0
+        for dtc in self.iter_occurences(period.start):
+            if dtc > period.end:
+                break
+            count += 1
+        return count
+
+    def next_occurence(self, after: datetime.date) -> datetime.date | None:
+        """returns the first occurence after the given date, None if there never is one"""
+        return next(self.iter_occurences(after), None)
+
+    def parameters(self) -> tuple:
+        """the values that decide when the schedule falls due, its __slots__ unless a subclass says otherwise"""
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        if other is self:
+            return True
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.parameters() == other.parameters()
+
+    def __hash__(self):
+        return hash((type(self), self.parameters()))
 
 
 #    @abstractmethod
@@ -25,19 +79,24 @@ class AnchoredExpenseSchedule(ExpenseSchedule):
     #         self.anchor = anchor
     #     else:
     #         raise ValueError('Called Improperly')
+    __slots__ = ("anchor",)
+
     def __init__(self, anchor: int) -> None:
         self.anchor = anchor
 
-    def get_occurences_in_period(self, period: Period) -> list[datetime.date]:
-        occurences = []
-        number_of_days_in_window = period.days_in_period()
-        for i in range(number_of_days_in_window):
-            dtc = period.start + datetime.timedelta(days=i + 1)
-            if dtc.day == self.anchor:
-                occurences.append(dtc)
+    def parameters(self) -> tuple:
+        return (self.anchor,)
 
-        print(f"Event occures {len(occurences)} times")
-        return occurences
+    def iter_occurences(self, after: datetime.date) -> Iterator[datetime.date]:
+        # jump straight to the anchor day of each month instead of scanning every day
+        if not 1 <= self.anchor <= 31:
+            return
+        for year, month in iter_months(after):
+            if self.anchor > days_in_month(year, month):
+                continue
+            dtc = datetime.date(year, month, self.anchor)
+            if dtc > after:
+                yield dtc
 
     # def config(self):
     #     anchor = self.menu().show_menu()
@@ -46,38 +105,61 @@ class AnchoredExpenseSchedule(ExpenseSchedule):
 
 
 class FirstLastWorkingDayMonthlyExpenseSchedule(ExpenseSchedule):
-    def __init__(self, anchor):
+    __slots__ = ("anchor", "day_index", "calendar")
+
+    def __init__(self, anchor, calendar: BusinessCalendar = None):
         super().__init__()
         if anchor == "f":
-            self.checker = first_working_day
+            self.day_index = 0
         elif anchor == "l":
-            self.checker = last_working_day
+            self.day_index = 1
         else:
             raise ValueError(
                 f"Must choose first or last working day. Something else was given: {anchor}"
             )
+        self.anchor = anchor
+        # weekends and holidays come from the calendar, the default one unless told otherwise
+        self.calendar = calendar or get_default_calendar()
 
-    def get_occurences_in_period(self, period: Period) -> list[datetime.date]:
-        occurences = []
-        number_of_days_in_window = period.days_in_period()
-        for i in range(number_of_days_in_window):
-            dtc = period.start + datetime.timedelta(days=i + 1)
-            if dtc == self.checker(dtc):
-                occurences.append(dtc)
-        print(f"Event occures {len(occurences)} times")
-        return occurences
+    def parameters(self) -> tuple:
+        # day_index follows from the anchor
+        return self.anchor, self.calendar
+
+    def iter_occurences(self, after: datetime.date) -> Iterator[datetime.date]:
+        # the calendar keeps the working days of each month, so this is a lookup per month
+        for year, month in iter_months(after):
+            days = self.calendar.working_days(year, month)
+            if not days:
+                continue
+            dtc = days[0] if self.day_index == 0 else days[-1]
+            if dtc > after:
+                yield dtc
 
 
 class WeeklyExpenseSchedule(ExpenseSchedule):
-    def __init__(self, weekday):
-        super().__init__(self)
+    __slots__ = ("weekday",)
+
+    def __init__(self, weekday: int) -> None:
+        # weekday follows datetime.date.weekday(): monday is 0, sunday is 6
+        super().__init__()
         self.weekday = weekday
 
-    def get_occurences_in_period(self, period):
-        occurences = []
-        number_of_days_in_period = period.days_in_period()
-        for i in range(number_of_days_in_period):
-            dtc = period.start + datetime.timedelta(days=i + 1)
-            if dtc.weekday == self.weekday:
-                occurences.append(dtc)
-        return occurences
+    def parameters(self) -> tuple:
+        return (self.weekday,)
+
+    def iter_occurences(self, after: datetime.date) -> Iterator[datetime.date]:
+        if after == datetime.date.max:
+            return
+        first = after + datetime.timedelta(days=1)
+        days = (self.weekday - first.weekday()) % 7
+        if (datetime.date.max - first).days < days:
+            return
+        dtc = first + datetime.timedelta(days=days)
+        week = datetime.timedelta(days=7)
+        # the last date a week can be added to without leaving the calendar
+        last = datetime.date.max - week
+        while True:
+            yield dtc
+            if dtc > last:
+                return
+            dtc = dtc + week
@@ -0,0 +1,138 @@
+import unittest
+from decimal import Decimal
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aggregates import ExpenseAggregates, RunningTotals, to_cents
+
+
+class TestRunningTotals(unittest.TestCase):
+    """Test the running totals of a set of amounts"""
+
+    def test_to_cents(self):
+        self.assertEqual(to_cents(0.1), 10)
+        self.assertEqual(to_cents("12.345"), 1235)
+        self.assertEqual(to_cents(1000), 100000)
+
+    def test_to_cents_rounds_half_cents_up(self):
+        # 1.005 is a little under 1.005 as a float, the written amount is what counts
+        self.assertEqual(to_cents(1.005), 101)
+        self.assertEqual(to_cents(0.125), 13)
+        self.assertEqual(to_cents(-1.005), -101)
+        self.assertEqual(to_cents(Decimal("2.675")), 268)
+
+    def test_to_cents_float_shortcut_matches_decimal(self):
+        for amount in [0.07, 19.99, 123456789.01, 1e13 + 0.01, 3.14159, 0.015, 2.345]:
+            self.assertEqual(to_cents(amount), to_cents(str(amount)), amount)
+
+    def test_add_and_remove(self):
+        totals = RunningTotals()
+        for cents in [500, 100, 900]:
+            totals.add(cents)
+
+        self.assertEqual(totals.total, Decimal("15.00"))
+        self.assertEqual(totals.count, 3)
+        self.assertEqual(totals.minimum, Decimal("1.00"))
+        self.assertEqual(totals.maximum, Decimal("9.00"))
+
+        totals.remove(100)
+        totals.remove(900)
+        self.assertEqual(totals.total, Decimal("5.00"))
+        self.assertEqual(totals.minimum, Decimal("5.00"))
+        self.assertEqual(totals.maximum, Decimal("5.00"))
+
+    def test_empty(self):
+        totals = RunningTotals()
+        self.assertEqual(totals.total, 0)
+        self.assertIsNone(totals.minimum)
+        self.assertIsNone(totals.maximum)
+
+    def test_remove_unknown_amount(self):
+        totals = RunningTotals()
+        totals.add(100)
+        with self.assertRaises(ValueError):
+            totals.remove(200)
+
+    def test_duplicate_amounts(self):
+        totals = RunningTotals()
+        totals.add(300)
+        totals.add(300)
+        totals.remove(300)
+        self.assertEqual(totals.maximum, Decimal("3.00"))
+
+    def test_add_many_at_once(self):
+        totals = RunningTotals()
+        totals.add(300, count=4)
+        totals.remove(300)
+        self.assertEqual(totals.total, Decimal("9.00"))
+        self.assertEqual(totals.count, 3)
+        self.assertEqual(totals.minimum, Decimal("3.00"))
+
+    def test_heavy_churn_stays_exact(self):
+        totals = RunningTotals()
+        totals.add(1)
+        for cents in range(1000):
+            totals.add(cents + 10)
+            totals.remove(cents + 10)
+        self.assertEqual(totals.total, Decimal("0.01"))
+        self.assertEqual(totals.maximum, Decimal("0.01"))
+        self.assertEqual(len(totals._counts), 1)
+
+    def test_extremes_from_the_amounts(self):
+        # Nothing is kept per amount, the extremes are worked out again once the last of one goes
+        amounts = [5.0, 1.0, 9.0, 1.0]
+        totals = RunningTotals(lambda: amounts)
+        for amount in amounts:
+            totals.add(to_cents(amount))
+        self.assertIsNone(totals._counts)
+
+        amounts.remove(1.0)
+        totals.remove(100)
+        self.assertEqual((totals.minimum, totals.maximum), (Decimal("1.00"), Decimal("9.00")))
+        amounts.remove(1.0)
+        totals.remove(100)
+        amounts.remove(9.0)
+        totals.remove(900)
+        self.assertEqual((totals.minimum, totals.maximum), (Decimal("5.00"), Decimal("5.00")))
+        with self.assertRaises(ValueError):
+            totals.remove(600)
+        totals.add(200)
+        self.assertEqual(totals.minimum, Decimal("2.00"))
+
+    def test_to_cents_needs_a_finite_amount(self):
+        for amount in [float("nan"), float("inf"), -float("inf"), 1e400, "nan", Decimal("Infinity")]:
+            with self.assertRaises(ValueError):
+                to_cents(amount)
+
+
+class TestExpenseAggregates(unittest.TestCase):
+    """Test running totals across categories"""
+
+    def test_no_float_drift(self):
+        aggregates = ExpenseAggregates()
+        for _ in range(10):
+            aggregates.add("Groceries", 0.1)
+        self.assertEqual(aggregates.overall.total, Decimal("1.00"))
+
+    def test_update_moves_extremes(self):
+        aggregates = ExpenseAggregates()
+        aggregates.add("Rent", 1000)
+        aggregates.add("Rent", 900)
+        aggregates.update("Rent", 1000, 800)
+
+        rent = aggregates.for_category("Rent")
+        self.assertEqual(rent.total, Decimal("1700.00"))
+        self.assertEqual(rent.maximum, Decimal("900.00"))
+        self.assertEqual(rent.minimum, Decimal("800.00"))
+
+    def test_empty_categories_are_dropped(self):
+        aggregates = ExpenseAggregates()
+        aggregates.add("Rent", 1000)
+        aggregates.remove("Rent", 1000)
+        self.assertEqual(aggregates.category_totals(), {})
+        self.assertEqual(aggregates.for_category("Rent").count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
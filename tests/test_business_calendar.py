@@ -0,0 +1,84 @@
+import unittest
+import datetime
+import os, sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from business_calendar import BusinessCalendar, load_holidays
+
+
+def walk_working_days(year, month, weekmask, holidays):
+    """Every working day of a month found by checking each date"""
+    date = datetime.date(year, month, 1)
+    days = []
+    while date.month == month:
+        if weekmask[date.weekday()] == "1" and date not in holidays:
+            days.append(date)
+        date += datetime.timedelta(days=1)
+    return days
+
+
+class TestBusinessCalendar(unittest.TestCase):
+    """Test working day lookups"""
+
+    def setUp(self):
+        self.holidays = {datetime.date(2025, 12, 25), datetime.date(2025, 12, 26), datetime.date(2026, 1, 1)}
+        self.calendar = BusinessCalendar(holidays=self.holidays)
+
+    def test_matches_a_walk(self):
+        for weekmask in ["1111100", "1111110", "0111110", "0000001"]:
+            calendar = BusinessCalendar(weekmask, self.holidays)
+            for year in [2024, 2025, 2026]:
+                for month in range(1, 13):
+                    self.assertEqual(list(calendar.working_days(year, month)),
+                                     walk_working_days(year, month, weekmask, self.holidays))
+
+    def test_holidays(self):
+        self.assertFalse(self.calendar.is_working_day(datetime.date(2025, 12, 25)))
+        self.assertTrue(self.calendar.is_working_day(datetime.date(2025, 12, 24)))
+        self.assertEqual(self.calendar.first_working_day(2026, 1), datetime.date(2026, 1, 2))
+
+    def test_nth_working_day(self):
+        self.assertEqual(self.calendar.nth_working_day(2025, 12, 1), datetime.date(2025, 12, 1))
+        self.assertEqual(self.calendar.nth_working_day(2025, 12, 19), datetime.date(2025, 12, 29))
+        self.assertEqual(self.calendar.nth_working_day(2025, 12, -1), datetime.date(2025, 12, 31))
+        self.assertEqual(self.calendar.last_working_day(2025, 11), datetime.date(2025, 11, 28))
+        with self.assertRaises(ValueError):
+            self.calendar.nth_working_day(2025, 12, 0)
+        with self.assertRaises(ValueError):
+            self.calendar.nth_working_day(2025, 12, 22)
+
+    def test_laid_out_years_are_bounded(self):
+        calendar = BusinessCalendar(holidays=self.holidays, max_years=2)
+        for year in [2024, 2025, 2024, 2026]:
+            calendar.working_days(year, 1)
+        # 2025 was the least recently used when 2026 came in
+        self.assertEqual(list(calendar._years), [2024, 2026])
+        self.assertEqual(calendar.first_working_day(2026, 1), datetime.date(2026, 1, 2))
+        self.assertEqual(calendar.last_working_day(2025, 12), datetime.date(2025, 12, 31))
+        self.assertEqual(len(calendar._years), 2)
+        with self.assertRaises(ValueError):
+            BusinessCalendar(max_years=0)
+
+    def test_bad_weekmask(self):
+        for weekmask in ["11111", "1111102", "0000000"]:
+            with self.assertRaises(ValueError):
+                BusinessCalendar(weekmask)
+
+    def test_from_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "holidays.txt")
+            with open(path, "w") as f:
+                f.write("# christmas\n2025-12-25 Christmas Day\n\n2025-12-26\n")
+            self.assertEqual(load_holidays(path), [datetime.date(2025, 12, 25), datetime.date(2025, 12, 26)])
+            self.assertEqual(BusinessCalendar.from_file(path).last_working_day(2025, 12), datetime.date(2025, 12, 31))
+
+            with open(path, "w") as f:
+                f.write("2025-12-25\nboxing day\n")
+            with self.assertRaises(ValueError):
+                load_holidays(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import datetime
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from categories import ExpenseCategory
+from expenses import Expense
+from forecast import bucket_cents, forecast
+from period import Period
+from schedules import AnchoredExpenseSchedule, FirstLastWorkingDayMonthlyExpenseSchedule, WeeklyExpenseSchedule
+
+
+class TestMonthlyBuckets(unittest.TestCase):
+    """Test which month an occurrence lands in"""
+
+    def setUp(self):
+        self.period = Period(datetime.date(2025, 1, 1), datetime.date(2025, 4, 1))
+
+    def test_start_is_in_and_end_is_out(self):
+        # the 1st of january opens the period, the 1st of april closes it
+        rent = Expense(1000.0, "Rent", AnchoredExpenseSchedule(1), ExpenseCategory.RENT)
+        result = forecast([rent], self.period, "M")
+        self.assertEqual(result.buckets[0], (datetime.date(2025, 1, 1), datetime.date(2025, 1, 31)))
+        self.assertEqual(result.category_series(ExpenseCategory.RENT), [1000.0, 1000.0, 1000.0])
+        self.assertEqual(result.total(), 3000.0)
+
+    def test_last_day_of_a_bucket(self):
+        # the 31st only exists in january and march, and stays in its own month
+        bill = Expense(50.0, "Bill", AnchoredExpenseSchedule(31), ExpenseCategory.UTILITIES)
+        self.assertEqual(forecast([bill], self.period, "M").bucket_totals(), [50.0, 0.0, 50.0])
+
+    def test_categories_are_kept_apart(self):
+        expenses = [
+            Expense(0.1, "Snack", AnchoredExpenseSchedule(2), ExpenseCategory.GROCERIES),
+            Expense(0.2, "Snack", AnchoredExpenseSchedule(2), ExpenseCategory.GROCERIES),
+            Expense(20.0, "Film", FirstLastWorkingDayMonthlyExpenseSchedule("l"), ExpenseCategory.ENTERTAINMENT),
+        ]
+        result = forecast(expenses, self.period, "M")
+        self.assertEqual(result.category_series(ExpenseCategory.GROCERIES), [0.3, 0.3, 0.3])
+        self.assertEqual(result.category_series(ExpenseCategory.ENTERTAINMENT), [20.0, 20.0, 20.0])
+        self.assertEqual(result.category_series(ExpenseCategory.RENT), [0.0, 0.0, 0.0])
+        self.assertEqual(result.bucket_totals(), [20.3, 20.3, 20.3])
+
+    def test_amounts_round_half_up_to_cents(self):
+        snack = Expense(1.005, "Snack", AnchoredExpenseSchedule(5), ExpenseCategory.GROCERIES)
+        self.assertEqual(forecast([snack], self.period, "M").cents[ExpenseCategory.GROCERIES].tolist(), [101, 101, 101])
+
+    def test_unscheduled_expenses_are_left_out(self):
+        expenses = [
+            Expense(99.0, "One off", None, ExpenseCategory.ENTERTAINMENT),
+            Expense(10.0, "Phone", AnchoredExpenseSchedule(10), ExpenseCategory.UTILITIES),
+        ]
+        result = forecast(expenses, self.period, "M")
+        self.assertEqual(result.categories, [ExpenseCategory.UTILITIES])
+        self.assertEqual(result.total(), 30.0)
+        self.assertEqual(bucket_cents({None: {ExpenseCategory.RENT: 100}}, self.period, result.buckets), {})
+
+
+class TestWeeklyBuckets(unittest.TestCase):
+    """Test weekly buckets, including a short last one"""
+
+    def test_weeks(self):
+        # 2025-01-06 is a monday, the period runs for two weeks and three days
+        period = Period(datetime.date(2025, 1, 6), datetime.date(2025, 1, 23))
+        expenses = [
+            Expense(5.0, "Coffee", WeeklyExpenseSchedule(0), ExpenseCategory.EATING_OUT),
+            Expense(7.0, "Takeaway", WeeklyExpenseSchedule(2), ExpenseCategory.EATING_OUT),
+        ]
+        result = forecast(expenses, period, "W")
+        self.assertEqual([start for start, _ in result.buckets],
+                         [datetime.date(2025, 1, 6), datetime.date(2025, 1, 13), datetime.date(2025, 1, 20)])
+        self.assertEqual(result.buckets[-1][1], datetime.date(2025, 1, 22))
+        self.assertEqual(result.bucket_totals(), [12.0, 12.0, 12.0])
+
+    def test_rows(self):
+        period = Period(datetime.date(2025, 1, 6), datetime.date(2025, 1, 20))
+        coffee = Expense(5.0, "Coffee", WeeklyExpenseSchedule(0), ExpenseCategory.EATING_OUT)
+        rows = list(forecast([coffee], period, "W").rows())
+        self.assertEqual(rows[1], (datetime.date(2025, 1, 13), datetime.date(2025, 1, 19),
+                                   {ExpenseCategory.EATING_OUT: 5.0}))
+
+
+if __name__ == '__main__':
+    unittest.main()
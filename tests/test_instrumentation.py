@@ -0,0 +1,62 @@
+import unittest
+import json
+import os, sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from instrumentation import Metrics
+
+
+class TestMetrics(unittest.TestCase):
+    """Test the counters, timers and JSON dump of the metrics object"""
+
+    def setUp(self):
+        self.metrics = Metrics()
+
+    def test_counters(self):
+        self.metrics.increment("expansions")
+        self.metrics.increment("occurences", 12)
+        self.metrics.increment("occurences", 3)
+        self.assertEqual(self.metrics.snapshot()["counters"], {"expansions": 1, "occurences": 15})
+
+    def test_timers(self):
+        self.metrics.record_time("expansion", 0.5)
+        self.metrics.record_time("expansion", 1.5)
+        with self.metrics.timer("block"):
+            pass
+
+        timers = self.metrics.snapshot()["timers"]
+        self.assertEqual(timers["expansion"],
+                         {"count": 2, "total_seconds": 2.0, "mean_seconds": 1.0, "max_seconds": 1.5})
+        self.assertEqual(timers["block"]["count"], 1)
+
+    def test_disabled(self):
+        self.metrics.enabled = False
+        self.metrics.increment("expansions")
+        self.metrics.record_time("expansion", 1.0)
+        self.assertEqual(self.metrics.snapshot(), {"counters": {}, "timers": {}})
+
+    def test_sources_are_read_on_snapshot(self):
+        hits = {"hits": 0}
+        self.metrics.add_source("cache", lambda: dict(hits))
+        hits["hits"] = 4
+        self.assertEqual(self.metrics.snapshot()["cache"], {"hits": 4})
+
+    def test_reset_keeps_sources(self):
+        self.metrics.add_source("cache", lambda: {"hits": 1})
+        self.metrics.increment("expansions")
+        self.metrics.reset()
+        self.assertEqual(self.metrics.snapshot(), {"counters": {}, "timers": {}, "cache": {"hits": 1}})
+
+    def test_dump(self):
+        self.metrics.increment("expansions", 2)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "metrics.json")
+            self.metrics.dump(path)
+            with open(path) as f:
+                self.assertEqual(json.load(f)["counters"], {"expansions": 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
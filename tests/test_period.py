@@ -0,0 +1,153 @@
+import unittest
+import datetime
+import random
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from itertools import islice
+
+from period import Period, days_in_month, increment_date_by_months, increment_date_by_weeks
+
+
+def reference_increment(date, increment):
+    """Step one month at a time, then walk the day back until the date exists"""
+    year, month = date.year, date.month
+    step = 1 if increment > 0 else -1
+    for _ in range(abs(increment)):
+        month += step
+        if month == 13:
+            year, month = year + 1, 1
+        elif month == 0:
+            year, month = year - 1, 12
+
+    day = date.day
+    while True:
+        try:
+            return datetime.date(year, month, day)
+        except ValueError:
+            day -= 1
+
+
+def reference_period_list(period, incrementor):
+    """The original make_period_list: chain the incrementor from one boundary to the next"""
+    plist = []
+    start = period.start
+    while True:
+        end = incrementor(start, 1)
+        if end <= period.end:
+            plist.append((start, end - datetime.timedelta(days=1)))
+            start = end
+        else:
+            if start < period.end:
+                plist.append((start, period.end - datetime.timedelta(days=1)))
+            return plist
+
+
+def random_dates(rng, n):
+    first = datetime.date(1900, 1, 1).toordinal()
+    last = datetime.date(2200, 12, 31).toordinal()
+    return [datetime.date.fromordinal(rng.randint(first, last)) for _ in range(n)]
+
+
+class TestDaysInMonth(unittest.TestCase):
+    """Test month lengths"""
+
+    def test_against_the_calendar(self):
+        for year in [1900, 2000, 2023, 2024, 2100]:
+            for month in range(1, 13):
+                next_month = datetime.date(year + month // 12, month % 12 + 1, 1)
+                expected = (next_month - datetime.date(year, month, 1)).days
+                self.assertEqual(days_in_month(year, month), expected)
+
+
+class TestIncrementDateByMonths(unittest.TestCase):
+    """Property checks of month stepping against a month by month reference"""
+
+    def setUp(self):
+        self.rng = random.Random(2024)
+
+    def test_matches_reference(self):
+        for date in random_dates(self.rng, 5000):
+            increment = self.rng.randint(-600, 600)
+            self.assertEqual(increment_date_by_months(date, increment), reference_increment(date, increment),
+                             f"{date} + {increment} months")
+
+    def test_month_ends_clamp(self):
+        self.assertEqual(increment_date_by_months(datetime.date(2024, 1, 31), 1), datetime.date(2024, 2, 29))
+        self.assertEqual(increment_date_by_months(datetime.date(2023, 1, 31), 1), datetime.date(2023, 2, 28))
+        self.assertEqual(increment_date_by_months(datetime.date(2024, 3, 31), -1), datetime.date(2024, 2, 29))
+        self.assertEqual(increment_date_by_months(datetime.date(2024, 12, 31), 2), datetime.date(2025, 2, 28))
+
+    def test_year_boundaries(self):
+        self.assertEqual(increment_date_by_months(datetime.date(2024, 12, 15), 1), datetime.date(2025, 1, 15))
+        self.assertEqual(increment_date_by_months(datetime.date(2025, 1, 15), -1), datetime.date(2024, 12, 15))
+        self.assertEqual(increment_date_by_months(datetime.date(2024, 6, 15), 24), datetime.date(2026, 6, 15))
+
+    def test_round_trip_when_day_exists_everywhere(self):
+        for date in random_dates(self.rng, 2000):
+            date = date.replace(day=min(date.day, 28))
+            increment = self.rng.randint(-600, 600)
+            self.assertEqual(increment_date_by_months(increment_date_by_months(date, increment), -increment), date)
+
+    def test_zero_is_identity(self):
+        for date in random_dates(self.rng, 100):
+            self.assertEqual(increment_date_by_months(date, 0), date)
+
+    def test_adds_up(self):
+        # Stepping a in-range day twice is the same as stepping once by the sum
+        for date in random_dates(self.rng, 2000):
+            date = date.replace(day=min(date.day, 28))
+            a, b = self.rng.randint(-300, 300), self.rng.randint(-300, 300)
+            self.assertEqual(increment_date_by_months(increment_date_by_months(date, a), b),
+                             increment_date_by_months(date, a + b))
+
+
+
+class TestPeriodLists(unittest.TestCase):
+    """Test the interval and month generators of a period"""
+
+    def setUp(self):
+        self.rng = random.Random(2025)
+
+    def random_periods(self, n):
+        for start in random_dates(self.rng, n):
+            yield Period(start, end=start + datetime.timedelta(days=self.rng.randint(-40, 3000)))
+
+    def test_intervals_match_reference(self):
+        for period in self.random_periods(1000):
+            self.assertEqual(period.make_period_list("M"), reference_period_list(period, increment_date_by_months))
+            self.assertEqual(period.make_period_list("W"), reference_period_list(period, increment_date_by_weeks))
+
+    def test_month_end_clamp_carries_forward(self):
+        period = Period(datetime.date(2024, 1, 31), end=datetime.date(2024, 4, 15))
+        self.assertEqual(period.make_period_list("M"), [
+            (datetime.date(2024, 1, 31), datetime.date(2024, 2, 28)),
+            (datetime.date(2024, 2, 29), datetime.date(2024, 3, 28)),
+            (datetime.date(2024, 3, 29), datetime.date(2024, 4, 14)),
+        ])
+
+    def test_months_in_period(self):
+        for period in self.random_periods(500):
+            expected = []
+            month = period.start.replace(day=1)
+            while not expected or month <= period.end:
+                expected.append(month)
+                month = increment_date_by_months(month, 1)
+            self.assertEqual(period.months_in_period(), expected)
+
+    def test_generators_are_lazy(self):
+        period = Period(datetime.date(2000, 1, 15), end=datetime.date(9999, 12, 31), interval="M")
+        self.assertEqual(list(islice(period.iter_intervals(), 2)), [
+            (datetime.date(2000, 1, 15), datetime.date(2000, 2, 14)),
+            (datetime.date(2000, 2, 15), datetime.date(2000, 3, 14)),
+        ])
+        self.assertEqual(next(period.iter_months_in_period()), datetime.date(2000, 1, 1))
+
+    def test_unknown_interval(self):
+        with self.assertRaises(NotImplementedError):
+            Period(datetime.date(2024, 1, 1), end=datetime.date(2025, 1, 1)).make_period_list("D")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import io
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from report_renderer import Column, ReportRenderer
+
+
+ROWS = [("Rent", 1000.0), ("Groceries", 12.5), ("Cinema", 9.0)]
+
+
+class TestReportRenderer(unittest.TestCase):
+    """Test rendering rows into report lines"""
+
+    def setUp(self):
+        self.renderer = ReportRenderer([
+            Column("Name", lambda row: row[0]),
+            Column("Amount", lambda row: row[1], ">", ".2f"),
+        ], title="Report")
+
+    def test_measure(self):
+        self.assertEqual(self.renderer.measure(ROWS), [9, 7])
+        self.assertEqual(self.renderer.measure([]), [4, 6])
+
+    def test_lines(self):
+        lines = list(self.renderer.lines(ROWS, total=1021.5))
+        self.assertEqual(lines, [
+            "Report",
+            "=================",
+            "Name       Amount",
+            "-----------------",
+            "Rent      1000.00",
+            "Groceries   12.50",
+            "Cinema       9.00",
+            "-----------------",
+            "Total     1021.50",
+        ])
+
+    def test_every_line_is_the_same_width(self):
+        lines = list(self.renderer.lines(ROWS, total=123456789.0))
+        self.assertEqual(len({len(line) for line in lines[1:]}), 1)
+
+    def test_lines_are_lazy(self):
+        lines = self.renderer.lines(iter(ROWS), widths=[9, 7])
+        self.assertEqual(next(lines), "Report")
+
+    def test_rows_are_read_once(self):
+        lines = list(self.renderer.lines(iter(ROWS), total=1021.5))
+        self.assertEqual(lines, list(self.renderer.lines(ROWS, total=1021.5)))
+
+    def test_widths_come_from_the_first_page(self):
+        self.renderer.sample_rows = 2
+        lines = list(self.renderer.lines(ROWS + [("Subscriptions", 5.0)]))
+        self.assertEqual(lines[2], "Name       Amount")
+        self.assertEqual(lines[-1], "Subscriptions    5.00")
+
+    def test_pagination(self):
+        self.renderer.page_size = 2
+        lines = list(self.renderer.lines(ROWS))
+        self.assertEqual(lines.count("Name       Amount"), 2)
+        self.assertEqual(lines[6], "")
+
+    def test_write_in_chunks(self):
+        class CountingStream(io.StringIO):
+            writes = 0
+
+            def write(self, text):
+                self.writes += 1
+                return super().write(text)
+
+        stream = CountingStream()
+        written = self.renderer.write(ROWS, stream, total=1021.5, chunk_lines=4)
+
+        self.assertEqual(written, 9)
+        self.assertEqual(stream.writes, 3)
+        self.assertEqual(stream.getvalue().splitlines(), list(self.renderer.lines(ROWS, total=1021.5)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import unittest
+from unittest.mock import MagicMock
+import datetime
+import os, sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from instrumentation import metrics
+from schedule_registry import OccurrenceCache, ScheduleRegistry, registry
+
+
+class CountingSchedule:
+    """A schedule that records how often it is expanded"""
+
+    def __init__(self):
+        self.expansions = 0
+
+    def get_occurences_in_period(self, period):
+        self.expansions += 1
+        return [period.end]
+
+
+class ParameterSchedule:
+    """A value keyed schedule that can be changed in place"""
+
+    def __init__(self, day):
+        self.day = day
+        self.expansions = 0
+
+    def parameters(self):
+        return (self.day,)
+
+    def __eq__(self, other):
+        return type(other) is ParameterSchedule and other.day == self.day
+
+    def __hash__(self):
+        return hash(self.day)
+
+    def get_occurences_in_period(self, period):
+        self.expansions += 1
+        return [period.start.replace(day=self.day)]
+
+
+class TestScheduleRegistry(unittest.TestCase):
+    """Test interning and shared expansion"""
+
+    def setUp(self):
+        self.registry = ScheduleRegistry()
+        self.period = MagicMock(start=datetime.date(2025, 1, 1), end=datetime.date(2025, 12, 31))
+
+    def test_intern(self):
+        first = self.registry.intern(ParameterSchedule(1))
+        self.assertIs(self.registry.intern(ParameterSchedule(1)), first)
+        self.assertIsNot(self.registry.intern(ParameterSchedule(2)), first)
+        self.assertEqual(len(self.registry), 2)
+        self.assertIn(ParameterSchedule(2), self.registry)
+
+    def test_expansion_is_shared(self):
+        schedule = CountingSchedule()
+        occurences = self.registry.get_occurences(schedule, self.period)
+        self.assertIs(self.registry.get_occurences(schedule, self.period), occurences)
+        self.assertEqual(occurences, (datetime.date(2025, 12, 31),))
+        self.assertEqual(schedule.expansions, 1)
+
+        later = MagicMock(start=self.period.start, end=datetime.date(2026, 12, 31))
+        self.registry.get_occurences(schedule, later)
+        self.assertEqual(schedule.expansions, 2)
+
+    def test_clear(self):
+        schedule = CountingSchedule()
+        self.registry.intern(ParameterSchedule(1))
+        self.registry.get_occurences(schedule, self.period)
+        self.registry.clear()
+        self.assertEqual(len(self.registry), 0)
+        self.registry.get_occurences(schedule, self.period)
+        self.assertEqual(schedule.expansions, 2)
+
+
+class TestOccurrenceCache(unittest.TestCase):
+    """Test the bounded occurrence cache"""
+
+    def setUp(self):
+        self.cache = OccurrenceCache(max_entries=2)
+        self.periods = [MagicMock(start=datetime.date(2025, month, 1), end=datetime.date(2025, month, 28))
+                        for month in range(1, 4)]
+
+    def test_hits_and_misses(self):
+        schedule = CountingSchedule()
+        self.cache.get(schedule, self.periods[0])
+        self.cache.get(schedule, self.periods[0])
+        self.cache.get(schedule, self.periods[1])
+        self.assertEqual(schedule.expansions, 2)
+        self.assertEqual(self.cache.stats(),
+                         {"hits": 1, "misses": 2, "evictions": 0, "entries": 2, "max_entries": 2})
+
+    def test_least_recently_used_goes_first(self):
+        schedule = CountingSchedule()
+        self.cache.get(schedule, self.periods[0])
+        self.cache.get(schedule, self.periods[1])
+        self.cache.get(schedule, self.periods[0])
+        self.cache.get(schedule, self.periods[2])
+        self.assertEqual(self.cache.evictions, 1)
+
+        self.cache.get(schedule, self.periods[0])
+        self.assertEqual(schedule.expansions, 3)
+        self.cache.get(schedule, self.periods[1])
+        self.assertEqual(schedule.expansions, 4)
+
+    def test_shrinks_when_max_entries_drops(self):
+        schedule = CountingSchedule()
+        self.cache.get(schedule, self.periods[0])
+        self.cache.get(schedule, self.periods[1])
+        self.cache.max_entries = 1
+        self.cache.get(schedule, self.periods[2])
+        self.assertEqual(len(self.cache), 1)
+
+    def test_value_keys_follow_changes(self):
+        schedule = ParameterSchedule(5)
+        self.assertEqual(self.cache.get(schedule, self.periods[0]), (datetime.date(2025, 1, 5),))
+        self.assertEqual(self.cache.get(ParameterSchedule(5), self.periods[0]), (datetime.date(2025, 1, 5),))
+        schedule.day = 9
+        self.assertEqual(self.cache.get(schedule, self.periods[0]), (datetime.date(2025, 1, 9),))
+        self.assertEqual(schedule.expansions, 2)
+
+    def test_invalidate(self):
+        schedule = CountingSchedule()
+        self.cache.get(schedule, self.periods[0])
+        self.cache.get(schedule, self.periods[1])
+        self.assertEqual(self.cache.invalidate(schedule), 2)
+        self.assertEqual(len(self.cache), 0)
+        self.cache.get(schedule, self.periods[0])
+        self.assertEqual(schedule.expansions, 3)
+        self.assertEqual(self.cache.invalidate(CountingSchedule()), 0)
+
+    def test_shared_between_threads(self):
+        # Hits and evictions from many threads at once must not trip over each other's entries
+        schedules = [ParameterSchedule(day) for day in range(1, 29)]
+        errors = []
+
+        def churn():
+            try:
+                for _ in range(200):
+                    for schedule in schedules:
+                        self.cache.get(schedule, self.periods[schedule.day % 3])
+            except Exception as e:
+                errors.append(e)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=churn) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.cache), 2)
+
+    def test_needs_room(self):
+        with self.assertRaises(ValueError):
+            OccurrenceCache(max_entries=0)
+
+
+class TestSharedRegistryStatistics(unittest.TestCase):
+    """Test that the shared cache reports to the metrics snapshot"""
+
+    def test_snapshot_reads_the_shared_cache(self):
+        period = MagicMock(start=datetime.date(2030, 1, 1), end=datetime.date(2030, 1, 31))
+        schedule = CountingSchedule()
+        registry.get_occurences(schedule, period)
+        registry.get_occurences(schedule, period)
+        self.assertEqual(metrics.snapshot()["occurrence_cache"], registry.occurences.stats())
+        registry.invalidate(schedule)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import datetime
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from itertools import islice
+
+from business_calendar import BusinessCalendar
+from period import Period
+from schedules import AnchoredExpenseSchedule, FirstLastWorkingDayMonthlyExpenseSchedule, WeeklyExpenseSchedule
+
+
+class TestIterOccurences(unittest.TestCase):
+    """Test the lazy occurence stream of each schedule"""
+
+    def test_anchored(self):
+        occurences = list(islice(AnchoredExpenseSchedule(31).iter_occurences(datetime.date(2025, 1, 31)), 3))
+        # months without a 31st are skipped, the date itself is not included
+        self.assertEqual(occurences, [datetime.date(2025, 3, 31), datetime.date(2025, 5, 31), datetime.date(2025, 7, 31)])
+
+    def test_first_and_last_working_day(self):
+        calendar = BusinessCalendar(holidays=[datetime.date(2025, 9, 1)])
+        first = FirstLastWorkingDayMonthlyExpenseSchedule("f", calendar)
+        last = FirstLastWorkingDayMonthlyExpenseSchedule("l", calendar)
+        self.assertEqual(list(islice(first.iter_occurences(datetime.date(2025, 8, 15)), 2)),
+                         [datetime.date(2025, 9, 2), datetime.date(2025, 10, 1)])
+        self.assertEqual(list(islice(last.iter_occurences(datetime.date(2025, 8, 15)), 2)),
+                         [datetime.date(2025, 8, 29), datetime.date(2025, 9, 30)])
+
+    def test_weekly(self):
+        # 2025-01-03 is a friday, the next friday is a week later
+        occurences = list(islice(WeeklyExpenseSchedule(4).iter_occurences(datetime.date(2025, 1, 3)), 3))
+        self.assertEqual(occurences, [datetime.date(2025, 1, 10), datetime.date(2025, 1, 17), datetime.date(2025, 1, 24)])
+
+    def test_invalid_anchor_never_occurs(self):
+        self.assertEqual(list(AnchoredExpenseSchedule(0).iter_occurences(datetime.date(2025, 1, 1))), [])
+
+
+class TestCountAndNext(unittest.TestCase):
+    """Test counting occurences and finding the next one without listing them"""
+
+    def setUp(self):
+        self.period = Period(datetime.date(2025, 1, 1), datetime.date(2026, 1, 1))
+        self.schedules = [
+            AnchoredExpenseSchedule(1),
+            AnchoredExpenseSchedule(30),
+            FirstLastWorkingDayMonthlyExpenseSchedule("f"),
+            FirstLastWorkingDayMonthlyExpenseSchedule("l"),
+            WeeklyExpenseSchedule(0),
+        ]
+
+    def test_count_matches_the_listed_occurences(self):
+        for schedule in self.schedules:
+            self.assertEqual(schedule.count_in_period(self.period),
+                             len(schedule.get_occurences_in_period(self.period)), schedule)
+        # the period covers (start, end], jan 1 2025 is out and jan 1 2026 is in
+        self.assertEqual(AnchoredExpenseSchedule(1).count_in_period(self.period), 12)
+        self.assertEqual(AnchoredExpenseSchedule(30).count_in_period(self.period), 11)
+
+    def test_next_occurence(self):
+        self.assertEqual(AnchoredExpenseSchedule(15).next_occurence(datetime.date(2025, 1, 15)),
+                         datetime.date(2025, 2, 15))
+        self.assertEqual(FirstLastWorkingDayMonthlyExpenseSchedule("l").next_occurence(datetime.date(2025, 5, 30)),
+                         datetime.date(2025, 6, 30))
+        self.assertEqual(WeeklyExpenseSchedule(6).next_occurence(datetime.date(2025, 1, 1)),
+                         datetime.date(2025, 1, 5))
+
+    def test_next_occurence_of_a_schedule_that_never_occurs(self):
+        self.assertIsNone(AnchoredExpenseSchedule(32).next_occurence(datetime.date(2025, 1, 1)))
+
+
+class TestCalendarUpperBound(unittest.TestCase):
+    """Test that occurences stop at the last date datetime can hold instead of raising"""
+
+    def test_iteration_ends_in_9999(self):
+        end_of_time = datetime.date(9999, 12, 31)
+        after = datetime.date(9999, 10, 31)
+        self.assertEqual(list(AnchoredExpenseSchedule(31).iter_occurences(after)), [end_of_time])
+        self.assertEqual(list(FirstLastWorkingDayMonthlyExpenseSchedule("l").iter_occurences(after)),
+                         [datetime.date(9999, 11, 30), datetime.date(9999, 12, 31)])
+        # 9999-12-31 is a friday
+        self.assertEqual(list(WeeklyExpenseSchedule(4).iter_occurences(datetime.date(9999, 12, 20))),
+                         [datetime.date(9999, 12, 24), end_of_time])
+        self.assertEqual(list(WeeklyExpenseSchedule(3).iter_occurences(datetime.date(9999, 12, 30))), [])
+
+    def test_open_ended_next_occurence(self):
+        for schedule in [AnchoredExpenseSchedule(1), FirstLastWorkingDayMonthlyExpenseSchedule("f"),
+                         WeeklyExpenseSchedule(2)]:
+            self.assertIsNone(schedule.next_occurence(datetime.date.max), schedule)
+
+    def test_count_to_the_end_of_the_calendar(self):
+        period = Period(datetime.date(9999, 1, 1), datetime.date.max)
+        self.assertEqual(AnchoredExpenseSchedule(1).count_in_period(period), 11)
+        self.assertEqual(WeeklyExpenseSchedule(4).count_in_period(period), 52)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+import datetime
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from business_calendar import BusinessCalendar
+from period import Period
+from schedules import (
+    AnchoredExpenseSchedule,
+    FirstLastWorkingDayMonthlyExpenseSchedule,
+    WeeklyExpenseSchedule,
+)
+from vectorized import expand_schedules, interval_bounds, month_starts
+
+# runs over two leap days and starts and ends part way through a month
+PERIOD = Period(datetime.date(2023, 11, 15), datetime.date(2028, 3, 10))
+
+# holidays on what would be the first or last working day of a month, so both have to move past them
+HOLIDAYS = BusinessCalendar(holidays=[datetime.date(2024, 1, 1), datetime.date(2025, 12, 31),
+                                      datetime.date(2026, 12, 31), datetime.date(2027, 3, 1)])
+FOUR_DAY_WEEK = BusinessCalendar(weekmask="0111100", holidays=[datetime.date(2025, 6, 3)])
+
+
+class OddDaysSchedule(WeeklyExpenseSchedule):
+    """A schedule expand_schedules has no batch for, it falls back to the schedule's own expansion"""
+
+    __slots__ = ()
+
+    def iter_occurences(self, after):
+        return (date for date in super().iter_occurences(after) if date.day % 2)
+
+
+@unittest.skipUnless(numpy, "numpy is not installed")
+class TestExpandSchedules(unittest.TestCase):
+    """Test the batched expansion against every schedule's own get_occurences_in_period"""
+
+    def check(self, schedules, period=PERIOD):
+        batch = expand_schedules(schedules, period)
+        for index, schedule in enumerate(schedules):
+            expected = schedule.get_occurences_in_period(period)
+            got = [date.item() for date in batch.for_schedule(index)]
+            self.assertEqual(got, expected, (type(schedule).__name__, schedule.parameters()))
+        self.assertEqual(batch.counts().tolist(), [len(s.get_occurences_in_period(period)) for s in schedules])
+        return batch
+
+    def test_anchored(self):
+        self.check([AnchoredExpenseSchedule(day) for day in [1, 10, 15, 28, 29, 30, 31, 0, 32]])
+
+    def test_first_and_last_working_day(self):
+        self.check([FirstLastWorkingDayMonthlyExpenseSchedule(anchor) for anchor in "fl"])
+
+    def test_working_days_with_holidays(self):
+        self.check([FirstLastWorkingDayMonthlyExpenseSchedule(anchor, calendar)
+                    for calendar in [HOLIDAYS, FOUR_DAY_WEEK] for anchor in "fl"])
+
+    def test_weekly(self):
+        self.check([WeeklyExpenseSchedule(weekday) for weekday in range(7)])
+
+    def test_unbatched_schedules(self):
+        self.check([OddDaysSchedule(2)])
+
+    def test_mixed_and_repeated(self):
+        schedules = [AnchoredExpenseSchedule(15), WeeklyExpenseSchedule(4), AnchoredExpenseSchedule(15),
+                     FirstLastWorkingDayMonthlyExpenseSchedule("l", HOLIDAYS), OddDaysSchedule(1),
+                     AnchoredExpenseSchedule(31)]
+        batch = self.check(schedules)
+        self.assertEqual(batch.owners.tolist(), sorted(batch.owners.tolist()))
+
+    def test_window_edges(self):
+        # an occurrence on the first day is out, one on the last day is in
+        period = Period(datetime.date(2025, 1, 15), datetime.date(2025, 3, 15))
+        batch = self.check([AnchoredExpenseSchedule(15), WeeklyExpenseSchedule(2)], period)
+        self.assertEqual([date.item() for date in batch.for_schedule(0)],
+                         [datetime.date(2025, 2, 15), datetime.date(2025, 3, 15)])
+
+    def test_empty_period(self):
+        period = Period(datetime.date(2025, 1, 15), datetime.date(2025, 1, 15))
+        self.assertEqual(len(self.check([AnchoredExpenseSchedule(15), WeeklyExpenseSchedule(2)], period)), 0)
+
+
+@unittest.skipUnless(numpy, "numpy is not installed")
+class TestPeriodArrays(unittest.TestCase):
+    """Test the array counterparts of the Period helpers"""
+
+    def test_month_starts(self):
+        self.assertEqual([date.item() for date in month_starts(PERIOD)], PERIOD.months_in_period())
+
+    def test_interval_bounds(self):
+        for interval in ["M", "W"]:
+            starts, ends = interval_bounds(PERIOD, interval)
+            self.assertEqual(list(zip([d.item() for d in starts], [d.item() for d in ends])),
+                             PERIOD.make_period_list(interval))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+"""Batched occurrence expansion for large collections of schedules
+
+Instead of every schedule building its own list of datetime.date objects,
+schedules are grouped by their parameters (anchor day, first/last working day,
+weekday) and each group is expanded once with numpy array arithmetic. The
+results come back as flat datetime64[D] arrays grouped by schedule index.
+
+month_starts and interval_bounds are the array counterparts of
+Period.months_in_period and Period.make_period_list for long horizons.
+
+numpy is optional: it is only imported when one of these functions is called.
+"""
+from collections import defaultdict
+import logging
+import time
+
+from instrumentation import metrics
+from period import Period
+from schedules import (
+    AnchoredExpenseSchedule,
+    ExpenseSchedule,
+    FirstLastWorkingDayMonthlyExpenseSchedule,
+    WeeklyExpenseSchedule,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError(
+            "expand_schedules needs numpy, install it with `pip install expense-tracker[vectorized]` or `pip install numpy`"
+        ) from e
+    return numpy
+
+
+class OccurrenceBatch:
+    """occurrences of a collection of schedules stored as flat arrays
+
+    owners[i] is the index of the schedule that dates[i] belongs to. Both arrays
+    are ordered by owner, then date, so the occurrences of schedule n are
+    dates[offsets[n]:offsets[n + 1]].
+    """
+
+    def __init__(self, owners, dates, offsets):
+        self.owners = owners
+        self.dates = dates
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def for_schedule(self, index: int):
+        """returns the datetime64[D] occurrences of the schedule at index"""
+        return self.dates[self.offsets[index] : self.offsets[index + 1]]
+
+    def counts(self):
+        """returns the number of occurrences of every schedule"""
+        return self.offsets[1:] - self.offsets[:-1]
+
+
+def _in_window(dates, start, end):
+    # same (start, end] window as ExpenseSchedule.get_occurences_in_period
+    return dates[(dates > start) & (dates <= end)]
+
+
+def expand_schedules(schedules: list[ExpenseSchedule], period: Period) -> OccurrenceBatch:
+    """expands every schedule over the period, computing each distinct schedule only once"""
+    np = _import_numpy()
+    started = time.perf_counter()
+
+    start = np.datetime64(period.start, "D")
+    end = np.datetime64(period.end, "D")
+    months = np.arange(start.astype("datetime64[M]"), end.astype("datetime64[M]") + 1)
+    month_starts = months.astype("datetime64[D]")
+    next_month_starts = (months + 1).astype("datetime64[D]")
+
+    anchored = defaultdict(list)
+    working_days = defaultdict(list)
+    weekly = defaultdict(list)
+    others = []
+    for index, schedule in enumerate(schedules):
+        # exact types only, a subclass may fall due on other days than its parent
+        kind = type(schedule)
+        if kind is AnchoredExpenseSchedule:
+            anchored[schedule.anchor].append(index)
+        elif kind is FirstLastWorkingDayMonthlyExpenseSchedule:
+            working_days[schedule.day_index, schedule.calendar].append(index)
+        elif kind is WeeklyExpenseSchedule:
+            weekly[schedule.weekday].append(index)
+        else:
+            others.append(index)
+
+    groups = []
+    for anchor, owners in anchored.items():
+        if anchor < 1:
+            continue
+        dates = month_starts + (anchor - 1)
+        dates = dates[dates < next_month_starts]
+        groups.append((owners, _in_window(dates, start, end)))
+
+    for (day_index, calendar), owners in working_days.items():
+        busdays = np.busdaycalendar(
+            weekmask=calendar.weekmask,
+            holidays=np.array(sorted(calendar.holidays), dtype="datetime64[D]"),
+        )
+        if day_index == 0:
+            dates = np.busday_offset(month_starts, 0, roll="forward", busdaycal=busdays)
+            # a month without working days rolls into the next one, leave it out
+            dates = dates[dates < next_month_starts]
+        else:
+            dates = np.busday_offset(next_month_starts - 1, 0, roll="backward", busdaycal=busdays)
+            dates = dates[dates >= month_starts]
+        groups.append((owners, _in_window(dates, start, end)))
+
+    first_day = start + 1
+    # 1970-01-01 was a thursday, weekday() 3
+    first_weekday = (first_day.astype("int64") + 3) % 7
+    for weekday, owners in weekly.items():
+        first = first_day + (weekday - first_weekday) % 7
+        groups.append((owners, np.arange(first, end + 1, 7)))
+
+    # the occurrences of every schedule are one part of a shared buffer: its group's
+    # dates, its own expansion if it was not grouped, or the empty part 0 if it has none
+    parts = [np.empty(0, dtype="datetime64[D]")]
+    part_of = np.zeros(len(schedules), dtype=np.int64)
+    for owners, dates in groups:
+        part_of[owners] = len(parts)
+        parts.append(dates)
+
+    for index in others:
+        part_of[index] = len(parts)
+        parts.append(np.asarray(schedules[index].get_occurences_in_period(period), dtype="datetime64[D]"))
+
+    lengths = np.array([len(part) for part in parts], dtype=np.int64)
+    bases = np.zeros(len(parts), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=bases[1:])
+    counts = lengths[part_of]
+
+    offsets = np.zeros(len(schedules) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    # gather each schedule's slice straight into owner order, no sort needed
+    gather = np.repeat(bases[part_of] - offsets[:-1], counts) + np.arange(offsets[-1])
+    dates = np.concatenate(parts)[gather]
+    owners = np.repeat(np.arange(len(schedules), dtype=np.int64), counts)
+
+    metrics.record_time("batch_expansion", time.perf_counter() - started)
+    metrics.increment("batch_expansions")
+    metrics.increment("batch_occurences_generated", len(dates))
+    logger.debug("expanded %d schedules into %d occurences in %d groups", len(schedules), len(dates), len(groups))
+    return OccurrenceBatch(owners, dates, offsets)
+
+
+def month_starts(period: Period):
+    """returns the first day of every month the period touches as a datetime64[D] array"""
+    np = _import_numpy()
+    first = np.datetime64(period.start, "M")
+    last = np.datetime64(max(period.start, period.end), "M")
+    return np.arange(first, last + 1).astype("datetime64[D]")
+
+
+def _month_boundaries(np, start, months: int):
+    # start moved by 0..months months, each step clamped from the previous one, which
+    # makes the day of the month the running minimum of the month lengths seen so far
+    month = np.datetime64(start, "M") + np.arange(months + 1)
+    first = month.astype("datetime64[D]")
+    lengths = ((month + 1).astype("datetime64[D]") - first).astype(np.int64)
+    days = np.minimum.accumulate(np.minimum(lengths, start.day))
+    return first + (days - 1)
+
+
+def interval_bounds(period: Period, interval: str = None):
+    """returns the (start, end) pairs of make_period_list as two datetime64[D] arrays"""
+    np = _import_numpy()
+    match interval or period.interval:
+        case "M":
+            months = (period.end.year - period.start.year) * 12 + period.end.month - period.start.month
+            boundaries = _month_boundaries(np, period.start, months + 1)
+        case "W":
+            weeks = (period.end - period.start).days // 7
+            boundaries = np.datetime64(period.start, "D") + 7 * np.arange(weeks + 2)
+        case _:
+            raise NotImplementedError("No valid incrementor defined")
+
+    end = np.datetime64(period.end, "D")
+    if period.start >= period.end:
+        empty = np.empty(0, dtype="datetime64[D]")
+        return empty, empty.copy()
+
+    boundaries = boundaries[boundaries <= end]
+    if boundaries[-1] < end:
+        # a shorter interval up to the end of the period
+        return boundaries, np.append(boundaries[1:], end) - 1
+    return boundaries[:-1], boundaries[1:] - 1